@@ -0,0 +1,264 @@
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from psychrometric_functions import pressao_vapor_saturado_vetorizado, razao_mistura1
+from psychrometric_batch import calculate_aquece_resfria_batch
+from grain_moisture import coeficientes_produto, umidade_equilibrio, umidade_relativa_equilibrio
+from grain_moisture import verificar_temperatura
+
+# Simulação de estratégias de aeração de grãos armazenados.
+#
+# A cada hora, cada estratégia decide se o ventilador liga, com base no ar
+# externo após o aquecimento no ventilador (processo de aquecimento de
+# psychrometric_batch, calculado uma vez para toda a série de clima). As
+# regras combinam:
+#   max_delta_t   ar pelo menos este valor (°C) mais frio que o grão
+#                 (ex.: 3 liga com o ar 3 °C abaixo do grão)
+#   emc_min/max   faixa de umidade de equilíbrio do ar (% base seca)
+#   hours         janela de horário (início, fim), podendo virar a meia-noite
+# Regras ausentes (None) não restringem. Todas as estratégias avançam juntas,
+# como colunas de arrays; grupos de estratégias podem ser distribuídos entre
+# processos com compare_strategies.
+#
+# O silo é tratado como um volume único de grãos: com o ventilador ligado, o
+# ar sai em equilíbrio térmico e higroscópico com o grão, e a diferença de
+# razão de mistura entre entrada e saída define o ganho ou perda de água.
+
+RULE_KEYS = ('max_delta_t', 'emc_min', 'emc_max', 'hour_start', 'hour_end')
+
+def synthetic_weather(years=3, seed=0):
+    """
+    Gera uma série horária de clima com ciclos diário e anual
+
+    Args:
+        years: Número de anos
+        seed: Semente do gerador
+
+    Returns:
+        dict: Arrays 'tbs' (°C), 'ur' (decimal) e 'hour' (0-23)
+    """
+    rng = np.random.default_rng(seed)
+    h = np.arange(int(years * 8760))
+    anual = np.cos(2 * np.pi * h / 8760)
+    diario = np.sin(2 * np.pi * (h % 24 - 9) / 24)
+    tbs = 20 + 5 * anual + 6 * diario + rng.normal(0, 1.5, h.size)
+    ur = np.clip(0.7 - 0.2 * diario + 0.05 * anual + rng.normal(0, 0.05, h.size), 0.15, 0.99)
+    return {'tbs': tbs, 'ur': ur, 'hour': h % 24}
+
+def load_weather(path, col_time='time', col_tbs='tbs', col_ur='ur'):
+    """
+    Lê uma série horária de clima em CSV
+
+    Args:
+        path: Arquivo CSV
+        col_time: Coluna com data e hora
+        col_tbs: Coluna com a temperatura (°C)
+        col_ur: Coluna com a umidade relativa (%)
+
+    Returns:
+        dict: Arrays 'tbs' (°C), 'ur' (decimal) e 'hour' (0-23)
+    """
+    df = pd.read_csv(path, sep=None, engine='python')
+    return {
+        'tbs': pd.to_numeric(df[col_tbs], errors='coerce').to_numpy(dtype=float),
+        'ur': pd.to_numeric(df[col_ur], errors='coerce').to_numpy(dtype=float) / 100.0,
+        'hour': pd.to_datetime(df[col_time]).dt.hour.to_numpy()
+    }
+
+def _rule_arrays(strategies):
+    """
+    Converte a lista de estratégias em arrays de parâmetros (NaN: regra desativada)
+    """
+    columns = {key: [] for key in RULE_KEYS}
+    for strategy in strategies:
+        hours = strategy.get('hours')
+        values = {
+            'max_delta_t': strategy.get('max_delta_t'),
+            'emc_min': strategy.get('emc_min'),
+            'emc_max': strategy.get('emc_max'),
+            'hour_start': hours[0] if hours else None,
+            'hour_end': hours[1] if hours else None
+        }
+        for key in RULE_KEYS:
+            columns[key].append(np.nan if values[key] is None else float(values[key]))
+    return {key: np.array(value) for key, value in columns.items()}
+
+def simulate_strategies(weather, strategies, initial_moisture=16.0, initial_temperature=None,
+                        airflow=0.1, static_pressure=500.0, fan_efficiency=0.5, grain_specific_heat=1.35,
+                        product='milho', model='henderson', patm=101.325, coefficients=None):
+    """
+    Simula estratégias de aeração sobre uma série horária de clima
+
+    O GAB modificado não vale até 5 °C (grain_moisture.TEMPERATURA_MINIMA);
+    séries com ar ou grão nessa faixa geram ValueError com esse modelo.
+
+    Args:
+        weather: Dicionário com arrays 'tbs' (°C), 'ur' (decimal) e 'hour' (0-23)
+        strategies: Lista de dicionários com 'name' e as regras (ver RULE_KEYS;
+                    horário como 'hours': (início, fim))
+        initial_moisture: Umidade inicial do grão (% base seca)
+        initial_temperature: Temperatura inicial do grão (°C); padrão: média da série
+        airflow: Vazão específica de ar (m³/min por tonelada de matéria seca)
+        static_pressure: Pressão estática do sistema (Pa)
+        fan_efficiency: Rendimento do ventilador
+        grain_specific_heat: Calor específico da matéria seca (kJ/kg K)
+        product: Produto da tabela de grain_moisture.COEFICIENTES
+        model: Modelo de umidade de equilíbrio
+        patm: Pressão atmosférica (kPa)
+        coefficients: Tupla (A, B, C) usada no lugar da tabela de produtos
+
+    Returns:
+        list: Por estratégia, dicionário com 'name', 'fan_hours', 'energy_kwh'
+              (por tonelada), 'moisture_change' (pontos percentuais base seca),
+              'final_moisture', 'final_temperature', 'wetting_hours' e 'drying_hours'
+    """
+    rules = _rule_arrays(strategies)
+    tbs, ur, hour = (np.asarray(weather[key], dtype=float) for key in ('tbs', 'ur', 'hour'))
+    coeficientes = coeficientes_produto(model, product) if coefficients is None else coefficients
+
+    # Potência do ventilador por tonelada; toda a energia aquece o ar
+    potencia = airflow / 60.0 * static_pressure / fan_efficiency / 1000.0  # kW/t
+    with np.errstate(all='ignore'):
+        ar = calculate_aquece_resfria_batch(tbs, ur, tbs, patm)['point1']
+        massa_ar = airflow * 60.0 / ar['ve']  # kg de ar seco por hora e tonelada
+        aquecimento = potencia * 3600.0 / (massa_ar * (1.006 + 1.775 * ar['rm'] / 1000.0))
+        fan = calculate_aquece_resfria_batch(tbs, ur, tbs + aquecimento, patm)['point2']
+        emc_ar = umidade_equilibrio(fan['ur'] / 100.0, fan['tbs'], model, coeficientes)
+    t_ar = fan['tbs']
+    w_ar = fan['rm'] / 1000.0
+    verificar_temperatura(model, t_ar)
+
+    # Regras que não dependem do estado do grão, avaliadas para todas as horas
+    faixa_emc = ((np.isnan(rules['emc_min']) | (emc_ar[:, None] >= rules['emc_min']))
+                 & (np.isnan(rules['emc_max']) | (emc_ar[:, None] <= rules['emc_max'])))
+    inicio, fim = rules['hour_start'], rules['hour_end']
+    h = hour[:, None]
+    janela = np.where(inicio <= fim, (h >= inicio) & (h < fim), (h >= inicio) | (h < fim))
+    permitido = faixa_emc & (np.isnan(inicio) | janela)
+    sem_delta = np.isnan(rules['max_delta_t'])
+
+    n_strategies = len(strategies)
+    m = np.full(n_strategies, float(initial_moisture))
+    theta = np.full(n_strategies, np.nanmean(tbs) if initial_temperature is None else float(initial_temperature))
+    verificar_temperatura(model, theta)
+    fan_hours = np.zeros(n_strategies)
+    wetting_hours = np.zeros(n_strategies)
+    massa_grao = 1000.0  # kg de matéria seca (resultados por tonelada)
+
+    for k in range(tbs.size):
+        if not np.isfinite(t_ar[k]):
+            continue
+        liga = permitido[k] & (sem_delta | (theta - t_ar[k] >= rules['max_delta_t']))
+        if not liga.any():
+            continue
+        g = massa_ar[k]
+
+        # Ar de saída em equilíbrio com o grão: temperatura de mistura e UR de equilíbrio
+        capacidade_ar = g * (1.006 + 1.775 * w_ar[k])
+        capacidade_grao = massa_grao * (grain_specific_heat + 4.186 * m / 100.0)
+        t_eq = (capacidade_ar * t_ar[k] + capacidade_grao * theta) / (capacidade_ar + capacidade_grao)
+        erh = np.clip(umidade_relativa_equilibrio(m, t_eq, model, coeficientes), 0.0, 0.99999)
+        w_sai = razao_mistura1(erh * pressao_vapor_saturado_vetorizado(t_eq), patm)
+
+        # Água trocada e resfriamento (ou aquecimento) pelo calor latente
+        agua = g * (w_ar[k] - w_sai)  # kg por tonelada; positivo umedece
+        m_novo = m + agua / massa_grao * 100.0
+        t_novo = t_eq + 2501.0 * agua / capacidade_grao
+
+        m = np.where(liga, m_novo, m)
+        theta = np.where(liga, t_novo, theta)
+        fan_hours += liga
+        wetting_hours += liga & (agua > 0)
+
+    return [
+        {
+            'name': strategy.get('name', str(i)),
+            'fan_hours': float(fan_hours[i]),
+            'energy_kwh': float(fan_hours[i] * potencia),
+            'moisture_change': float(m[i] - initial_moisture),
+            'final_moisture': float(m[i]),
+            'final_temperature': float(theta[i]),
+            'wetting_hours': float(wetting_hours[i]),
+            'drying_hours': float(fan_hours[i] - wetting_hours[i])
+        }
+        for i, strategy in enumerate(strategies)
+    ]
+
+def _simulate_chunk(args):
+    weather, strategies, options = args
+    return simulate_strategies(weather, strategies, **options)
+
+def compare_strategies(weather, strategies, workers=None, chunks=None, **options):
+    """
+    Avalia estratégias em paralelo, em grupos distribuídos entre processos
+
+    Args:
+        weather: Série de clima (ver simulate_strategies)
+        strategies: Lista de estratégias
+        workers: Número de processos (None: número de CPUs; 1: no processo atual)
+        chunks: Número de grupos de estratégias (padrão: um por processo)
+        **options: Demais argumentos de simulate_strategies
+
+    Returns:
+        list: Resultados na ordem das estratégias
+    """
+    if workers == 1:
+        return simulate_strategies(weather, strategies, **options)
+    workers = workers or os.cpu_count() or 1
+    n_chunks = chunks or workers
+    groups = [(i, strategies[i::n_chunks]) for i in range(n_chunks) if strategies[i::n_chunks]]
+    ordered = [None] * len(strategies)
+    with ProcessPoolExecutor(workers) as pool:
+        results = pool.map(_simulate_chunk, [(weather, group, options) for _, group in groups])
+        for (i, _), group_results in zip(groups, results):
+            ordered[i::n_chunks] = group_results
+    return ordered
+
+def strategy_grid():
+    """
+    Grade de estratégias de exemplo: diferencial de temperatura, faixa de EMC e horário
+    """
+    strategies = []
+    for delta, emc, hours in itertools.product((None, 2.0, 4.0, 6.0),
+                                               (None, (12.0, 18.0), (14.0, 17.0)),
+                                               (None, (18, 6), (22, 6))):
+        name = f'dT>={delta}' if delta is not None else 'dT:-'
+        name += f' EMC{emc[0]:g}-{emc[1]:g}' if emc else ' EMC:-'
+        name += f' h{hours[0]}-{hours[1]}' if hours else ' h:-'
+        strategies.append({
+            'name': name,
+            'max_delta_t': delta,
+            'emc_min': emc[0] if emc else None,
+            'emc_max': emc[1] if emc else None,
+            'hours': hours
+        })
+    return strategies
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Comparação de estratégias de aeração de grãos')
+    parser.add_argument('--weather', help='CSV com colunas time, tbs (°C) e ur (%%); padrão: série sintética')
+    parser.add_argument('--years', type=float, default=3, help='Anos da série sintética')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--moisture', type=float, default=16.0, help='Umidade inicial (%% base seca)')
+    parser.add_argument('--airflow', type=float, default=0.1, help='m³/min por tonelada')
+    parser.add_argument('--product', default='milho')
+    args = parser.parse_args()
+
+    weather = load_weather(args.weather) if args.weather else synthetic_weather(args.years)
+    strategies = strategy_grid()
+    start = time.perf_counter()
+    results = compare_strategies(weather, strategies, workers=args.workers, initial_moisture=args.moisture,
+                                 airflow=args.airflow, product=args.product)
+    elapsed = time.perf_counter() - start
+
+    print(f'{"strategy":32s} {"fan h":>8s} {"kWh/t":>8s} {"dM %db":>8s} {"T final":>8s} {"wet h":>8s}')
+    for r in sorted(results, key=lambda r: r['moisture_change']):
+        print(f'{r["name"]:32s} {r["fan_hours"]:8.0f} {r["energy_kwh"]:8.1f} {r["moisture_change"]:8.2f} '
+              f'{r["final_temperature"]:8.1f} {r["wetting_hours"]:8.0f}')
+    print(f'{len(strategies)} strategies x {len(weather["tbs"])} hours in {elapsed:.2f} s')
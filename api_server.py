@@ -0,0 +1,387 @@
+import argparse
+import http.client
+import inspect
+import json
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import psychrometric_functions
+import psychrometric_processes
+from psychrometric_batch import BATCH_FUNCTIONS
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Serviço HTTP local para os cálculos psicrométricos.
+#
+#   POST /calculate/<função>   corpo: objeto com os argumentos da função
+#                              (ex.: {"tbs": 25, "ur": 0.6}) ou lista de objetos
+#   GET  /functions            funções disponíveis e seus argumentos
+#   GET  /health               estado do serviço e estatísticas do agrupamento
+#
+# A pressão atmosférica pode ser informada em cada item por "patm" (kPa) ou
+# "altitude" (m). Requisições concorrentes para a mesma função são agrupadas
+# em uma única chamada vetorizada de psychrometric_batch.
+
+DEFAULT_PATM = 101.325
+JSON_TYPE = 'application/json'
+MSGPACK_TYPE = 'application/msgpack'
+
+def _scalar_function(name):
+    """
+    Retorna a função escalar original correspondente a um nome calculate_*
+    """
+    for module in (psychrometric_functions, psychrometric_processes):
+        func = getattr(module, name, None)
+        if func is not None:
+            return func
+    raise KeyError(name)
+
+# Argumentos de cada função, na ordem da assinatura escalar (sem patm)
+FUNCTION_ARGS = {
+    name: tuple(p for p in inspect.signature(_scalar_function(name)).parameters if p != 'patm')
+    for name in BATCH_FUNCTIONS
+}
+
+def patm_from_altitude(altitude):
+    """
+    Calcula a pressão atmosférica a partir da altitude, como na barra lateral do app
+
+    Args:
+        altitude: Altitude do local (m)
+
+    Returns:
+        patm: Pressão atmosférica (kPa)
+    """
+    a = 2.2556e-5
+    b = 5.2559
+    return 101.324 * (1 - a * altitude) ** b
+
+# Domínio de cada argumento, pelo prefixo do nome: (mínimo, máximo, mínimo exclusivo)
+ARG_DOMAINS = {
+    'ur': (0.0, 1.0, False),
+    'rm': (0.0, None, False),
+    'q': (0.0, None, True),
+    'ef': (0.0, 1.0, False)
+}
+
+def _check_domain(arg, value):
+    """
+    Verifica se o valor de um argumento é finito e está no seu domínio
+    """
+    if not math.isfinite(value):
+        raise ValueError(f'{arg}: valor não finito')
+    for prefix, (low, high, exclusive) in ARG_DOMAINS.items():
+        if arg.startswith(prefix):
+            if value < low or (exclusive and value == low):
+                raise ValueError(f'{arg}: deve ser {">" if exclusive else ">="} {low:g}')
+            if high is not None and value > high:
+                raise ValueError(f'{arg}: deve ser <= {high:g}')
+            break
+
+def parse_item(name, item):
+    """
+    Valida um item da requisição e extrai os argumentos numéricos
+
+    Args:
+        name: Nome da função calculate_*
+        item: Dicionário com os argumentos
+
+    Returns:
+        tuple: Valores dos argumentos na ordem da função, seguidos de patm
+
+    Raises:
+        ValueError: Argumento ausente ou fora do domínio (ver ARG_DOMAINS), com o nome do argumento
+    """
+    if not isinstance(item, dict):
+        raise ValueError('Cada item deve ser um objeto JSON')
+    missing = [arg for arg in FUNCTION_ARGS[name] if arg not in item]
+    if missing:
+        raise ValueError(f'Argumentos ausentes: {", ".join(missing)}')
+
+    values = [float(item[arg]) for arg in FUNCTION_ARGS[name]]
+    for arg, value in zip(FUNCTION_ARGS[name], values):
+        _check_domain(arg, value)
+    if 'patm' in item:
+        patm, source = float(item['patm']), 'patm'
+    elif 'altitude' in item:
+        patm, source = patm_from_altitude(float(item['altitude'])), 'altitude'
+    else:
+        patm, source = DEFAULT_PATM, 'patm'
+    if not (isinstance(patm, float) and math.isfinite(patm) and patm > 0):
+        raise ValueError(f'{source}: a pressão atmosférica deve ser > 0')
+    return tuple(values) + (patm,)
+
+def _row(result, i):
+    """
+    Extrai a linha i de um resultado em lote, convertendo para tipos JSON
+    """
+    if isinstance(result, dict):
+        if 'valid' in result:
+            if not result['valid'][i]:
+                return {'error': str(result['error'][i])}
+            result = {k: v for k, v in result.items() if k not in ('valid', 'error')}
+        return {k: _row(v, i) for k, v in result.items()}
+    value = result[i]
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+class MicroBatcher:
+    """
+    Agrupa requisições concorrentes em chamadas vetorizadas
+
+    Uma thread de trabalho espera no máximo max_wait segundos após o primeiro
+    item para reunir outros, até max_batch linhas, e executa uma única chamada
+    de psychrometric_batch por função.
+    """
+
+    def __init__(self, max_batch=4096, max_wait=0.002):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+        self.stats = {'requests': 0, 'rows': 0, 'batches': 0}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, name, rows):
+        """
+        Enfileira as linhas de uma requisição
+
+        Args:
+            name: Nome da função calculate_*
+            rows: Lista de tuplas retornadas por parse_item
+
+        Returns:
+            Future: Resultado com a lista de dicionários, um por linha
+        """
+        future = Future()
+        self.queue.put((name, rows, future))
+        return future
+
+    def _collect(self):
+        pending = [self.queue.get()]
+        size = len(pending[0][1])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                job = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            pending.append(job)
+            size += len(job[1])
+        return pending
+
+    def _run(self):
+        while True:
+            pending = self._collect()
+            groups = {}
+            for job in pending:
+                groups.setdefault(job[0], []).append(job)
+            for name, jobs in groups.items():
+                self._execute(name, jobs)
+
+    def _execute(self, name, jobs):
+        rows = [row for _, job_rows, _ in jobs for row in job_rows]
+        try:
+            columns = np.array(rows, dtype=float).T
+            with np.errstate(all='ignore'):
+                result = BATCH_FUNCTIONS[name](*columns)
+            start = 0
+            for _, job_rows, future in jobs:
+                future.set_result([_row(result, i) for i in range(start, start + len(job_rows))])
+                start += len(job_rows)
+        except Exception as exc:
+            for _, _, future in jobs:
+                if not future.done():
+                    future.set_exception(exc)
+
+        with self._lock:
+            self.stats['requests'] += len(jobs)
+            self.stats['rows'] += len(rows)
+            self.stats['batches'] += 1
+
+class PsychrometricHandler(BaseHTTPRequestHandler):
+    """
+    Manipulador HTTP/1.1 com conexões persistentes (keep-alive)
+    """
+    protocol_version = 'HTTP/1.1'
+    server_version = 'GRAPSI'
+    # Cabeçalho e corpo são escritos separadamente; sem isso cada resposta
+    # espera o ACK atrasado do cliente em conexões persistentes
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _send(self, status, payload):
+        accept = self.headers.get('Accept', '')
+        if msgpack is not None and MSGPACK_TYPE in accept:
+            body = msgpack.packb(payload)
+            content_type = MSGPACK_TYPE
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            content_type = JSON_TYPE
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        if self.headers.get('Content-Type', '').startswith(MSGPACK_TYPE):
+            if msgpack is None:
+                raise ValueError('MessagePack não está disponível no servidor')
+            return msgpack.unpackb(body)
+        return json.loads(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send(200, {'status': 'ok', 'batching': dict(self.server.batcher.stats)})
+        elif self.path == '/functions':
+            self._send(200, {name: list(args) for name, args in FUNCTION_ARGS.items()})
+        else:
+            self._send(404, {'error': 'Rota não encontrada'})
+
+    def do_POST(self):
+        prefix = '/calculate/'
+        name = self.path[len(prefix):] if self.path.startswith(prefix) else None
+        try:
+            payload = self._read_body()
+        except ValueError as exc:
+            self._send(400, {'error': f'Corpo inválido: {exc}'})
+            return
+        if name not in FUNCTION_ARGS:
+            self._send(404, {'error': 'Função não encontrada'})
+            return
+
+        single = not isinstance(payload, list)
+        items = [payload] if single else payload
+        try:
+            rows = [parse_item(name, item) for item in items]
+        except (TypeError, ValueError) as exc:
+            self._send(400, {'error': str(exc)})
+            return
+        if not rows:
+            self._send(200, [])
+            return
+
+        try:
+            results = self.server.batcher.submit(name, rows).result()
+        except Exception as exc:
+            self._send(500, {'error': str(exc)})
+            return
+        self._send(200, results[0] if single else results)
+
+def create_server(host='127.0.0.1', port=8765, max_batch=4096, max_wait=0.002, quiet=True):
+    """
+    Cria o servidor HTTP com a camada de agrupamento
+
+    Args:
+        host: Endereço de escuta
+        port: Porta (0 para escolher uma porta livre)
+        max_batch: Máximo de linhas por chamada vetorizada
+        max_wait: Espera máxima para agrupar requisições (s)
+        quiet: Suprime o log de cada requisição
+
+    Returns:
+        ThreadingHTTPServer: Servidor pronto para serve_forever()
+    """
+    server = ThreadingHTTPServer((host, port), PsychrometricHandler)
+    server.daemon_threads = True
+    server.batcher = MicroBatcher(max_batch, max_wait)
+    server.quiet = quiet
+    return server
+
+def load_test(host, port, requests_per_client=200, clients=16):
+    """
+    Dispara requisições concorrentes com conexões persistentes contra o servidor
+
+    Args:
+        host: Endereço do servidor
+        port: Porta do servidor
+        requests_per_client: Requisições enviadas por cliente
+        clients: Número de clientes simultâneos
+
+    Returns:
+        dict: Vazão (req/s) e latências p50/p99 (ms)
+    """
+    latencies = []
+    lock = threading.Lock()
+    body = json.dumps({'tbs': 25.0, 'ur': 0.6})
+    headers = {'Content-Type': JSON_TYPE}
+
+    def client():
+        conn = http.client.HTTPConnection(host, port)
+        local = []
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            conn.request('POST', '/calculate/calculate_from_tbs_ur', body, headers)
+            response = conn.getresponse()
+            response.read()
+            local.append(time.perf_counter() - start)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'throughput': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99))
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serviço HTTP local de cálculos psicrométricos')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-batch', type=int, default=4096)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--verbose', action='store_true')
+    parser.add_argument('--load-test', action='store_true',
+                        help='Inicia o servidor em uma porta livre e executa um teste de carga local')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    if args.load_test:
+        server = create_server(args.host, 0, args.max_batch, args.max_wait_ms / 1000)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        report = load_test(args.host, server.server_address[1], args.requests, args.clients)
+        report['mean_batch_rows'] = server.batcher.stats['rows'] / max(server.batcher.stats['batches'], 1)
+        print(json.dumps(report, indent=2))
+        server.shutdown()
+    else:
+        server = create_server(args.host, args.port, args.max_batch, args.max_wait_ms / 1000,
+                               quiet=not args.verbose)
+        print(f'Servindo em http://{args.host}:{server.server_address[1]}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.server_close()
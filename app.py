@@ -3,16 +3,230 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import json
+import hashlib
+import io
+import os
 from psychrometric_functions import *
 from psychrometric_processes import *
+from psychrometric_batch import BATCH_METHODS, PROPERTY_KEYS
 from psychrometric_chart import plot_psychrometric_chart
 from translations import get_text
+from tracing import collector, span
+from uncertainty import propagate, DEFAULT_SAMPLES, DEFAULT_PERCENTILES
 
 # Função para mostrar as referências
 def show_references(lang='pt'):
     st.markdown(f"## [{get_text('references', lang)}](https://evandro.eng.br/grapsi-artigos)")
     st.markdown(get_text('references_content', lang))
 
+# Funções de cálculo que podem ser chamadas pelo cache de resultados
+CALCULATIONS = {
+    func.__name__: func for func in (
+        calculate_from_tbs_ur, calculate_from_tbs_tbm, calculate_from_tbs_tpo,
+        calculate_aquece_resfria, calculate_u_adiabatica_ur, calculate_u_adiabatica_rm,
+        calculate_mistura_fluxos
+    )
+}
+
+@st.cache_data(max_entries=2000, show_spinner=False)
+def cached_calculation(name, *args):
+    """
+    Executa um cálculo com cache compartilhado entre todas as sessões
+    
+    Args:
+        name: Nome da função de cálculo (chave de CALCULATIONS)
+        *args: Argumentos da função (entradas e patm)
+    
+    Returns:
+        dict: Resultado da função de cálculo
+    """
+    return CALCULATIONS[name](*args)
+
+def run_calculation(name, *args):
+    """
+    Executa um cálculo pelo cache, medindo o tempo da etapa (inclusive acertos de cache)
+    """
+    with span('calculation'):
+        return cached_calculation(name, *args)
+
+# Número de amostras de Monte Carlo desenhadas na nuvem de incerteza do gráfico
+UNCERTAINTY_CLOUD_POINTS = 3000
+
+# Segunda variável de cada método de entrada, na ordem de calc_options, e
+# incerteza padrão dos sensores (UR em %, TBM e TPO em °C)
+UNCERTAINTY_SECOND = ('ur', 'tbm', 'tpo')
+UNCERTAINTY_DEFAULTS = {'ur': 2.0, 'tbm': 0.2, 'tpo': 0.2}
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_uncertainty(name, inputs, uncertainties, patm):
+    """
+    Propaga as incertezas das entradas por Monte Carlo, com cache entre sessões
+    
+    Args:
+        name: Nome da função de cálculo (chave de psychrometric_batch.BATCH_FUNCTIONS)
+        inputs: Dicionário com os valores nominais dos argumentos
+        uncertainties: Dicionário com o desvio padrão de cada argumento
+        patm: Pressão atmosférica (kPa)
+    
+    Returns:
+        dict: Percentis por propriedade e amostras (tbs, pv) para a nuvem do gráfico
+    """
+    mc = propagate(name, inputs, uncertainties, patm, seed=0)
+    cloud = np.nonzero(mc['valid'])[0][:UNCERTAINTY_CLOUD_POINTS]
+    return {
+        'percentiles': mc['percentiles'],
+        'cloud': {'tbs': mc['result']['tbs'][cloud].tolist(), 'pv': mc['result']['pv'][cloud].tolist()}
+    }
+
+def run_uncertainty(name, inputs, uncertainties, patm):
+    """
+    Executa a propagação de incertezas pelo cache, medindo o tempo da etapa
+    """
+    with span('uncertainty'):
+        return cached_uncertainty(name, inputs, uncertainties, patm)
+
+def chart_cache_key(chart_data, patm, altitude, lang, **options):
+    """
+    Gera uma chave estável para o gráfico a partir dos dados e das opções
+    
+    Args:
+        chart_data: Dicionário com os dados do gráfico
+        patm: Pressão atmosférica (kPa)
+        altitude: Altitude do local (m)
+        lang: Idioma do gráfico
+        **options: Demais opções do gráfico (modo, linhas exibidas)
+    
+    Returns:
+        str: Hash SHA-256 da representação JSON ordenada
+    """
+    payload = json.dumps(
+        {'data': chart_data, 'patm': patm, 'altitude': altitude, 'lang': lang, 'options': options},
+        sort_keys=True, default=float
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def render_chart(key, _chart_data, patm, altitude, lang, fmt='png', **options):
+    """
+    Desenha o gráfico e retorna a imagem codificada, com cache entre sessões
+    
+    O dicionário _chart_data não entra no hash do Streamlit; a identificação
+    é feita pela chave gerada em chart_cache_key.
+    
+    Args:
+        key: Chave gerada por chart_cache_key
+        _chart_data: Dicionário com os dados do gráfico
+        patm: Pressão atmosférica (kPa)
+        altitude: Altitude do local (m)
+        lang: Idioma do gráfico
+        fmt: Formato da imagem ('png' ou 'svg')
+        **options: Opções repassadas para plot_psychrometric_chart
+    
+    Returns:
+        bytes: Imagem do gráfico
+    """
+    with span('chart_build'):
+        fig = plot_psychrometric_chart(_chart_data, patm, altitude, lang, **options)
+    with span('chart_encode'):
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, bbox_inches='tight', dpi=200)
+        plt.close(fig)
+    return buffer.getvalue()
+
+def show_chart(chart_data, patm, altitude, lang, **options):
+    """
+    Exibe o gráfico psicrométrico reaproveitando a imagem em cache, com o SVG sob demanda
+    
+    Args:
+        chart_data: Dicionário com os dados do gráfico
+        patm: Pressão atmosférica (kPa)
+        altitude: Altitude do local (m)
+        lang: Idioma do gráfico
+        **options: Opções repassadas para plot_psychrometric_chart
+    """
+    with span('chart'):
+        key = chart_cache_key(chart_data, patm, altitude, lang, **options)
+        image = render_chart(key, chart_data, patm, altitude, lang, **options)
+    with span('chart_display'):
+        st.image(image, use_container_width=True)
+
+    # O SVG só é desenhado quando pedido, e fica no mesmo cache do PNG
+    svg_key = f'chart_svg_{key[:16]}'
+    if st.button(get_text('prepare_svg', lang), key=f'{svg_key}_prepare'):
+        st.session_state[svg_key] = True
+    if st.session_state.get(svg_key):
+        with span('chart_svg'):
+            svg = render_chart(key, chart_data, patm, altitude, lang, fmt='svg', **options)
+        st.download_button(
+            get_text('download_svg', lang),
+            data=svg,
+            file_name='grapsi_grafico.svg',
+            mime='image/svg+xml',
+            key=svg_key + '_download'
+        )
+
+# Rótulos das colunas de resultado no cálculo em lote
+BATCH_COLUMN_LABELS = {
+    'tbs': 'dbt_short', 'tbm': 'wbt_short', 'tpo': 'dpt_short', 'ur': 'rh_short', 'rm': 'mr_short',
+    'pvs': 'svp_short', 'pv': 'vp_short', 've': 'sv_short', 'e': 'enthalpy_short'
+}
+
+# Tipos de página usados na agregação dos tempos, na ordem do menu lateral
+PAGE_TYPES = ('state_point', 'process', 'mixing', 'bulk')
+
+# Número de linhas calculadas por vez no cálculo em lote
+BATCH_CHUNK_SIZE = 50000
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_measurements(content, file_name):
+    """
+    Lê um arquivo CSV ou Excel enviado pelo usuário
+    
+    Args:
+        content: Conteúdo do arquivo (bytes)
+        file_name: Nome do arquivo, usado para identificar o formato
+    
+    Returns:
+        DataFrame: Medições lidas do arquivo
+    """
+    if file_name.lower().endswith(('.xlsx', '.xls')):
+        return pd.read_excel(io.BytesIO(content))
+    return pd.read_csv(io.BytesIO(content), sep=None, engine='python')
+
+def calculate_batch(df, method, col_tbs, col_second, patm, progress=None):
+    """
+    Calcula as propriedades de todas as linhas em blocos vetorizados
+    
+    Args:
+        df: DataFrame com as medições
+        method: Chave de BATCH_METHODS ('tbs_ur', 'tbs_tbm' ou 'tbs_tpo')
+        col_tbs: Coluna com a temperatura de bulbo seco (°C)
+        col_second: Coluna com a segunda variável (UR em %, TBM ou TPO em °C)
+        patm: Pressão atmosférica (kPa)
+        progress: Função chamada com (linhas processadas, total) após cada bloco
+    
+    Returns:
+        dict: Arrays com as propriedades de todas as linhas
+    """
+    tbs = pd.to_numeric(df[col_tbs], errors='coerce').to_numpy(dtype=float)
+    second = pd.to_numeric(df[col_second], errors='coerce').to_numpy(dtype=float)
+    if method == 'tbs_ur':
+        # Mesmo limite usado no formulário de ponto de estado
+        second = np.minimum(second / 100.0, 0.99999)
+    
+    total = len(tbs)
+    results = {key: np.empty(total) for key in PROPERTY_KEYS}
+    for start in range(0, total, BATCH_CHUNK_SIZE):
+        stop = min(start + BATCH_CHUNK_SIZE, total)
+        with np.errstate(all='ignore'):
+            chunk = BATCH_METHODS[method](tbs[start:stop], second[start:stop], patm)
+        for key in PROPERTY_KEYS:
+            results[key][start:stop] = chunk[key]
+        if progress:
+            progress(stop, total)
+    
+    return results
+
 # Set page config
 st.set_page_config(
     page_title="Grapsi - Cálculos Psicométricos",
@@ -40,6 +254,9 @@ if 'process_results' not in st.session_state:
     
 if 'chart_data' not in st.session_state:
     st.session_state.chart_data = None
+
+if 'uncertainty' not in st.session_state:
+    st.session_state.uncertainty = None
     
 # Initialize language preference
 if 'language' not in st.session_state:
@@ -54,17 +271,20 @@ with st.sidebar:
         'pt': [
             get_text('state_point', 'pt'),
             get_text('psychrometric_processes', 'pt'),
-            get_text('air_flow_mixing', 'pt')
+            get_text('air_flow_mixing', 'pt'),
+            get_text('bulk_calculation', 'pt')
         ],
         'en': [
             get_text('state_point', 'en'),
             get_text('psychrometric_processes', 'en'),
-            get_text('air_flow_mixing', 'en')
+            get_text('air_flow_mixing', 'en'),
+            get_text('bulk_calculation', 'en')
         ],
         'es': [
             get_text('state_point', 'es'),
             get_text('psychrometric_processes', 'es'),
-            get_text('air_flow_mixing', 'es')
+            get_text('air_flow_mixing', 'es'),
+            get_text('bulk_calculation', 'es')
         ]
     }
     
@@ -73,6 +293,9 @@ with st.sidebar:
         page_options[st.session_state.language]
     )
     
+    # Medição de latência da requisição, agregada por tipo de página
+    trace = collector.start(PAGE_TYPES[page_options[st.session_state.language].index(page)])
+    
     # Altitude input in sidebar
     altitude = st.number_input(
         get_text('site_altitude', st.session_state.language), 
@@ -89,6 +312,12 @@ with st.sidebar:
     st.session_state.patm = calculated_patm
     patm = st.session_state.patm
     
+    # Modo do gráfico: eixos fixos ou adaptativos (faixa de -100 a 372 °C)
+    adaptive_chart = st.checkbox(get_text('adaptive_chart', st.session_state.language), value=False)
+    chart_mode = 'adaptive' if adaptive_chart else 'standard'
+    show_wet_bulb = st.checkbox(get_text('show_wet_bulb_lines', st.session_state.language), value=True)
+    show_specific_volume = st.checkbox(get_text('show_volume_lines', st.session_state.language), value=True)
+    
     # Seletor de idioma
     st.markdown("---")
     st.subheader(get_text("language", st.session_state.language))
@@ -148,6 +377,19 @@ if page == get_text('state_point', st.session_state.language):
         calc_options[st.session_state.language]
     )
     
+    # Modo de incerteza: propagação das incertezas dos sensores por Monte Carlo
+    uncertainty_mode = st.checkbox(get_text('uncertainty_mode', st.session_state.language))
+    u_tbs, u_second = 0.0, 0.0
+    if uncertainty_mode:
+        # Segunda variável do método: UR em %, TBM e TPO em °C, cada uma com seu padrão
+        second = UNCERTAINTY_SECOND[calc_options[st.session_state.language].index(calc_type)]
+        ucol1, ucol2 = st.columns(2)
+        u_tbs = ucol1.number_input(get_text('uncertainty_tbs', st.session_state.language),
+                                   value=0.2, min_value=0.0, step=0.05)
+        u_second = ucol2.number_input(get_text(f'uncertainty_{second}', st.session_state.language),
+                                      value=UNCERTAINTY_DEFAULTS[second], min_value=0.0,
+                                      step=0.1 if second == 'ur' else 0.05, key=f'uncertainty_{second}')
+    
     # Create two columns
     col1, col2 = st.columns(2)
     
@@ -165,8 +407,11 @@ if page == get_text('state_point', st.session_state.language):
                         ur_decimal = 0.99999
                     
                     # Call the calculation function
-                    result = calculate_from_tbs_ur(tbs, ur_decimal, patm)
+                    result = run_calculation('calculate_from_tbs_ur', tbs, ur_decimal, patm)
                     st.session_state.results = result
+                    st.session_state.uncertainty = run_uncertainty(
+                        'calculate_from_tbs_ur', {'tbs': tbs, 'ur': ur_decimal}, {'tbs': u_tbs, 'ur': u_second / 100.0}, patm
+                    ) if uncertainty_mode else None
                     
                     # Passar informações completas para o gráfico
                     pv = result['pv']  # Pressão parcial de vapor
@@ -187,8 +432,11 @@ if page == get_text('state_point', st.session_state.language):
                 
                 if submit:
                     # Call the calculation function
-                    result = calculate_from_tbs_tbm(tbs, tbm, patm)
+                    result = run_calculation('calculate_from_tbs_tbm', tbs, tbm, patm)
                     st.session_state.results = result
+                    st.session_state.uncertainty = run_uncertainty(
+                        'calculate_from_tbs_tbm', {'tbs': tbs, 'tbm': tbm}, {'tbs': u_tbs, 'tbm': u_second}, patm
+                    ) if uncertainty_mode else None
                     
                     # Passar informações completas para o gráfico
                     pv = result['pv']  # Pressão parcial de vapor
@@ -209,8 +457,11 @@ if page == get_text('state_point', st.session_state.language):
                 
                 if submit:
                     # Call the calculation function
-                    result = calculate_from_tbs_tpo(tbs, tpo, patm)
+                    result = run_calculation('calculate_from_tbs_tpo', tbs, tpo, patm)
                     st.session_state.results = result
+                    st.session_state.uncertainty = run_uncertainty(
+                        'calculate_from_tbs_tpo', {'tbs': tbs, 'tpo': tpo}, {'tbs': u_tbs, 'tpo': u_second}, patm
+                    ) if uncertainty_mode else None
                     
                     # Passar informações completas para o gráfico
                     pv = result['pv']  # Pressão parcial de vapor
@@ -224,7 +475,7 @@ if page == get_text('state_point', st.session_state.language):
                     }
     
     # Display results in the second column
-    with col2:
+    with col2, span('table'):
         if st.session_state.results:
             st.subheader(get_text('results', st.session_state.language))
             
@@ -256,14 +507,34 @@ if page == get_text('state_point', st.session_state.language):
             })
             
             st.table(df)
+            
+            # Faixas de incerteza (percentis das amostras de Monte Carlo)
+            if st.session_state.uncertainty:
+                st.subheader(get_text('uncertainty_results', st.session_state.language))
+                percentiles = st.session_state.uncertainty['percentiles']
+                uncertainty_keys = ('tbm', 'tpo', 'ur', 'rm', 'pv', 've', 'e')
+                df_uncertainty = pd.DataFrame(
+                    {f"P{p:g}": [f"{percentiles[key][p]:.{3 if key == 've' else 2}f}" for key in uncertainty_keys]
+                     for p in DEFAULT_PERCENTILES},
+                    index=[get_text(BATCH_COLUMN_LABELS[key], st.session_state.language)
+                           for key in uncertainty_keys]
+                )
+                st.table(df_uncertainty)
+                st.caption(get_text('uncertainty_caption', st.session_state.language, n=DEFAULT_SAMPLES))
     
     # Plot psychrometric chart
     if st.session_state.chart_data:
         st.subheader(get_text('psychrometric_chart', st.session_state.language))
         
-        # Gráfico Matplotlib estático
-        fig = plot_psychrometric_chart(st.session_state.chart_data, patm, altitude, st.session_state.language)
-        st.pyplot(fig)
+        # Nuvem de incerteza apenas para o ponto de estado calculado nesta página
+        uncertainty_options = {}
+        if st.session_state.uncertainty and st.session_state.chart_data['type'] == 'point':
+            uncertainty_options['uncertainty_data'] = st.session_state.uncertainty['cloud']
+        
+        # Gráfico Matplotlib estático (imagem em cache entre sessões)
+        show_chart(st.session_state.chart_data, patm, altitude, st.session_state.language,
+                   chart_mode=chart_mode, show_wet_bulb=show_wet_bulb,
+                   show_specific_volume=show_specific_volume, **uncertainty_options)
         
         # Mostrar referências
         show_references(st.session_state.language)
@@ -313,7 +584,7 @@ elif page == get_text('psychrometric_processes', st.session_state.language):
                 
                 if submit:
                     # Call the calculation function
-                    result = calculate_aquece_resfria(tbs1, ur1/100.0, tbs2, patm)
+                    result = run_calculation('calculate_aquece_resfria', tbs1, ur1/100.0, tbs2, patm)
                     st.session_state.process_results = result
                     st.session_state.chart_data = {
                         'type': 'process',
@@ -339,7 +610,7 @@ elif page == get_text('psychrometric_processes', st.session_state.language):
                 
                 if submit:
                     # Call the calculation function
-                    result = calculate_u_adiabatica_ur(tbs1, ur1/100.0, ur2/100.0, patm)
+                    result = run_calculation('calculate_u_adiabatica_ur', tbs1, ur1/100.0, ur2/100.0, patm)
                     st.session_state.process_results = result
                     st.session_state.chart_data = {
                         'type': 'process',
@@ -364,7 +635,7 @@ elif page == get_text('psychrometric_processes', st.session_state.language):
                 
                 if submit:
                     # Call the calculation function
-                    result = calculate_u_adiabatica_rm(tbs1, rm1, rm2, patm)
+                    result = run_calculation('calculate_u_adiabatica_rm', tbs1, rm1, rm2, patm)
                     
                     # Verificar se houve erro no cálculo
                     if 'error' in result:
@@ -384,7 +655,7 @@ elif page == get_text('psychrometric_processes', st.session_state.language):
                         }
     
     # Display results in the second column
-    with col2:
+    with col2, span('table'):
         if st.session_state.process_results and 'point1' in st.session_state.process_results and 'point2' in st.session_state.process_results:
             results = st.session_state.process_results
             
@@ -450,9 +721,10 @@ elif page == get_text('psychrometric_processes', st.session_state.language):
     if st.session_state.chart_data and st.session_state.chart_data['type'] == 'process':
         st.subheader(get_text('psychrometric_chart', st.session_state.language))
         
-        # Gráfico Matplotlib estático
-        fig = plot_psychrometric_chart(st.session_state.chart_data, patm, altitude, st.session_state.language)
-        st.pyplot(fig)
+        # Gráfico Matplotlib estático (imagem em cache entre sessões)
+        show_chart(st.session_state.chart_data, patm, altitude, st.session_state.language,
+                   chart_mode=chart_mode, show_wet_bulb=show_wet_bulb,
+                   show_specific_volume=show_specific_volume)
         
         # Mostrar referências
         show_references(st.session_state.language)
@@ -478,7 +750,7 @@ elif page == get_text('air_flow_mixing', st.session_state.language):
             
             if submit:
                 # Call the calculation function
-                result = calculate_mistura_fluxos(tbs1, ur1/100.0, q1, tbs2, ur2/100.0, q2, patm)
+                result = run_calculation('calculate_mistura_fluxos', tbs1, ur1/100.0, q1, tbs2, ur2/100.0, q2, patm)
                 st.session_state.process_results = result
                 st.session_state.chart_data = {
                     'type': 'mixing',
@@ -492,7 +764,7 @@ elif page == get_text('air_flow_mixing', st.session_state.language):
                 }
     
     # Display results
-    with col2:
+    with col2, span('table'):
         if st.session_state.process_results and len(st.session_state.process_results) >= 3:
             results = st.session_state.process_results
             
@@ -556,9 +828,115 @@ elif page == get_text('air_flow_mixing', st.session_state.language):
     if st.session_state.chart_data and st.session_state.chart_data['type'] == 'mixing':
         st.subheader(get_text('psychrometric_chart', st.session_state.language))
         
-        # Gráfico Matplotlib estático
-        fig = plot_psychrometric_chart(st.session_state.chart_data, patm, altitude, st.session_state.language)
-        st.pyplot(fig)
+        # Gráfico Matplotlib estático (imagem em cache entre sessões)
+        show_chart(st.session_state.chart_data, patm, altitude, st.session_state.language,
+                   chart_mode=chart_mode, show_wet_bulb=show_wet_bulb,
+                   show_specific_volume=show_specific_volume)
         
         # Mostrar referências
-        show_references(st.session_state.language)
\ No newline at end of file
+        show_references(st.session_state.language)
+
+elif page == get_text('bulk_calculation', st.session_state.language):
+    st.subheader(get_text('bulk_calc', st.session_state.language))
+    
+    uploaded = st.file_uploader(
+        get_text('upload_file', st.session_state.language),
+        type=['csv', 'txt', 'xlsx', 'xls']
+    )
+    
+    if uploaded is not None:
+        try:
+            measurements = load_measurements(uploaded.getvalue(), uploaded.name)
+        except Exception as error:  # Arquivo inválido ou leitor de Excel ausente
+            st.error(get_text('file_read_error', st.session_state.language, error=error))
+            measurements = None
+        
+        if measurements is not None:
+            st.dataframe(measurements.head(20))
+            
+            pair_labels = {
+                'tbs_ur': get_text('dbt_rh', st.session_state.language),
+                'tbs_tbm': get_text('dbt_wbt', st.session_state.language),
+                'tbs_tpo': get_text('dbt_dpt', st.session_state.language)
+            }
+            second_labels = {
+                'tbs_ur': get_text('relative_humidity', st.session_state.language),
+                'tbs_tbm': get_text('wet_bulb_temp', st.session_state.language),
+                'tbs_tpo': get_text('dew_point_temp', st.session_state.language)
+            }
+            
+            with st.form("bulk_form"):
+                method = st.selectbox(
+                    get_text('input_pair', st.session_state.language),
+                    options=list(pair_labels.keys()),
+                    format_func=lambda x: pair_labels[x]
+                )
+                columns = list(measurements.columns)
+                col_tbs = st.selectbox(
+                    get_text('column_for', st.session_state.language,
+                             name=get_text('dry_bulb_temp', st.session_state.language)),
+                    columns
+                )
+                col_second = st.selectbox(
+                    get_text('column_for', st.session_state.language,
+                             name=" / ".join(second_labels.values())),
+                    columns, index=min(1, len(columns) - 1)
+                )
+                st.caption(get_text('rh_percent_note', st.session_state.language))
+                submit = st.form_submit_button(get_text('calculate', st.session_state.language))
+            
+            if submit:
+                progress_bar = st.progress(0.0)
+                
+                def update_progress(done, total):
+                    progress_bar.progress(done / max(total, 1), text=get_text(
+                        'processing_rows', st.session_state.language, done=done, total=total))
+                
+                with span('calculation'):
+                    results = calculate_batch(measurements, method, col_tbs, col_second, patm, update_progress)
+                with span('table'):
+                    output = measurements.copy()
+                    for key in PROPERTY_KEYS:
+                        output[get_text(BATCH_COLUMN_LABELS[key], st.session_state.language)] = results[key]
+                st.session_state.bulk_results = output
+    
+    bulk_results = st.session_state.get('bulk_results')
+    if bulk_results is not None:
+        st.subheader(get_text('results', st.session_state.language))
+        st.success(get_text('rows_calculated', st.session_state.language, count=len(bulk_results)))
+        st.dataframe(bulk_results.head(200))
+        
+        st.download_button(
+            get_text('download_csv', st.session_state.language),
+            data=bulk_results.to_csv(index=False).encode('utf-8'),
+            file_name='grapsi_resultados.csv',
+            mime='text/csv'
+        )
+        
+        try:
+            parquet_bytes = bulk_results.to_parquet(index=False)
+        except ImportError:
+            st.info(get_text('parquet_unavailable', st.session_state.language))
+        else:
+            st.download_button(
+                get_text('download_parquet', st.session_state.language),
+                data=parquet_bytes,
+                file_name='grapsi_resultados.parquet',
+                mime='application/octet-stream'
+            )
+
+collector.finish(trace)
+
+# Painel de depuração com os tempos por etapa (?debug=1 ou GRAPSI_DEBUG=1)
+if st.query_params.get('debug') == '1' or os.environ.get('GRAPSI_DEBUG', '') not in ('', '0'):
+    with st.sidebar.expander(get_text('debug_panel', st.session_state.language)):
+        st.caption(get_text('trace_summary', st.session_state.language))
+        st.dataframe(pd.DataFrame(collector.summary()).round(3), hide_index=True)
+        st.caption(get_text('trace_last_request', st.session_state.language, ms=trace.total * 1000))
+        st.dataframe(pd.DataFrame(trace.as_dict()['spans']).round(3), hide_index=True)
+        st.download_button(
+            get_text('trace_download', st.session_state.language),
+            data=collector.to_json(),
+            file_name='grapsi_traces.json',
+            mime='application/json'
+        )
@@ -0,0 +1,246 @@
+import argparse
+import fnmatch
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+import psychrometric_functions as pf
+import psychrometric_processes as pp
+import psychrometric_batch as pb
+from psychrometric_chart import plot_psychrometric_chart
+from interactive_chart import plot_interactive_psychrometric_chart
+
+# Benchmarks dos cálculos, processos e gráficos.
+#
+# Cada caso é medido em três tamanhos: 'scalar' (uma chamada da função
+# original), '1e3' e '1e6' (versões vetorizadas com arrays desse tamanho; nos
+# gráficos, número de leituras de sensores sobrepostas). Os resultados podem
+# ser salvos como linha de base em JSON e comparados com uma tolerância.
+#
+#   python benchmark.py --save benchmark_baseline.json
+#   python benchmark.py --compare benchmark_baseline.json --tolerance 0.25
+
+PATM = 101.325
+SIZES = {'scalar': 1, '1e3': 1000, '1e6': 1000000}
+
+# Entradas escalares de cada função, na ordem dos argumentos (sem patm)
+SCALAR_INPUTS = {
+    'calculate_from_tbs_ur': (25.0, 0.6),
+    'calculate_from_tbs_tbm': (25.0, 20.0),
+    'calculate_from_tbs_tpo': (25.0, 15.0),
+    'calculate_aquece_resfria': (20.0, 0.6, 35.0),
+    'calculate_u_adiabatica_tbs': (30.0, 0.4, 25.0),
+    'calculate_u_adiabatica_ur': (30.0, 0.4, 0.8),
+    'calculate_u_adiabatica_rm': (30.0, 8.0, 12.0),
+    'calculate_mistura_fluxos': (30.0, 0.5, 100.0, 15.0, 0.8, 50.0),
+    'calculate_recuperador': (-5.0, 0.8, 1000.0, 22.0, 0.4, 1000.0, 0.75, 0.6)
+}
+
+def _array_inputs(scalars, n, seed=0):
+    """
+    Gera arrays de entrada com dispersão de ±10% em torno dos valores escalares
+    """
+    rng = np.random.default_rng(seed)
+    return tuple(v * rng.uniform(0.9, 1.1, n) for v in scalars)
+
+def _chart_inputs(n, seed=0):
+    """
+    Gera o ponto do gráfico e, para n > 1, n leituras de sensores
+    """
+    result = pf.calculate_from_tbs_ur(25.0, 0.6, PATM)
+    data = {'type': 'point', 'tbs': 25.0, 'tbm': result['tbm'], 'pv': result['pv'], 'rm': result['rm'] / 1000}
+    if n == 1:
+        return data, None
+    rng = np.random.default_rng(seed)
+    return data, {'tbs': rng.uniform(12, 45, n), 'ur': rng.uniform(10, 95, n)}
+
+def _render_matplotlib(data, sensor_data):
+    fig = plot_psychrometric_chart(data, PATM, 0, 'pt', sensor_data=sensor_data)
+    fig.savefig(io.BytesIO(), format='png', dpi=100)
+    plt.close(fig)
+
+def _render_plotly(data, sensor_data):
+    fig = plot_interactive_psychrometric_chart(data, PATM, 0, 'pt', sensor_data=sensor_data)
+    fig.to_json()
+
+def build_cases(sizes):
+    """
+    Monta os casos de benchmark
+
+    Args:
+        sizes: Lista de nomes de tamanho ('scalar', '1e3', '1e6')
+
+    Returns:
+        dict: Nome do caso ('função[tamanho]') e função sem argumentos a medir
+    """
+    cases = {}
+    for size in sizes:
+        n = SIZES[size]
+
+        # Funções básicas
+        tbs, ur = _array_inputs((25.0, 0.6), n)
+        e = pf.entalpia(tbs, pf.razao_mistura1(ur * pf.pressao_vapor_saturado_vetorizado(tbs), PATM))
+        if n == 1:
+            cases[f'pressao_vapor_saturado[{size}]'] = lambda: pf.pressao_vapor_saturado(25.0)
+            cases[f'temperatura_b_molhado[{size}]'] = lambda e0=float(e[0]): pf.temperatura_b_molhado(25.0, e0, PATM)
+        else:
+            cases[f'pressao_vapor_saturado[{size}]'] = lambda tbs=tbs: pf.pressao_vapor_saturado_vetorizado(tbs)
+            cases[f'temperatura_b_molhado[{size}]'] = lambda tbs=tbs, e=e: pf.temperatura_b_molhado_vetorizado(tbs, e, PATM)
+
+        # Estados e processos
+        for name, scalars in SCALAR_INPUTS.items():
+            if n == 1:
+                func = getattr(pf, name, None) or getattr(pp, name)
+                cases[f'{name}[{size}]'] = lambda func=func, args=scalars: func(*args, PATM)
+            else:
+                func = pb.BATCH_FUNCTIONS[name]
+                args = _array_inputs(scalars, n)
+                cases[f'{name}[{size}]'] = lambda func=func, args=args: func(*args, PATM)
+
+        # Gráficos
+        data, sensor_data = _chart_inputs(n)
+        cases[f'plot_psychrometric_chart[{size}]'] = lambda d=data, s=sensor_data: _render_matplotlib(d, s)
+        cases[f'plot_interactive_psychrometric_chart[{size}]'] = lambda d=data, s=sensor_data: _render_plotly(d, s)
+    return cases
+
+def measure(func, min_time=0.2, min_repeats=3, max_repeats=10000):
+    """
+    Mede o tempo de execução de uma função
+
+    Uma chamada inicial de aquecimento não é contada, de modo que os caches
+    dos gráficos ficam no estado de uso normal do aplicativo.
+
+    Args:
+        func: Função sem argumentos
+        min_time: Tempo total mínimo de medição (s)
+        min_repeats: Número mínimo de repetições
+        max_repeats: Número máximo de repetições
+
+    Returns:
+        dict: Mediana, mínimo e número de repetições (tempos em s)
+    """
+    with np.errstate(all='ignore'):
+        func()
+        times = []
+        total = 0.0
+        while len(times) < max_repeats and (len(times) < min_repeats or total < min_time):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+            total += times[-1]
+    return {'median': statistics.median(times), 'min': min(times), 'repeats': len(times)}
+
+def run(sizes=('scalar', '1e3', '1e6'), pattern='*', min_time=0.2, verbose=False):
+    """
+    Executa os benchmarks selecionados
+
+    Args:
+        sizes: Tamanhos de entrada
+        pattern: Filtro fnmatch sobre o nome do caso
+        min_time: Tempo mínimo de medição de cada caso (s)
+        verbose: Mostra cada resultado à medida que é medido
+
+    Returns:
+        dict: Metadados do ambiente e resultados por caso
+    """
+    results = {}
+    for name, func in build_cases(sizes).items():
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+        results[name] = measure(func, min_time)
+        if verbose:
+            print(f'{name:55s} {results[name]["median"] * 1000:12.4f} ms', file=sys.stderr)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')
+        },
+        'results': results
+    }
+
+def compare(current, baseline, tolerance=0.25, statistic='min'):
+    """
+    Compara resultados com uma linha de base
+
+    O mínimo é a estatística padrão por ser a menos sensível a interferências
+    de outros processos da máquina.
+
+    Args:
+        current: Resultado de run()
+        baseline: Resultado de run() salvo anteriormente
+        tolerance: Aumento relativo do tempo aceito antes de indicar regressão
+        statistic: 'min' ou 'median'
+
+    Returns:
+        list: Linhas (caso, tempo de base, tempo atual, razão, situação)
+    """
+    rows = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            rows.append((name, None, result[statistic], None, 'new'))
+            continue
+        ratio = result[statistic] / base[statistic]
+        if ratio > 1 + tolerance:
+            status = 'REGRESSION'
+        elif ratio < 1 / (1 + tolerance):
+            status = 'faster'
+        else:
+            status = 'ok'
+        rows.append((name, base[statistic], result[statistic], ratio, status))
+    return rows
+
+def format_report(rows, tolerance):
+    """
+    Formata a comparação como tabela de texto
+    """
+    def ms(value):
+        return f'{value * 1000:12.4f}' if value is not None else f'{"-":>12s}'
+
+    lines = [f'{"case":55s} {"baseline ms":>12s} {"current ms":>12s} {"ratio":>7s}  status',
+             '-' * 100]
+    for name, base, cur, ratio, status in rows:
+        ratio_text = f'{ratio:7.2f}' if ratio is not None else f'{"-":>7s}'
+        lines.append(f'{name:55s} {ms(base)} {ms(cur)} {ratio_text}  {status}')
+    regressions = sum(row[4] == 'REGRESSION' for row in rows)
+    lines.append('-' * 100)
+    lines.append(f'{regressions} regression(s) beyond {tolerance:.0%} of {len(rows)} case(s)')
+    return '\n'.join(lines)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks dos cálculos psicrométricos e gráficos')
+    parser.add_argument('--sizes', default='scalar,1e3,1e6',
+                        help='Tamanhos separados por vírgula (scalar, 1e3, 1e6)')
+    parser.add_argument('--filter', default='*', help='Padrão fnmatch dos casos, ex.: "calculate_*"')
+    parser.add_argument('--min-time', type=float, default=0.2)
+    parser.add_argument('--save', help='Salva os resultados como linha de base JSON')
+    parser.add_argument('--compare', help='Compara com uma linha de base JSON')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--statistic', choices=('min', 'median'), default='min')
+    args = parser.parse_args()
+
+    current = run(args.sizes.split(','), args.filter, args.min_time, verbose=True)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(current, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(current, baseline, args.tolerance, args.statistic)
+        print(format_report(rows, args.tolerance))
+        sys.exit(1 if any(row[4] == 'REGRESSION' for row in rows) else 0)
+    elif not args.save:
+        print(json.dumps(current, indent=2))
@@ -0,0 +1,429 @@
+from functools import lru_cache
+
+import numpy as np
+from psychrometric_functions import pressao_vapor_saturado_vetorizado, razao_mistura1, razao_mistura2, entalpia
+from psychrometric_functions import temperatura_b_seco, pressao_vapor, volume_especifico
+from psychrometric_functions import temperatura_ponto_orvalho, temperatura_b_molhado_vetorizado
+
+# Funções auxiliares compartilhadas pelos gráficos estático e interativo
+
+def sensor_arrays(sensor_data):
+    """
+    Extrai os arrays de temperatura e pressão de vapor dos dados de sensores
+
+    Args:
+        sensor_data: Dicionário com 'tbs' (°C) e 'pv' (kPa) ou 'ur' (%)
+
+    Returns:
+        tuple: Arrays (tbs, pv) apenas com os pontos válidos
+    """
+    tbs = np.asarray(sensor_data['tbs'], dtype=float).ravel()
+
+    if 'pv' in sensor_data:
+        pv = np.asarray(sensor_data['pv'], dtype=float).ravel()
+    else:
+        ur = np.asarray(sensor_data['ur'], dtype=float).ravel() / 100.0
+        pv = ur * pressao_vapor_saturado_vetorizado(tbs)
+
+    valid = np.isfinite(tbs) & np.isfinite(pv)
+    return tbs[valid], pv[valid]
+
+def bin_sensor_points(tbs, pv, tbs_range, pv_range, bins=(80, 50)):
+    """
+    Conta os pontos de sensores em uma grade regular no espaço (tbs, pv)
+
+    Args:
+        tbs: Array de temperaturas de bulbo seco (°C)
+        pv: Array de pressões parciais de vapor (kPa)
+        tbs_range: Tupla (mínimo, máximo) do eixo x (°C)
+        pv_range: Tupla (mínimo, máximo) do eixo y (kPa)
+        bins: Número de intervalos em (tbs, pv)
+
+    Returns:
+        tuple: (tbs_edges, pv_edges, counts), com counts no formato (pv, tbs)
+               e NaN nas células vazias
+    """
+    counts, tbs_edges, pv_edges = np.histogram2d(
+        tbs, pv, bins=bins, range=[tbs_range, pv_range]
+    )
+
+    # Transpor para o formato (linhas = pv, colunas = tbs) usado pelos gráficos
+    counts = counts.T
+    counts[counts == 0] = np.nan
+    return tbs_edges, pv_edges, counts
+
+# Faixa de temperatura suportada pelo GRAPSI (°C)
+TBS_LIMITS = (-100.0, 372.0)
+
+def data_temperatures(data):
+    """
+    Lista as temperaturas de bulbo seco presentes nos dados do gráfico
+
+    Args:
+        data: Dicionário com o tipo de dados e valores para plotar
+
+    Returns:
+        list: Temperaturas de bulbo seco (°C)
+    """
+    return [data[key] for key in ('tbs', 'tbs1', 'tbs2', 'tbs3') if key in data]
+
+def data_vapor_pressures(data):
+    """
+    Lista as pressões parciais de vapor presentes nos dados do gráfico
+
+    Args:
+        data: Dicionário com o tipo de dados e valores para plotar
+
+    Returns:
+        list: Pressões parciais de vapor (kPa)
+    """
+    values = []
+    if 'pv' in data:
+        values.append(data['pv'])
+    results = data.get('process_results')
+    if results:
+        for key in ('point1', 'point2', 'point3'):
+            if key in results:
+                values.append(results[key]['pv'])
+    return [v for v in values if v > 0]
+
+def adaptive_axes(data, patm):
+    """
+    Escolhe os limites e a escala dos eixos a partir dos dados
+
+    A faixa de temperatura acompanha os pontos (dentro de -100 a 372 °C) e o
+    eixo de pressão de vapor passa para escala logarítmica quando a curva de
+    saturação cobre mais de duas décadas.
+
+    Args:
+        data: Dicionário com o tipo de dados e valores para plotar
+        patm: Pressão atmosférica (kPa)
+
+    Returns:
+        dict: tbs_min, tbs_max (°C), pv_min, pv_max (kPa) e y_log (bool)
+    """
+    temps = data_temperatures(data)
+    if temps:
+        lo, hi = min(temps), max(temps)
+    else:
+        lo, hi = 10.0, 50.0
+
+    # Garantir uma largura mínima de 20 °C e uma margem de 10%
+    center = (lo + hi) / 2
+    half = max(hi - lo, 20.0) / 2 * 1.1
+    tbs_min = max(TBS_LIMITS[0], center - half)
+    tbs_max = min(TBS_LIMITS[1], center + half)
+
+    pv_sat_min, pv_sat_max = pressao_vapor_saturado_vetorizado([tbs_min, tbs_max])
+    pressures = data_vapor_pressures(data)
+
+    # Acima de 100 °C (ao nível do mar) a saturação passa de patm
+    pv_max = min(max([pv_sat_max] + pressures), patm) * 1.05
+    y_log = pv_max / pv_sat_min > 100
+
+    if y_log:
+        pv_min = min([pv_sat_min] + pressures) / 1.5
+    else:
+        pv_min = 0.0
+
+    return {
+        'tbs_min': tbs_min,
+        'tbs_max': tbs_max,
+        'pv_min': pv_min,
+        'pv_max': pv_max,
+        'y_log': bool(y_log)
+    }
+
+def adaptive_curve(func, s_min, s_max, x_span, y_span, y_log=False, tol=0.002,
+                   n_initial=9, max_iter=12):
+    """
+    Amostra uma curva paramétrica s -> (x, y) refinando só onde ela curva
+
+    Cada segmento é dividido ao meio enquanto o ponto médio real se afastar
+    da corda mais do que tol (fração do tamanho do eixo). Trechos quase
+    retos ficam com poucos vértices.
+
+    Args:
+        func: Função vetorizada que recebe um array s e retorna (x, y)
+        s_min: Valor inicial do parâmetro
+        s_max: Valor final do parâmetro
+        x_span: Largura do eixo x (mesma unidade de x)
+        y_span: Altura do eixo y (em décadas se y_log)
+        y_log: Medir o erro em log10(y)
+        tol: Erro máximo admitido, relativo aos eixos
+        n_initial: Número de pontos da amostragem inicial
+        max_iter: Número máximo de refinamentos
+
+    Returns:
+        tuple: Arrays (x, y) da curva amostrada
+    """
+    def normalize(x, y):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            y_t = np.log10(y) if y_log else y
+        return x / x_span, y_t / y_span
+
+    s = np.linspace(s_min, s_max, n_initial)
+    for _ in range(max_iter):
+        x, y = func(s)
+        s_mid = (s[:-1] + s[1:]) / 2
+        x_mid, y_mid = func(s_mid)
+
+        nx, ny = normalize(x, y)
+        mx, my = normalize(x_mid, y_mid)
+        err = np.hypot(mx - (nx[:-1] + nx[1:]) / 2, my - (ny[:-1] + ny[1:]) / 2)
+
+        refine = err > tol
+        if not refine.any():
+            break
+        s = np.sort(np.concatenate([s, s_mid[refine]]))
+
+    return func(s)
+
+def _nice_step(span, target=15):
+    """
+    Escolhe um passo "redondo" (1, 2 ou 5 x 10^n) para cerca de target divisões
+    """
+    raw = span / target
+    magnitude = 10 ** np.floor(np.log10(raw))
+    for factor in (1, 2, 5, 10):
+        if raw <= factor * magnitude:
+            return factor * magnitude
+    return 10 * magnitude
+
+def _clip_to_box(x, y, axes):
+    """
+    Mantém os pontos dentro dos limites do gráfico e um vizinho de cada lado
+
+    O vizinho externo garante que a linha chegue até a borda; o corte final
+    fica a cargo do matplotlib/Plotly, que já limitam o desenho aos eixos.
+    """
+    inside = ((axes['tbs_min'] <= x) & (x <= axes['tbs_max'])
+              & (y <= axes['pv_max']) & (y >= max(axes['pv_min'], 0)))
+    keep = inside.copy()
+    keep[1:] |= inside[:-1]
+    keep[:-1] |= inside[1:]
+    if axes['y_log']:
+        keep &= y > 0
+    return x[keep], y[keep]
+
+def _trim_saturated(x, y):
+    """
+    Remove o trecho acima da curva de saturação, interpolando o cruzamento
+    """
+    d = y - pressao_vapor_saturado_vetorizado(x)
+    unsaturated = d <= 0
+    if unsaturated.all() or not unsaturated.any():
+        return x[unsaturated], y[unsaturated]
+
+    # Cruzamentos entre amostras consecutivas
+    idx = np.nonzero(unsaturated[:-1] != unsaturated[1:])[0]
+    frac = d[idx] / (d[idx] - d[idx + 1])
+    x_cross = x[idx] + frac * (x[idx + 1] - x[idx])
+    y_cross = y[idx] + frac * (y[idx + 1] - y[idx])
+
+    order = np.argsort(np.concatenate([np.nonzero(unsaturated)[0], idx + frac]))
+    return (np.concatenate([x[unsaturated], x_cross])[order],
+            np.concatenate([y[unsaturated], y_cross])[order])
+
+def label_index(x, frac):
+    """
+    Índice do ponto mais próximo de uma fração da extensão em x da linha
+
+    Na amostragem adaptativa os vértices se concentram nas curvas, então a
+    posição do rótulo é escolhida pela coordenada e não pelo índice.
+
+    Args:
+        x: Array com as abscissas da linha
+        frac: Fração (0 a 1) entre o primeiro e o último ponto
+
+    Returns:
+        int: Índice do ponto escolhido
+    """
+    target = x[0] + frac * (x[-1] - x[0])
+    return int(np.argmin(np.abs(x - target)))
+
+def adaptive_isolines(axes, patm):
+    """
+    Gera as isolinhas do modo adaptativo (saturação, UR e entalpia)
+
+    Args:
+        axes: Dicionário retornado por adaptive_axes
+        patm: Pressão atmosférica (kPa)
+
+    Returns:
+        dict: 'saturation' -> (x, y), 'rh' -> lista de (ur %, x, y) e
+              'enthalpy' -> lista de (h, x, y)
+    """
+    tbs_min, tbs_max = axes['tbs_min'], axes['tbs_max']
+    x_span = tbs_max - tbs_min
+    if axes['y_log']:
+        y_span = np.log10(axes['pv_max']) - np.log10(axes['pv_min'])
+    else:
+        y_span = axes['pv_max'] - axes['pv_min']
+
+    def rh_curve(ur):
+        return lambda t: (t, ur * pressao_vapor_saturado_vetorizado(t))
+
+    saturation = _clip_to_box(*adaptive_curve(rh_curve(1.0), tbs_min, tbs_max, x_span, y_span,
+                                              axes['y_log']), axes)
+
+    rh = []
+    for ur in (10, 20, 30, 40, 50, 60, 70, 80, 90):
+        x, y = _clip_to_box(*adaptive_curve(rh_curve(ur / 100.0), tbs_min, tbs_max, x_span, y_span,
+                                            axes['y_log']), axes)
+        if len(x) > 1:
+            rh.append((ur, x, y))
+
+    # Linhas de entalpia parametrizadas por log10 da razão de mistura
+    pv_low = max(axes['pv_min'], 1e-4)
+    pv_high = min(axes['pv_max'], 0.99 * patm)
+    w_low = razao_mistura1(pv_low, patm)
+    w_high = razao_mistura1(pv_high, patm)
+    w_top = razao_mistura1(min(pv_high, 0.5 * patm), patm)
+
+    h_min = entalpia(tbs_min, 0.0)
+    h_max = entalpia(tbs_max, w_top)
+    step = _nice_step(h_max - h_min)
+
+    enthalpy = []
+    for h in np.arange(np.ceil(h_min / step) * step, h_max, step):
+        def h_curve(log_w, h=h):
+            w = 10 ** log_w
+            return temperatura_b_seco(h, w), pressao_vapor(w, patm)
+
+        x, y = _clip_to_box(*adaptive_curve(h_curve, np.log10(w_low), np.log10(w_high), x_span, y_span,
+                                            axes['y_log']), axes)
+
+        # Manter apenas a região não saturada (abaixo da curva de UR = 100%)
+        x, y = _trim_saturated(x, y)
+        if len(x) > 1:
+            enthalpy.append((float(h) + 0.0, x, y))
+
+    return {'saturation': saturation, 'rh': rh, 'enthalpy': enthalpy}
+
+@lru_cache(maxsize=64)
+def secondary_isolines(tbs_min, tbs_max, pv_min, pv_max, y_log, patm):
+    """
+    Gera as linhas de bulbo molhado e de volume específico constantes
+
+    As linhas são calculadas de forma vetorizada: as de bulbo molhado partem
+    do ponto de saturação e seguem a relação de razao_mistura2, e as de
+    volume específico isolam a temperatura na equação de volume_especifico.
+    O resultado fica em cache; os arrays retornados não devem ser alterados.
+
+    Args:
+        tbs_min: Temperatura mínima do eixo x (°C)
+        tbs_max: Temperatura máxima do eixo x (°C)
+        pv_min: Pressão de vapor mínima do eixo y (kPa)
+        pv_max: Pressão de vapor máxima do eixo y (kPa)
+        y_log: Eixo y em escala logarítmica
+        patm: Pressão atmosférica (kPa)
+
+    Returns:
+        dict: 'wet_bulb' -> lista de (tbm, x, y) e
+              'specific_volume' -> lista de (ve, x, y)
+    """
+    axes = {'tbs_min': tbs_min, 'tbs_max': tbs_max,
+            'pv_min': pv_min, 'pv_max': pv_max, 'y_log': y_log}
+    x_span = tbs_max - tbs_min
+    if y_log:
+        y_span = np.log10(pv_max) - np.log10(pv_min)
+    else:
+        y_span = pv_max - pv_min
+
+    # Linhas de temperatura de bulbo molhado constante
+    wet_bulb = []
+    step = _nice_step(tbs_max - tbs_min, target=10)
+    for tbm in np.arange(np.ceil(tbs_min / step) * step, tbs_max, step):
+        pv_sat = min(pressao_vapor_saturado_vetorizado(tbm), 0.99 * patm)
+        w_sat = razao_mistura1(pv_sat, patm)
+
+        # Temperatura em que a razão de mistura da linha chega a zero
+        tbs_end = min(tbs_max, tbm + (2501. - 2.411 * tbm) * w_sat / 1.006)
+
+        def wb_curve(t, tbm=tbm, w_sat=w_sat):
+            w = np.maximum(razao_mistura2(t, tbm, w_sat), 0.0)
+            return t, pressao_vapor(w, patm)
+
+        x, y = _clip_to_box(*adaptive_curve(wb_curve, tbm, tbs_end, x_span, y_span, y_log), axes)
+        x, y = _trim_saturated(x, y)
+        if len(x) > 1:
+            wet_bulb.append((float(tbm) + 0.0, x, y))
+
+    # Linhas de volume específico constante
+    pv_high = min(pv_max, 0.99 * patm)
+    w_high = razao_mistura1(pv_high, patm)
+    w_top = razao_mistura1(min(pv_high, 0.5 * patm), patm)
+    v_min = volume_especifico(tbs_min, 0.0, patm)
+    v_max = volume_especifico(tbs_max, w_top, patm)
+
+    if y_log:
+        # Parâmetro em log10(w) para cobrir várias décadas de pressão
+        s_min, s_max = np.log10(razao_mistura1(max(pv_min, 1e-6), patm)), np.log10(w_high)
+        to_w = lambda s: 10 ** s
+    else:
+        s_min, s_max = 0.0, w_high
+        to_w = lambda s: s
+
+    specific_volume = []
+    step = _nice_step(v_max - v_min, target=10)
+    for ve in np.arange(np.ceil(v_min / step) * step, v_max, step):
+        def ve_curve(s, ve=ve):
+            w = to_w(s)
+            t = ve * patm / (0.28705 * (1 + 1.6078 * w)) - 273.16
+            return t, pressao_vapor(w, patm)
+
+        x, y = _clip_to_box(*adaptive_curve(ve_curve, s_min, s_max, x_span, y_span, y_log), axes)
+        x, y = _trim_saturated(x, y)
+        if len(x) > 1:
+            specific_volume.append((float(ve), x, y))
+
+    return {'wet_bulb': wet_bulb, 'specific_volume': specific_volume}
+
+@lru_cache(maxsize=16)
+def property_grid(tbs_min, tbs_max, pv_min, pv_max, y_log, patm, shape=(40, 30)):
+    """
+    Calcula as propriedades em uma grade regular (tbs, pv) para o hover
+
+    Todas as células são resolvidas de uma vez com as funções vetorizadas.
+    O resultado fica em cache por limites e pressão; os arrays retornados
+    não devem ser alterados.
+
+    Args:
+        tbs_min: Temperatura mínima do eixo x (°C)
+        tbs_max: Temperatura máxima do eixo x (°C)
+        pv_min: Pressão de vapor mínima do eixo y (kPa)
+        pv_max: Pressão de vapor máxima do eixo y (kPa)
+        y_log: Espaçamento logarítmico em pv
+        patm: Pressão atmosférica (kPa)
+        shape: Número de células em (tbs, pv)
+
+    Returns:
+        dict: 'tbs' e 'pv' (coordenadas), 'ur', 'rm', 'e', 'tbm' e 'tpo'
+              no formato (pv, tbs), com NaN acima da saturação
+    """
+    tbs = np.linspace(tbs_min, tbs_max, shape[0])
+    if y_log:
+        pv = np.geomspace(max(pv_min, 1e-6), pv_max, shape[1])
+    else:
+        # Evitar pv = 0, onde o ponto de orvalho não é definido
+        pv = np.linspace(max(pv_min, 0.01 * (pv_max - pv_min) / shape[1]), pv_max, shape[1])
+
+    t_grid, pv_grid = np.meshgrid(tbs, pv)
+    ur = pv_grid / pressao_vapor_saturado_vetorizado(t_grid)
+    valid = (ur <= 1) & (pv_grid < patm)
+
+    pv_valid = np.where(valid, pv_grid, np.nan)
+    rm = razao_mistura1(pv_valid, patm)
+    e = entalpia(t_grid, rm)
+    tbm = temperatura_b_molhado_vetorizado(t_grid, np.where(valid, e, 0.0), patm)
+
+    return {
+        'tbs': tbs,
+        'pv': pv,
+        'ur': np.where(valid, ur * 100, np.nan),
+        'rm': rm * 1000,
+        'e': e,
+        'tbm': np.where(valid, tbm, np.nan),
+        'tpo': temperatura_ponto_orvalho(pv_valid)
+    }
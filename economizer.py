@@ -0,0 +1,188 @@
+import argparse
+import time
+
+import numpy as np
+
+from psychrometric_functions import entalpia, pressao_vapor, temperatura_ponto_orvalho, temperatura_b_seco
+from psychrometric_functions import pressao_vapor_saturado_vetorizado
+from psychrometric_batch import calculate_from_tbs_ur_batch
+
+# Economizador: fração ótima de ar externo na mistura com o ar de retorno.
+#
+# Com a fração mássica x de ar externo (base ar seco), a mistura de
+# calculate_mistura_fluxos é linear em x na razão de mistura e na entalpia:
+#   rm(x) = rm_r + x (rm_e - rm_r)      e(x) = e_r + x (e_e - e_r)
+# Depois da mistura, a serpentina leva o ar à temperatura de insuflamento:
+#   - rm dentro dos limites: aquecimento ou resfriamento sensível, com
+#     energia e(t_ins, rm(x)) - e(x), também linear em x;
+#   - rm acima de rm_max: resfriamento até o ponto de orvalho de rm_max
+#     (desumidificação) e reaquecimento até t_ins;
+#   - rm abaixo de rm_min: aquecimento sensível e umidificação até rm_min.
+# O custo é linear por trechos em x, com quebras onde a mistura atinge t_ins,
+# rm_max ou rm_min. O mínimo está em um desses pontos ou nos limites de x, e
+# cada passo de tempo avalia apenas esses candidatos, em forma vetorizada
+# sobre toda a série de clima.
+
+ENERGY_KEYS = ('cooling', 'heating', 'reheat', 'humidification')
+
+def coil_energy(rm, e, supply_tbs, patm=101.325, rm_max=None, rm_min=None):
+    """
+    Energia da serpentina para levar o ar misturado ao insuflamento
+
+    Args:
+        rm: Razão de mistura do ar misturado (decimal)
+        e: Entalpia do ar misturado (kJ/kg)
+        supply_tbs: Temperatura de insuflamento (°C)
+        patm: Pressão atmosférica (kPa)
+        rm_max: Razão de mistura máxima do insuflamento (decimal), ou None
+        rm_min: Razão de mistura mínima do insuflamento (decimal), ou None
+
+    Returns:
+        dict: Arrays 'cooling', 'heating', 'reheat' e 'humidification' (kJ/kg de ar seco)
+    """
+    rm, e, supply_tbs = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (rm, e, supply_tbs)))
+    zero = np.zeros(rm.shape)
+    wet = np.zeros(rm.shape, dtype=bool)
+    cooling, reheat, humidification = zero, zero, zero
+
+    if rm_max is not None:
+        # Desumidificação: resfriamento até a saturação em rm_max e reaquecimento
+        wet = rm > rm_max * (1 + 1e-9)
+        e_coil = entalpia(temperatura_ponto_orvalho(pressao_vapor(rm_max, patm)), rm_max)
+        cooling = np.where(wet, e - e_coil, 0.0)
+        reheat = np.where(wet, np.maximum(entalpia(supply_tbs, rm_max) - e_coil, 0.0), 0.0)
+
+    if rm_min is not None:
+        # Umidificação a vapor na temperatura de insuflamento
+        dry = rm < rm_min * (1 - 1e-9)
+        humidification = np.where(dry, entalpia(supply_tbs, rm_min) - entalpia(supply_tbs, rm), 0.0)
+
+    # Troca de calor sensível até a temperatura de insuflamento
+    sensible = np.where(wet, 0.0, entalpia(supply_tbs, rm) - e)
+    return {
+        'cooling': cooling + np.maximum(-sensible, 0.0),
+        'heating': np.maximum(sensible, 0.0),
+        'reheat': reheat,
+        'humidification': humidification
+    }
+
+def _crossing(value, start, end):
+    """
+    Fração x em que start + x (end - start) atinge value (NaN sem cruzamento)
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = (value - start) / (end - start)
+    return np.where(np.isfinite(x), x, np.nan)
+
+def optimize_outdoor_fraction(outdoor_tbs, outdoor_ur, return_tbs, return_ur, supply_tbs, patm=101.325,
+                              rm_max=None, rm_min=None, min_fraction=0.2, max_fraction=1.0,
+                              airflow=10000.0, cooling_cop=1.0, heating_efficiency=1.0, dt=1.0):
+    """
+    Fração de ar externo que minimiza a energia da serpentina em cada passo
+
+    Args:
+        outdoor_tbs: Temperatura do ar externo (°C), array
+        outdoor_ur: Umidade relativa do ar externo (decimal), array
+        return_tbs: Temperatura do ar de retorno (°C), escalar ou array
+        return_ur: Umidade relativa do ar de retorno (decimal), escalar ou array
+        supply_tbs: Temperatura de insuflamento (°C), escalar ou array
+        patm: Pressão atmosférica (kPa)
+        rm_max: Razão de mistura máxima do insuflamento (g/kg), ou None
+        rm_min: Razão de mistura mínima do insuflamento (g/kg), ou None
+        min_fraction: Fração mássica mínima de ar externo (ventilação)
+        max_fraction: Fração mássica máxima de ar externo
+        airflow: Vazão de insuflamento (m³/h, nas condições do retorno)
+        cooling_cop: Coeficiente de desempenho do resfriamento (peso da energia de resfriamento)
+        heating_efficiency: Rendimento do aquecimento, reaquecimento e umidificação
+        dt: Duração de cada passo (h)
+
+    Returns:
+        dict: Por passo, 'fraction' ótima, 'outdoor_airflow' (m³/h), 'mixed'
+              (estado da mistura, como em calculate_from_tbs_ur_batch), energias
+              'cooling', 'heating', 'reheat' e 'humidification' (kWh térmicos),
+              'cost' (kWh ponderados), 'baseline_cost' com min_fraction e 'savings'
+    """
+    with np.errstate(all='ignore'):
+        outdoor = calculate_from_tbs_ur_batch(outdoor_tbs, outdoor_ur, patm)
+        returned = calculate_from_tbs_ur_batch(*np.broadcast_arrays(return_tbs, return_ur), patm)
+    rm_o, e_o = outdoor['rm'] / 1000.0, outdoor['e']
+    rm_r, e_r = returned['rm'] / 1000.0, returned['e']
+    supply_tbs = np.asarray(supply_tbs, dtype=float)
+    rm_max = None if rm_max is None else rm_max / 1000.0
+    rm_min = None if rm_min is None else rm_min / 1000.0
+
+    def weighted(energy):
+        return (energy['cooling'] / cooling_cop
+                + (energy['heating'] + energy['reheat'] + energy['humidification']) / heating_efficiency)
+
+    def evaluate(x):
+        rm = rm_r + x * (rm_o - rm_r)
+        e = e_r + x * (e_o - e_r)
+        return rm, e, coil_energy(rm, e, supply_tbs, patm, rm_max, rm_min)
+
+    # Candidatos: limites de x e quebras do custo (mistura em t_ins, rm_max, rm_min)
+    candidates = [np.full(rm_o.shape, float(min_fraction)), np.full(rm_o.shape, float(max_fraction)),
+                  _crossing(0.0, entalpia(supply_tbs, rm_r) - e_r, entalpia(supply_tbs, rm_o) - e_o)]
+    for limit in (rm_max, rm_min):
+        if limit is not None:
+            candidates.append(_crossing(limit, rm_r, rm_o))
+    x = np.clip(np.stack(np.broadcast_arrays(*candidates)), min_fraction, max_fraction)
+    with np.errstate(invalid='ignore'):
+        cost = weighted(evaluate(x)[2])
+    cost = np.where(np.isfinite(cost), cost, np.inf)
+
+    # Menor custo; em empates, a maior fração de ar externo
+    best = cost.min(axis=0)
+    fraction = np.where(cost <= best + 1e-9 * (1 + np.abs(best)), x, -np.inf).max(axis=0)
+    fraction = np.where(np.isfinite(best), fraction, np.nan)
+
+    with np.errstate(invalid='ignore'):
+        rm, e, energy = evaluate(fraction)
+        baseline = weighted(evaluate(np.full(fraction.shape, float(min_fraction)))[2])
+        tbs = temperatura_b_seco(e, rm)
+        ur = pressao_vapor(rm, patm) / pressao_vapor_saturado_vetorizado(tbs)
+        mixed = calculate_from_tbs_ur_batch(tbs, ur, patm)
+
+    # Massa de ar seco por hora e conversão de kJ/kg para kWh por passo
+    mass = airflow / returned['ve']
+    to_kwh = mass * dt / 3600.0
+    result = {key: energy[key] * to_kwh for key in ENERGY_KEYS}
+    result.update({
+        'fraction': fraction,
+        'outdoor_airflow': fraction * mass * outdoor['ve'],
+        'mixed': mixed,
+        'cost': best * to_kwh,
+        'baseline_cost': baseline * to_kwh,
+        'savings': (baseline - best) * to_kwh
+    })
+    return result
+
+if __name__ == '__main__':
+    from aeration import synthetic_weather, load_weather
+
+    parser = argparse.ArgumentParser(description='Fração ótima de ar externo (economizador)')
+    parser.add_argument('--weather', help='CSV com colunas time, tbs (°C) e ur (%%); padrão: série sintética')
+    parser.add_argument('--years', type=float, default=1)
+    parser.add_argument('--return-tbs', type=float, default=24.0)
+    parser.add_argument('--return-ur', type=float, default=0.5)
+    parser.add_argument('--supply-tbs', type=float, default=14.0)
+    parser.add_argument('--rm-max', type=float, default=9.0, help='g/kg')
+    parser.add_argument('--min-fraction', type=float, default=0.2)
+    parser.add_argument('--cop', type=float, default=3.0)
+    args = parser.parse_args()
+
+    weather = load_weather(args.weather) if args.weather else synthetic_weather(args.years)
+    start = time.perf_counter()
+    result = optimize_outdoor_fraction(weather['tbs'], weather['ur'], args.return_tbs, args.return_ur,
+                                       args.supply_tbs, rm_max=args.rm_max, min_fraction=args.min_fraction,
+                                       cooling_cop=args.cop)
+    elapsed = time.perf_counter() - start
+
+    fraction = result['fraction']
+    print(f'hours: {fraction.size}, solved in {elapsed * 1000:.1f} ms')
+    print(f'mean outdoor fraction: {np.nanmean(fraction):.2f}, '
+          f'hours at 100% outdoor air: {int(np.sum(fraction >= 1.0))}')
+    for key in ENERGY_KEYS:
+        print(f'{key:15s} {np.nansum(result[key]):12.0f} kWh')
+    print(f'{"cost":15s} {np.nansum(result["cost"]):12.0f} kWh '
+          f'(minimum outdoor air: {np.nansum(result["baseline_cost"]):.0f} kWh)')
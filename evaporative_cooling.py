@@ -0,0 +1,208 @@
+import argparse
+import time
+
+import numpy as np
+
+from psychrometric_functions import pressao_vapor_saturado_vetorizado, razao_mistura1
+from psychrometric_functions import temperatura_b_seco, temperatura_b_molhado_vetorizado
+from psychrometric_batch import calculate_from_tbs_ur_batch, calculate_aquece_resfria_batch
+from psychrometric_batch import calculate_u_adiabatica_tbs_batch
+
+# Resfriadores evaporativos direto e indireto, definidos pela efetividade de
+# saturação, sobre séries de clima.
+#
+#   direto     t2 = t1 - ef (t1 - tbm1); umidificação adiabática (entalpia
+#              constante, calculate_u_adiabatica_tbs_batch)
+#   indireto   t2 = t1 - ef (t1 - tbm_s); resfriamento sensível do ar primário
+#              (calculate_aquece_resfria_batch), com o calor levado pelo ar
+#              secundário, que sai saturado e consome a água evaporada
+#
+# Com setpoint, o resfriador só opera nas horas em que o ar de entrada está
+# acima dele; nas demais o ar passa sem alteração e sem consumo de água. Em
+# qualquer caso ele não opera quando a superfície molhada, que fica na
+# temperatura de bulbo molhado do ar que a atravessa (o de entrada no direto,
+# o secundário no indireto), estaria a MIN_WET_BULB ou abaixo: horas de
+# congelamento não entram nos totais.
+#
+#   cooler = direct_evaporative(weather['tbs'], weather['ur'], effectiveness=0.8, airflow=50000)
+#   cooler['outlet']['tbs'], cooler['water']
+
+# Temperatura de bulbo molhado até a qual o resfriador fica desligado (°C)
+MIN_WET_BULB = 0.0
+
+def _mass_flow(airflow, state):
+    """
+    Vazão mássica de ar seco (kg/h) a partir da vazão volumétrica na entrada (m³/h)
+    """
+    return airflow / state['ve']
+
+def _saturated_rm(e, patm):
+    """
+    Razão de mistura do ar saturado com entalpia e (decimal)
+    """
+    t_sat = temperatura_b_molhado_vetorizado(temperatura_b_seco(e, 0.0), e, patm)
+    return razao_mistura1(pressao_vapor_saturado_vetorizado(t_sat), patm)
+
+def _summary(inlet, outlet, mass, water, running, bleed_off, dt):
+    """
+    Resultado comum dos resfriadores
+    """
+    cooling = mass * (1.006 + 1.775 * outlet['rm'] / 1000.0) * (inlet['tbs'] - outlet['tbs']) / 3600.0
+    water = np.where(running, water, 0.0) * (1 + bleed_off)
+    return {
+        'inlet': inlet,
+        'outlet': outlet,
+        'running': running,
+        'water': water,
+        'sensible_cooling': cooling,
+        'total_water': float(np.nansum(water) * dt),
+        'hours': float(np.sum(running) * dt)
+    }
+
+def _running(tbs, setpoint, wet, min_wet_bulb):
+    """
+    Horas de operação: superfície molhada acima de min_wet_bulb e, com setpoint, ar acima dele
+    """
+    tbs = np.asarray(tbs, dtype=float)
+    running = np.isfinite(tbs) & (wet['tbm'] > min_wet_bulb)
+    if setpoint is not None:
+        running &= tbs > setpoint
+    return running
+
+def direct_evaporative(tbs, ur, effectiveness=0.85, airflow=10000.0, patm=101.325, setpoint=None,
+                       bleed_off=0.0, dt=1.0, min_wet_bulb=MIN_WET_BULB):
+    """
+    Resfriador evaporativo direto (painel evaporativo, nebulização)
+
+    Args:
+        tbs: Temperatura do ar de entrada (°C), array
+        ur: Umidade relativa do ar de entrada (decimal), array
+        effectiveness: Efetividade de saturação (0 a 1), escalar ou array
+        airflow: Vazão de ar na entrada (m³/h)
+        patm: Pressão atmosférica (kPa)
+        setpoint: Temperatura de entrada acima da qual o resfriador opera (°C)
+        bleed_off: Água de purga, como fração da água evaporada
+        dt: Duração de cada passo (h)
+        min_wet_bulb: Bulbo molhado do ar de entrada até o qual o resfriador fica desligado (°C)
+
+    Returns:
+        dict: Estados 'inlet' e 'outlet' (como nas funções em lote), 'running',
+              'water' (kg/h), 'sensible_cooling' (kW), 'total_water' (kg) e
+              'hours' de operação
+    """
+    with np.errstate(all='ignore'):
+        inlet = calculate_from_tbs_ur_batch(tbs, ur, patm)
+        running = _running(tbs, setpoint, inlet, min_wet_bulb)
+        ef = np.where(running, effectiveness, 0.0)
+        tbs2 = inlet['tbs'] - ef * (inlet['tbs'] - inlet['tbm'])
+        outlet = calculate_u_adiabatica_tbs_batch(inlet['tbs'], inlet['ur'] / 100.0, tbs2, patm)['point2']
+    mass = _mass_flow(airflow, inlet)
+    water = mass * (outlet['rm'] - inlet['rm']) / 1000.0
+    return _summary(inlet, outlet, mass, water, running, bleed_off, dt)
+
+def indirect_evaporative(tbs, ur, effectiveness=0.6, airflow=10000.0, secondary_ratio=1.0,
+                         secondary_tbs=None, secondary_ur=None, patm=101.325, setpoint=None,
+                         bleed_off=0.0, dt=1.0, min_wet_bulb=MIN_WET_BULB):
+    """
+    Resfriador evaporativo indireto (trocador com canal secundário molhado)
+
+    Args:
+        tbs: Temperatura do ar primário de entrada (°C), array
+        ur: Umidade relativa do ar primário de entrada (decimal), array
+        effectiveness: Efetividade de bulbo molhado, em relação ao tbm do ar secundário
+        airflow: Vazão de ar primário na entrada (m³/h)
+        secondary_ratio: Vazão mássica de ar secundário / ar primário
+        secondary_tbs: Temperatura do ar secundário (°C); padrão: o próprio ar de entrada
+        secondary_ur: Umidade relativa do ar secundário (decimal); padrão: o próprio ar de entrada
+        patm: Pressão atmosférica (kPa)
+        setpoint: Temperatura de entrada acima da qual o resfriador opera (°C)
+        bleed_off: Água de purga, como fração da água evaporada
+        dt: Duração de cada passo (h)
+        min_wet_bulb: Bulbo molhado do ar secundário até o qual o resfriador fica desligado (°C)
+
+    Returns:
+        dict: Como em direct_evaporative, mais 'secondary' (estado de entrada do ar secundário)
+    """
+    with np.errstate(all='ignore'):
+        inlet = calculate_from_tbs_ur_batch(tbs, ur, patm)
+        if secondary_tbs is None:
+            secondary = inlet
+        else:
+            secondary = calculate_from_tbs_ur_batch(secondary_tbs, secondary_ur, patm)
+        running = _running(tbs, setpoint, secondary, min_wet_bulb)
+        ef = np.where(running, effectiveness, 0.0)
+        tbs2 = inlet['tbs'] - ef * (inlet['tbs'] - secondary['tbm'])
+        outlet = calculate_aquece_resfria_batch(inlet['tbs'], inlet['ur'] / 100.0, tbs2, patm)['point2']
+
+        # Calor retirado do ar primário absorvido pelo secundário, que sai saturado
+        mass = _mass_flow(airflow, inlet)
+        heat = inlet['e'] - outlet['e']  # kJ/kg de ar primário
+        e_secondary = secondary['e'] + heat / secondary_ratio
+        water = mass * secondary_ratio * (_saturated_rm(e_secondary, patm) - secondary['rm'] / 1000.0)
+    result = _summary(inlet, outlet, mass, np.maximum(water, 0.0), running, bleed_off, dt)
+    result['secondary'] = secondary
+    return result
+
+def indirect_direct_evaporative(tbs, ur, indirect_effectiveness=0.6, direct_effectiveness=0.85,
+                                airflow=10000.0, patm=101.325, setpoint=None, bleed_off=0.0, dt=1.0,
+                                **indirect_options):
+    """
+    Resfriador em dois estágios: indireto seguido de direto
+
+    Args:
+        tbs: Temperatura do ar de entrada (°C), array
+        ur: Umidade relativa do ar de entrada (decimal), array
+        indirect_effectiveness: Efetividade do estágio indireto
+        direct_effectiveness: Efetividade do estágio direto
+        airflow: Vazão de ar na entrada (m³/h)
+        patm: Pressão atmosférica (kPa)
+        setpoint: Temperatura de entrada acima da qual o resfriador opera (°C)
+        bleed_off: Água de purga, como fração da água evaporada
+        dt: Duração de cada passo (h)
+        **indirect_options: Demais argumentos de indirect_evaporative
+
+    Returns:
+        dict: Como em direct_evaporative, com 'stage1' (indireto) e 'stage2' (direto)
+    """
+    stage1 = indirect_evaporative(tbs, ur, indirect_effectiveness, airflow, patm=patm, setpoint=setpoint,
+                                  bleed_off=bleed_off, dt=dt, **indirect_options)
+    running = stage1['running']
+    # A massa de ar seco é a mesma nos dois estágios; a vazão volumétrica muda com ve
+    middle = stage1['outlet']
+    stage2 = direct_evaporative(middle['tbs'], middle['ur'] / 100.0, np.where(running, direct_effectiveness, 0.0),
+                                airflow * middle['ve'] / stage1['inlet']['ve'], patm, None, bleed_off, dt,
+                                indirect_options.get('min_wet_bulb', MIN_WET_BULB))
+    mass = _mass_flow(airflow, stage1['inlet'])
+    result = _summary(stage1['inlet'], stage2['outlet'], mass,
+                      (stage1['water'] + stage2['water']) / (1 + bleed_off), running, bleed_off, dt)
+    result.update({'stage1': stage1, 'stage2': stage2})
+    return result
+
+if __name__ == '__main__':
+    from aeration import synthetic_weather, load_weather
+
+    parser = argparse.ArgumentParser(description='Resfriamento evaporativo sobre uma série de clima')
+    parser.add_argument('--weather', help='CSV com colunas time, tbs (°C) e ur (%%); padrão: série sintética')
+    parser.add_argument('--years', type=float, default=1)
+    parser.add_argument('--airflow', type=float, default=50000.0, help='m³/h')
+    parser.add_argument('--setpoint', type=float, default=24.0, help='°C')
+    args = parser.parse_args()
+
+    weather = load_weather(args.weather) if args.weather else synthetic_weather(args.years)
+    models = {
+        'direct': lambda: direct_evaporative(weather['tbs'], weather['ur'], 0.85, args.airflow,
+                                             setpoint=args.setpoint),
+        'indirect': lambda: indirect_evaporative(weather['tbs'], weather['ur'], 0.6, args.airflow,
+                                                 setpoint=args.setpoint),
+        'indirect-direct': lambda: indirect_direct_evaporative(weather['tbs'], weather['ur'], 0.6, 0.85,
+                                                               args.airflow, setpoint=args.setpoint)
+    }
+    print(f'{"model":16s} {"hours":>7s} {"water m3":>9s} {"mean dT":>8s} {"max UR":>7s} {"ms":>7s}')
+    for name, model in models.items():
+        start = time.perf_counter()
+        result = model()
+        elapsed = (time.perf_counter() - start) * 1000
+        running = result['running']
+        drop = (result['inlet']['tbs'] - result['outlet']['tbs'])[running]
+        print(f'{name:16s} {result["hours"]:7.0f} {result["total_water"] / 1000:9.1f} '
+              f'{np.mean(drop):8.2f} {np.max(result["outlet"]["ur"][running]):7.1f} {elapsed:7.1f}')
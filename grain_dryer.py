@@ -0,0 +1,172 @@
+import numpy as np
+from psychrometric_functions import pressao_vapor_saturado_vetorizado, razao_mistura1, pressao_vapor
+from psychrometric_functions import entalpia, temperatura_b_seco, temperatura_b_molhado_vetorizado
+from psychrometric_batch import calculate_aquece_resfria_batch
+from grain_moisture import coeficientes_produto, umidade_equilibrio, verificar_temperatura
+
+# Simulação de secagem em camada espessa (leito fixo), no estilo do modelo
+# de Thompson.
+#
+# A cada passo de tempo o ar ambiente passa pelo aquecedor (processo de
+# aquecimento de psychrometric_batch, vetorizado sobre toda a série de clima)
+# e atravessa o leito, dividido em camadas. Em cada camada:
+#   1. o ar troca calor sensível com o grão até a temperatura de equilíbrio;
+#   2. o grão perde (ou ganha) água segundo o modelo exponencial de camada
+#      fina, M = Me + (M0 - Me) exp(-k dt), com Me do modelo de equilíbrio de
+#      grain_moisture e k = k0 exp(-Ea/R / T);
+#   3. a água evaporada umidifica o ar à entalpia constante (umidificação
+#      adiabática), limitada pela saturação; o excesso condensa na camada.
+#
+# A camada i no passo n depende apenas do ar que sai da camada i-1 no passo n
+# e do próprio grão no passo n-1. As atualizações seguem, portanto, as
+# diagonais k = n + i: em cada iteração todas as camadas avançam juntas, cada
+# uma no seu passo, com o mesmo resultado da varredura sequencial camada a
+# camada e n_passos + camadas - 1 iterações vetorizadas.
+
+# Constantes do modelo exponencial de camada fina (k0 em 1/h, Ea/R em K).
+# Valores ilustrativos para milho (meia-vida de ~1 h com ar a 60 °C); ajustar
+# ao produto e ao secador.
+CONSTANTES_SECAGEM = (4.0e5, 4416.0)
+
+def _saturacao_entalpia(h, patm):
+    """
+    Razão de mistura do ar saturado com entalpia h
+    """
+    tbm = temperatura_b_molhado_vetorizado(temperatura_b_seco(h, 0.0), h, patm)
+    return razao_mistura1(pressao_vapor_saturado_vetorizado(tbm), patm)
+
+def _umidade_relativa(t, w, patm):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.clip(pressao_vapor(w, patm) / pressao_vapor_saturado_vetorizado(t), 1e-6, 0.99999)
+
+def simulate_deep_bed(weather_tbs, weather_ur, dt=0.25, setpoint=None, airflow=10.0, depth=1.0,
+                      layers=100, initial_moisture=25.0, initial_temperature=None, target_moisture=None,
+                      product='milho', model='henderson', drying_constants=CONSTANTES_SECAGEM,
+                      bulk_density=600.0, grain_specific_heat=1.35, patm=101.325, record_every=1,
+                      coefficients=None):
+    """
+    Simula a secagem de um leito fixo de grãos com ar aquecido ou natural
+
+    O GAB modificado não vale até 5 °C (grain_moisture.TEMPERATURA_MINIMA);
+    ar de entrada ou grão nessa faixa geram ValueError com esse modelo.
+
+    Args:
+        weather_tbs: Temperatura do ar ambiente a cada passo (°C), array
+        weather_ur: Umidade relativa do ar ambiente a cada passo (decimal), array
+        dt: Passo de tempo (h)
+        setpoint: Temperatura de saída do aquecedor (°C); None para ar natural.
+                  Com o ambiente acima do setpoint o aquecedor fica desligado
+        airflow: Vazão específica de ar (m³/min por m² de piso), na saída do aquecedor
+        depth: Altura do leito (m)
+        layers: Número de camadas
+        initial_moisture: Umidade inicial do grão (% base seca), escalar ou por camada
+        initial_temperature: Temperatura inicial do grão (°C); padrão: primeira leitura
+        target_moisture: Umidade média final desejada (% base seca), para o tempo de secagem
+        product: Produto da tabela de grain_moisture.COEFICIENTES
+        model: Modelo de umidade de equilíbrio
+        drying_constants: (k0 em 1/h, Ea/R em K) do modelo de camada fina
+        bulk_density: Massa específica do leito em matéria seca (kg/m³)
+        grain_specific_heat: Calor específico da matéria seca (kJ/kg K)
+        patm: Pressão atmosférica (kPa)
+        record_every: Intervalo de passos entre os perfis guardados
+        coefficients: Tupla (A, B, C) usada no lugar da tabela de produtos
+
+    Returns:
+        dict: 'time' (h) e perfis 'moisture' e 'grain_temperature' (registro x
+              camada); por passo, 'mean_moisture', ar de saída
+              'outlet_tbs'/'outlet_ur' (%)/'outlet_rm' (g/kg), 'inlet' (pontos do
+              aquecedor), 'heater_energy' acumulada (kJ/m²) e 'water_removed'
+              acumulada (kg/m²); e 'drying_time' (h) até target_moisture
+    """
+    weather_tbs, weather_ur = np.broadcast_arrays(np.asarray(weather_tbs, dtype=float),
+                                                  np.asarray(weather_ur, dtype=float))
+    n_steps = weather_tbs.size
+    coeficientes = coeficientes_produto(model, product) if coefficients is None else coefficients
+    k0, ea_r = drying_constants
+
+    # Aquecedor: uma única chamada vetorizada para toda a série de clima
+    saida_aquecedor = weather_tbs if setpoint is None else np.maximum(setpoint, weather_tbs)
+    with np.errstate(all='ignore'):
+        inlet = calculate_aquece_resfria_batch(weather_tbs, weather_ur, saida_aquecedor, patm)
+    t_in = inlet['point2']['tbs']
+    w_in = inlet['point2']['rm'] / 1000.0
+    h_in = inlet['point2']['e']
+    # Massa de ar seco por m² de piso em cada passo (kg)
+    massa_ar = airflow / inlet['point2']['ve'] * 60.0 * dt
+    energia_aquecedor = np.cumsum(massa_ar * (h_in - inlet['point1']['e']))
+
+    # Estado inicial do leito
+    massa_camada = bulk_density * depth / layers  # kg de matéria seca por m²
+    m = np.broadcast_to(np.asarray(initial_moisture, dtype=float), (layers,)).copy()
+    theta = np.full(layers, weather_tbs[0] if initial_temperature is None else initial_temperature, dtype=float)
+    verificar_temperatura(model, np.concatenate((t_in, theta)))
+
+    # Histórico por passo (linha 0: estado inicial) e ar que sai de cada camada
+    moisture = np.empty((n_steps + 1, layers))
+    grain_temperature = np.empty((n_steps + 1, layers))
+    moisture[0], grain_temperature[0] = m, theta
+    t_sai = np.zeros(layers)
+    w_sai = np.zeros(layers)
+    outlet_tbs = np.empty(n_steps)
+    outlet_w = np.empty(n_steps)
+    camadas = np.arange(layers)
+
+    for k in range(n_steps + layers - 1):
+        passo = k - camadas
+        ativa = (passo >= 0) & (passo < n_steps)
+        i = camadas[ativa]
+        n = passo[ativa]
+        primeira = k if k < n_steps else 0
+
+        # Ar de entrada: aquecedor na primeira camada, saída da camada anterior nas demais
+        t_ent = np.concatenate(([t_in[primeira]], t_sai[:-1]))[i]
+        w_ent = np.concatenate(([w_in[primeira]], w_sai[:-1]))[i]
+        g = massa_ar[n]
+
+        # 1. Troca de calor sensível até o equilíbrio entre ar e grão
+        capacidade_ar = g * (1.006 + 1.775 * w_ent)
+        capacidade_grao = massa_camada * (grain_specific_heat + 4.186 * m[i] / 100.0)
+        t_eq = (capacidade_ar * t_ent + capacidade_grao * theta[i]) / (capacidade_ar + capacidade_grao)
+        h = entalpia(t_eq, w_ent)
+
+        # 2. Secagem em camada fina; a camada não retira do ar mais água do que ele contém
+        me = umidade_equilibrio(_umidade_relativa(t_eq, w_ent, patm), t_eq, model, coeficientes)
+        taxa = k0 * np.exp(-ea_r / (t_eq + 273.15))
+        d = massa_camada * (m[i] - (me + (m[i] - me) * np.exp(-taxa * dt))) / 100.0 / g
+        d = np.maximum(d, -w_ent)
+
+        # 3. Umidificação adiabática limitada pela saturação
+        w = np.minimum(w_ent + d, _saturacao_entalpia(h, patm))
+        m[i] = m[i] - (w - w_ent) * g / massa_camada * 100.0
+        t_sai[i] = temperatura_b_seco(h, w)
+        w_sai[i] = w
+        theta[i] = t_sai[i]
+
+        moisture[n + 1, i] = m[i]
+        grain_temperature[n + 1, i] = theta[i]
+        if ativa[-1]:
+            outlet_tbs[n[-1]] = t_sai[-1]
+            outlet_w[n[-1]] = w_sai[-1]
+
+    mean_moisture = moisture[1:].mean(axis=1)
+    agua_removida = massa_ar * (outlet_w - w_in)
+
+    drying_time = None
+    if target_moisture is not None:
+        atingido = np.nonzero(mean_moisture <= target_moisture)[0]
+        if atingido.size:
+            drying_time = (atingido[0] + 1) * dt
+
+    return {
+        'time': np.arange(0, n_steps + 1, record_every) * dt,
+        'moisture': moisture[::record_every],
+        'grain_temperature': grain_temperature[::record_every],
+        'mean_moisture': mean_moisture,
+        'outlet_tbs': outlet_tbs,
+        'outlet_ur': _umidade_relativa(outlet_tbs, outlet_w, patm) * 100,
+        'outlet_rm': outlet_w * 1000,
+        'inlet': inlet,
+        'heater_energy': energia_aquecedor,
+        'water_removed': np.cumsum(agua_removida),
+        'drying_time': drying_time
+    }
@@ -0,0 +1,215 @@
+import numpy as np
+from psychrometric_batch import calculate_from_tbs_ur_batch
+
+# Umidade de equilíbrio de grãos (teor de água de equilíbrio) e umidade
+# relativa de equilíbrio, a partir dos estados calculados pelo GRAPSI.
+#
+# Modelos (M em % base seca, UR decimal, T em °C):
+#   henderson    Henderson modificado   1 - UR = exp(-A (T + C) M^B)
+#   chung_pfost  Chung-Pfost modificado UR = exp(-A / (T + C) exp(-B M))
+#   oswin        Oswin modificado       M = (A + B T) / ((1 - UR) / UR)^(1/C)
+#   gab          GAB modificado         M = A B c UR / ((1 - B UR)(1 - B UR + c B UR)), c = C / T
+#
+# Todas as funções aceitam arrays com broadcasting entre estados e produtos:
+# uma estação inteira de leituras (forma (n,)) para vários silos (forma (s, 1))
+# é calculada em uma única chamada.
+#
+#   emc = calculate_emc(calculate_from_tbs_ur_batch(tbs, ur, patm),
+#                       np.array(['milho', 'soja'])[:, None])
+
+# Coeficientes (A, B, C) por modelo e produto. Henderson modificado: Thompson
+# (milho) e Brooker, Bakker-Arkema e Hall, Drying and Storage of Grains and
+# Oilseeds (1992); Chung-Pfost modificado: ASAE D245.5. Só entram produtos com
+# coeficientes publicados; os modelos oswin e gab, sem tabela aqui, recebem os
+# coeficientes do produto pelo usuário (argumento coeficientes ou inclusão
+# nesta tabela, com a fonte).
+COEFICIENTES = {
+    'henderson': {
+        'milho': (8.6541e-5, 1.8634, 49.810),
+        'arroz_casca': (1.9187e-5, 2.4451, 51.161),
+        'soja': (30.5327e-5, 1.2164, 134.136),
+        'trigo': (2.3007e-5, 2.2857, 55.815)
+    },
+    'chung_pfost': {
+        'milho': (374.34, 0.18662, 31.696),
+        'arroz_casca': (594.61, 0.21544, 35.703)
+    },
+    'oswin': {},
+    'gab': {}
+}
+
+MODELOS = tuple(COEFICIENTES)
+
+# Temperatura mínima de uso de cada modelo (°C). No GAB modificado o termo
+# c = C / T, com T em °C, é singular em 0 °C e cresce sem limite perto dele;
+# o modelo não serve para aeração abaixo de zero. Abaixo do mínimo as funções
+# retornam NaN.
+TEMPERATURA_MINIMA = {'gab': 5.0}
+
+def coeficientes_produto(modelo, produtos):
+    """
+    Busca os coeficientes de um modelo para um array de produtos
+
+    Args:
+        modelo: Nome do modelo (chave de COEFICIENTES)
+        produtos: Nome do produto ou array de nomes, de qualquer forma
+
+    Returns:
+        tuple: Arrays (A, B, C) com a forma de produtos
+    """
+    tabela = COEFICIENTES[modelo]
+    produtos = np.asarray(produtos)
+    nomes, indices = np.unique(produtos, return_inverse=True)
+    faltando = [str(nome) for nome in nomes if nome not in tabela]
+    if faltando:
+        raise KeyError(f'Sem coeficientes publicados do modelo {modelo} para: {", ".join(faltando)}; '
+                       f'informe os coeficientes (A, B, C) do produto')
+    valores = np.array([tabela[nome] for nome in nomes], dtype=float)
+    return tuple(valores[indices.reshape(produtos.shape), i] for i in range(3))
+
+def _k_gab(c, t):
+    """
+    Termo c = C / T do GAB modificado, NaN até TEMPERATURA_MINIMA['gab']
+    """
+    return np.where(t > TEMPERATURA_MINIMA['gab'], c / np.where(t != 0, t, 1.0), np.nan)
+
+def verificar_temperatura(modelo, t):
+    """
+    Verifica se as temperaturas estão no domínio do modelo
+
+    Args:
+        modelo: Nome do modelo
+        t: Temperaturas (°C), escalar ou array; valores não finitos são ignorados
+
+    Raises:
+        ValueError: Alguma temperatura até TEMPERATURA_MINIMA do modelo
+    """
+    minimo = TEMPERATURA_MINIMA.get(modelo)
+    t = np.asarray(t, dtype=float)
+    if minimo is not None and np.any(t[np.isfinite(t)] <= minimo):
+        raise ValueError(f'O modelo {modelo} só vale acima de {minimo:g} °C')
+
+def umidade_equilibrio(ur, t, modelo, coeficientes):
+    """
+    Cálculo da umidade de equilíbrio do produto
+
+    O GAB modificado retorna NaN para t até TEMPERATURA_MINIMA['gab'] (5 °C)
+    e não deve ser usado em aeração abaixo de zero.
+
+    Args:
+        ur: Umidade relativa do ar (decimal)
+        t: Temperatura do ar (°C)
+        modelo: Nome do modelo ('henderson', 'chung_pfost', 'oswin' ou 'gab')
+        coeficientes: Tupla (A, B, C), escalares ou arrays
+
+    Returns:
+        m_eq: Umidade de equilíbrio (% base seca), array
+    """
+    a, b, c = (np.asarray(v, dtype=float) for v in coeficientes)
+    ur = np.asarray(ur, dtype=float)
+    t = np.asarray(t, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if modelo == 'henderson':
+            return (np.log(1 - ur) / (-a * (t + c))) ** (1 / b)
+        if modelo == 'chung_pfost':
+            return -np.log(-(t + c) / a * np.log(ur)) / b
+        if modelo == 'oswin':
+            return (a + b * t) / ((1 - ur) / ur) ** (1 / c)
+        if modelo == 'gab':
+            k = _k_gab(c, t)
+            return a * b * k * ur / ((1 - b * ur) * (1 - b * ur + k * b * ur))
+    raise ValueError(f'Modelo desconhecido: {modelo}')
+
+def umidade_relativa_equilibrio(m, t, modelo, coeficientes):
+    """
+    Cálculo da umidade relativa de equilíbrio do ar com o produto
+
+    O GAB modificado retorna NaN para t até TEMPERATURA_MINIMA['gab'] (5 °C).
+
+    Args:
+        m: Umidade do produto (% base seca)
+        t: Temperatura (°C)
+        modelo: Nome do modelo ('henderson', 'chung_pfost', 'oswin' ou 'gab')
+        coeficientes: Tupla (A, B, C), escalares ou arrays
+
+    Returns:
+        ur_eq: Umidade relativa de equilíbrio (decimal), array
+    """
+    a, b, c = (np.asarray(v, dtype=float) for v in coeficientes)
+    m = np.asarray(m, dtype=float)
+    t = np.asarray(t, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        if modelo == 'henderson':
+            return 1 - np.exp(-a * (t + c) * m ** b)
+        if modelo == 'chung_pfost':
+            return np.exp(-a / (t + c) * np.exp(-b * m))
+        if modelo == 'oswin':
+            return 1 / (1 + ((a + b * t) / m) ** c)
+        if modelo == 'gab':
+            # Raiz positiva de m (k - 1) y² + (a k - m (k - 2)) y - m = 0, com y = B UR
+            k = _k_gab(c, t)
+            p = a * k - m * (k - 2)
+            q = m * (k - 1)
+            raiz = np.sqrt(p ** 2 + 4 * q * m)
+            y = np.where(q != 0, (raiz - p) / (2 * np.where(q != 0, q, 1)), m / p)
+            return y / b
+    raise ValueError(f'Modelo desconhecido: {modelo}')
+
+def _coefficients(model, products, coefficients):
+    if coefficients is not None:
+        return coefficients
+    return coeficientes_produto(model, products)
+
+def calculate_emc(state, products=None, model='henderson', coefficients=None):
+    """
+    Calcula a umidade de equilíbrio dos produtos com o ar de um estado psicrométrico
+
+    Args:
+        state: Dicionário com 'tbs' (°C) e 'ur' (%), como retornado por
+               calculate_from_tbs_ur, pelas versões em lote ou pelos pontos
+               dos processos (ex.: result['point2'])
+        products: Nome do produto ou array de nomes (broadcasting com o estado)
+        model: Nome do modelo
+        coefficients: Tupla (A, B, C) usada no lugar da tabela de produtos
+
+    Returns:
+        array: Umidade de equilíbrio (% base seca)
+    """
+    coefficients = _coefficients(model, products, coefficients)
+    ur = np.asarray(state['ur'], dtype=float) / 100.0
+    return umidade_equilibrio(ur, state['tbs'], model, coefficients)
+
+def calculate_erh(tbs, moisture, products=None, model='henderson', patm=101.325, coefficients=None):
+    """
+    Calcula a umidade relativa de equilíbrio e o estado do ar intersticial
+
+    Args:
+        tbs: Temperatura do produto e do ar (°C)
+        moisture: Umidade do produto (% base seca)
+        products: Nome do produto ou array de nomes (broadcasting com as entradas)
+        model: Nome do modelo
+        patm: Pressão atmosférica (kPa)
+        coefficients: Tupla (A, B, C) usada no lugar da tabela de produtos
+
+    Returns:
+        dict: Propriedades do ar em equilíbrio com o produto, com as chaves e
+              unidades de calculate_from_tbs_ur_batch (ur em %)
+    """
+    coefficients = _coefficients(model, products, coefficients)
+    ur = umidade_relativa_equilibrio(moisture, tbs, model, coefficients)
+    with np.errstate(all='ignore'):
+        return calculate_from_tbs_ur_batch(tbs, np.clip(ur, 0.0, 0.99999), patm)
+
+if __name__ == '__main__':
+    # Verificação de ida e volta EMC -> ERH para todos os coeficientes da tabela
+    t, ur = np.meshgrid(np.arange(5.0, 41.0, 5.0), np.arange(0.2, 0.91, 0.05))
+    falhas = 0
+    for modelo, tabela in COEFICIENTES.items():
+        for produto, coeficientes in tabela.items():
+            m = umidade_equilibrio(ur, t, modelo, coeficientes)
+            erro = np.max(np.abs(umidade_relativa_equilibrio(m, t, modelo, coeficientes) - ur))
+            ok = bool(np.all(np.isfinite(m)) and erro < 1e-9)
+            falhas += not ok
+            print(f'{"ok  " if ok else "FAIL"} {modelo:12s} {produto:12s} '
+                  f'M {np.min(m):5.1f} a {np.max(m):5.1f} % b.s., erro UR {erro:.1e}')
+    raise SystemExit(1 if falhas else 0)
@@ -1,11 +1,325 @@
+from functools import lru_cache
+
 import numpy as np
 import plotly.graph_objects as go
 from psychrometric_functions import pressao_vapor_saturado, razao_mistura1, entalpia, pressao_vapor
 from psychrometric_functions import temperatura_ponto_orvalho, temperatura_b_molhado, volume_especifico
-from psychrometric_functions import calculate_from_tbs_ur
+from psychrometric_functions import calculate_from_tbs_ur, pressao_vapor_saturado_vetorizado
 from translations import get_text
+from chart_helpers import sensor_arrays, bin_sensor_points, adaptive_axes, adaptive_isolines, label_index
+from chart_helpers import secondary_isolines, property_grid
+from psychrometric_regions import region_outline, region_color
+from psychrometric_bins import chart_mesh
+
+def _join_segments(segments):
+    """
+    Concatena várias linhas em um único par de arrays separados por NaN
+
+    O Plotly interrompe a linha em cada NaN, então uma família inteira de
+    isolinhas pode ser enviada ao navegador como um único trace.
+
+    Args:
+        segments: Lista de tuplas (x, y) com os pontos de cada linha
+
+    Returns:
+        tuple: Arrays (x, y) concatenados
+    """
+    xs = []
+    ys = []
+    for x, y in segments:
+        xs.append(np.asarray(x, dtype=float))
+        ys.append(np.asarray(y, dtype=float))
+        xs.append(np.array([np.nan]))
+        ys.append(np.array([np.nan]))
+
+    if not xs:
+        return np.array([]), np.array([])
+
+    # Remover o último separador
+    return np.concatenate(xs[:-1]), np.concatenate(ys[:-1])
+
+def _standard_isolines(tbs_min, tbs_max, patm):
+    """
+    Gera as isolinhas do gráfico com eixos fixos (saturação, UR e entalpia)
+
+    Args:
+        tbs_min: Temperatura mínima do eixo x (°C)
+        tbs_max: Temperatura máxima do eixo x (°C)
+        patm: Pressão atmosférica (kPa)
+
+    Returns:
+        dict: 'saturation' -> (x, y), 'rh' -> lista de (ur %, x, y) e
+              'enthalpy' -> lista de (h, x, y)
+    """
+    # Limite máximo para razão de mistura (g/kg)
+    rm_max = 30
+
+    # Gerar curva de saturação (UR = 100%)
+    tbs_range = np.linspace(tbs_min, tbs_max, 100)
+    pv_saturacao = pressao_vapor_saturado_vetorizado(tbs_range)
+
+    # Gerar linhas de umidade relativa constante
+    ur_values = [10, 20, 30, 40, 50, 60, 70, 80, 90]
+    rh = []
+
+    for ur in ur_values:
+        pv = (ur / 100) * pv_saturacao
+        rm = razao_mistura1(pv, patm) * 1000  # g/kg
+
+        # Filtrar pontos onde RM fica muito grande (evitar linhas saindo do gráfico)
+        valid = rm <= rm_max
+        if valid.any():
+            rh.append((ur, tbs_range[valid], pv[valid]))
+
+    # Gerar linhas de entalpia constante
+    if tbs_max > 50:
+        entalpia_values = np.arange(20, 300, 20)
+    else:
+        entalpia_values = np.arange(20, 150, 10)
+
+    rm_points = np.linspace(0.001, rm_max/1000.0, 50)  # Valores em decimal
+    pv_points = pressao_vapor(rm_points, patm)
+    enthalpy = []
+
+    for ent in entalpia_values:
+        # Calcular TBS para entalpia e RM dados
+        tbs = (ent - 2501 * rm_points) / (1.006 + 1.775 * rm_points)
+
+        # Verificar se a temperatura está dentro do range
+        valid = (tbs_min <= tbs) & (tbs <= tbs_max)
+        if valid.sum() > 1:
+            enthalpy.append((ent, tbs[valid], pv_points[valid]))
+
+    return {'saturation': (tbs_range, pv_saturacao), 'rh': rh, 'enthalpy': enthalpy}
+
+@lru_cache(maxsize=32)
+def _background_figure(tbs_min, tbs_max, patm, lang, adaptive=None,
+                       show_wet_bulb=True, show_specific_volume=True, show_hover_grid=True):
+    """
+    Gera o fundo estático do gráfico interativo (isolinhas, rótulos e eixos)
+
+    O resultado fica em cache por faixa de temperatura, pressão e idioma.
+    Quem chama deve copiar a figura com go.Figure(...) antes de alterá-la.
+
+    Args:
+        tbs_min: Temperatura mínima do eixo x (°C)
+        tbs_max: Temperatura máxima do eixo x (°C)
+        patm: Pressão atmosférica (kPa)
+        lang: Idioma para os textos do gráfico
+        adaptive: Tupla (pv_min, pv_max, y_log) do modo adaptativo ou None
+        show_wet_bulb: Incluir as linhas de bulbo molhado constante
+        show_specific_volume: Incluir as linhas de volume específico constante
+        show_hover_grid: Incluir a grade invisível de propriedades para o hover
+
+    Returns:
+        fig: Figura Plotly com o fundo do gráfico psicrométrico
+    """
+    if adaptive is None:
+        isolines = _standard_isolines(tbs_min, tbs_max, patm)
+        # Número mínimo de pontos para rotular linhas de UR e de entalpia
+        rh_label_min, ent_label_min = 2, 5
+    else:
+        pv_min, pv_max, y_log = adaptive
+        axes = {'tbs_min': tbs_min, 'tbs_max': tbs_max,
+                'pv_min': pv_min, 'pv_max': pv_max, 'y_log': y_log}
+        isolines = adaptive_isolines(axes, patm)
+        rh_label_min, ent_label_min = 1, 1
+
+    fig = go.Figure()
+
+    # Grade invisível com as propriedades pré-calculadas: o tooltip mostra os
+    # valores em qualquer posição do cursor sem chamada ao servidor
+    if show_hover_grid:
+        bounds = (0.0, 5.0, False) if adaptive is None else adaptive
+        grid = property_grid(float(tbs_min), float(tbs_max), *bounds, patm)
+        customdata = np.round(np.stack(
+            [grid['ur'], grid['rm'], grid['e'], grid['tbm'], grid['tpo']], axis=-1
+        ), 2)
+        fig.add_trace(go.Heatmap(
+            x=grid['tbs'],
+            y=grid['pv'],
+            z=grid['ur'],
+            customdata=customdata,
+            opacity=0,
+            showscale=False,
+            hoverongaps=False,
+            hovertemplate=(
+                f"{get_text('dbt_short', lang)}: %{{x:.1f}}<br>"
+                f"{get_text('vp_short', lang)}: %{{y:.3f}}<br>"
+                f"{get_text('rh_short', lang)}: %{{customdata[0]:.1f}}<br>"
+                f"{get_text('mr_short', lang)}: %{{customdata[1]:.2f}}<br>"
+                f"{get_text('enthalpy_short', lang)}: %{{customdata[2]:.1f}}<br>"
+                f"{get_text('wbt_short', lang)}: %{{customdata[3]:.1f}}<br>"
+                f"{get_text('dpt_short', lang)}: %{{customdata[4]:.1f}}"
+                "<extra></extra>"
+            )
+        ))
+
+    x, y = isolines['saturation']
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=y,
+        mode='lines',
+        name=get_text('rh_100_label', lang),
+        line=dict(color='blue', width=2)
+    ))
+
+    # Rótulos de todas as isolinhas (um único trace de texto)
+    label_x = []
+    label_y = []
+    label_text = []
+    label_color = []
+
+    for ur, x, y in isolines['rh']:
+        # Adicionar rótulo de UR no meio da linha
+        if len(x) > rh_label_min:
+            idx = len(x) // 2 if adaptive is None else label_index(x, 0.3 + ur / 200)
+            label_x.append(x[idx])
+            label_y.append(y[idx])
+            label_text.append(get_text('rh_label', lang, value=ur))
+            label_color.append('blue')
+
+    x, y = _join_segments([(x, y) for _, x, y in isolines['rh']])
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=y,
+        mode='lines',
+        name=get_text('rh_label', lang, value='10-90'),
+        line=dict(color='blue', width=1, dash='dot'),
+        showlegend=False
+    ))
+
+    for ent, x, y in isolines['enthalpy']:
+        # Adicionar rótulo de entalpia
+        if len(x) > ent_label_min:
+            idx = int(len(x) * 0.7) if adaptive is None else label_index(x, 0.7)
+            label_x.append(x[idx])
+            label_y.append(y[idx])
+            label_text.append(get_text('enthalpy_label', lang, value=f"{ent:g}"))
+            label_color.append('red')
+
+    x, y = _join_segments([(x, y) for _, x, y in isolines['enthalpy']])
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=y,
+        mode='lines',
+        name="h (kJ/kg)",
+        line=dict(color='red', width=1, dash='dot'),
+        showlegend=False
+    ))
+
+    # Linhas de bulbo molhado e volume específico constantes
+    if show_wet_bulb or show_specific_volume:
+        bounds = (0.0, 5.0, False) if adaptive is None else adaptive
+        secondary = secondary_isolines(float(tbs_min), float(tbs_max), *bounds, patm)
+
+    if show_wet_bulb:
+        for tbm, x, y in secondary['wet_bulb']:
+            idx = label_index(x, 0.1)
+            label_x.append(x[idx])
+            label_y.append(y[idx])
+            label_text.append(get_text('wbt_label', lang, value=f"{tbm:g}"))
+            label_color.append('green')
+
+        x, y = _join_segments([(x, y) for _, x, y in secondary['wet_bulb']])
+        fig.add_trace(go.Scatter(
+            x=x,
+            y=y,
+            mode='lines',
+            name=get_text('show_wet_bulb_lines', lang),
+            line=dict(color='green', width=1, dash='dash'),
+            showlegend=False
+        ))
+
+    if show_specific_volume:
+        for ve, x, y in secondary['specific_volume']:
+            idx = label_index(x, 0.3)
+            label_x.append(x[idx])
+            label_y.append(y[idx])
+            label_text.append(get_text('sv_label', lang, value=f"{ve:.2f}"))
+            label_color.append('purple')
+
+        x, y = _join_segments([(x, y) for _, x, y in secondary['specific_volume']])
+        fig.add_trace(go.Scatter(
+            x=x,
+            y=y,
+            mode='lines',
+            name=get_text('show_volume_lines', lang),
+            line=dict(color='purple', width=1, dash='dot'),
+            showlegend=False
+        ))
+
+    fig.add_trace(go.Scatter(
+        x=label_x,
+        y=label_y,
+        mode='text',
+        text=label_text,
+        textfont=dict(color=label_color, size=10),
+        hoverinfo='skip',
+        showlegend=False
+    ))
+
+    # Configurar layout do gráfico
+    fig.update_layout(
+        xaxis_title=get_text('chart_x_axis', lang),
+        yaxis_title=get_text('chart_y_axis', lang),
+        template="plotly_white",
+        hovermode='closest',
+        width=800,
+        height=600,
+        showlegend=False,  # Remover a legenda
+        margin=dict(l=80, r=80, t=80, b=80),
+        # Adicionar funcionalidade de clique
+        clickmode='event+select',
+        # Forçar modo claro
+        paper_bgcolor='white',
+        plot_bgcolor='white'
+    )
 
-def plot_interactive_psychrometric_chart(data, patm=101.325, altitude=0, lang='pt', comparison_data=None):
+    # Configurar eixos
+    fig.update_xaxes(
+        range=[tbs_min, tbs_max],
+        gridcolor="lightgray",
+        showline=True,
+        linewidth=2,
+        linecolor='black',
+        ticks="outside",
+        tickfont=dict(color='black'),
+        tickwidth=2,
+        tickcolor='black',
+        title_font=dict(color='black')
+    )
+    if adaptive is None:
+        y_range = [0, 5]  # PV em kPa
+        y_type = 'linear'
+    elif adaptive[2]:
+        # Em eixo logarítmico o Plotly recebe o intervalo em log10
+        y_range = [np.log10(adaptive[0]), np.log10(adaptive[1])]
+        y_type = 'log'
+    else:
+        y_range = [adaptive[0], adaptive[1]]
+        y_type = 'linear'
+
+    fig.update_yaxes(
+        type=y_type,
+        range=y_range,
+        gridcolor="lightgray",
+        showline=True,
+        linewidth=2,
+        linecolor='black',
+        ticks="outside",
+        tickfont=dict(color='black'),
+        tickwidth=2,
+        tickcolor='black',
+        title_font=dict(color='black')
+    )
+
+    return fig
+
+def plot_interactive_psychrometric_chart(data, patm=101.325, altitude=0, lang='pt', comparison_data=None,
+                                         sensor_data=None, sensor_mode='webgl', chart_mode='standard',
+                                         show_wet_bulb=True, show_specific_volume=True, show_hover_grid=True,
+                                         regions=None, bin_data=None):
     """
     Gera um gráfico psicrométrico interativo com base nos dados fornecidos
     
@@ -15,6 +329,17 @@ def plot_interactive_psychrometric_chart(data, patm=101.325, altitude=0, lang='p
         altitude: Altitude do local (m)
         lang: Idioma para os textos do gráfico ('pt' ou 'en')
         comparison_data: Lista de dicionários com processos adicionais para comparação
+        sensor_data: Dicionário com arrays 'tbs' e 'pv' (ou 'ur') de leituras de sensores
+        sensor_mode: 'webgl' (Scattergl com todos os pontos) ou 'density' (mapa de densidade)
+        chart_mode: 'standard' (eixos fixos) ou 'adaptive' (eixos e amostragem
+                    ajustados aos dados, de -100 a 372 °C)
+        show_wet_bulb: Desenhar as linhas de temperatura de bulbo molhado constante
+        show_specific_volume: Desenhar as linhas de volume específico constante
+        show_hover_grid: Incluir a grade de propriedades exibida no hover (os
+                         valores exatos continuam em calculate_properties_from_click)
+        regions: Lista de regiões de psychrometric_regions, sombreadas no gráfico
+        bin_data: Tabela de frequência de psychrometric_bins, desenhada como
+                  mapa de calor das horas por faixa
     
     Returns:
         fig: Figura Plotly com o gráfico psicrométrico interativo
@@ -39,117 +364,96 @@ def plot_interactive_psychrometric_chart(data, patm=101.325, altitude=0, lang='p
     if 'tbs2' in data and data['tbs2'] < 15:
         tbs_min = min(tbs_min, max(0, data['tbs2'] - 5))
     
-    # Limite máximo para razão de mistura (g/kg)
-    rm_max = 30
-    
-    # Criar figura Plotly
-    fig = go.Figure()
-    
-    # Gerar curva de saturação (UR = 100%)
-    tbs_range = np.linspace(tbs_min, tbs_max, 100)
-    pv_saturacao = []  # Para eixo y1 (pressão de vapor)
-    rm_saturacao = []  # Para eixo y2 (razão de mistura)
-    
-    for t in tbs_range:
-        pvs = pressao_vapor_saturado(t)
-        pv_saturacao.append(pvs)
-        rm = razao_mistura1(pvs, patm) * 1000  # Converter para g/kg
-        rm_saturacao.append(rm)
-    
-    # Adicionar curva de saturação ao gráfico
-    fig.add_trace(go.Scatter(
-        x=tbs_range,
-        y=pv_saturacao,
-        mode='lines',
-        name=get_text('rh_100_label', lang),
-        line=dict(color='blue', width=2)
-    ))
+    # No modo adaptativo os limites e a escala vêm dos dados
+    adaptive = None
+    pv_range = (0, 5)
+    if chart_mode == 'adaptive':
+        axes = adaptive_axes(data, patm)
+        tbs_min = axes['tbs_min']
+        tbs_max = axes['tbs_max']
+        adaptive = (float(axes['pv_min']), float(axes['pv_max']), axes['y_log'])
+        pv_range = (adaptive[0], adaptive[1])
     
-    # Gerar linhas de umidade relativa constante
-    ur_values = [10, 20, 30, 40, 50, 60, 70, 80, 90]
+    # Copiar o fundo do gráfico (isolinhas, rótulos e eixos) já calculado
+    fig = go.Figure(_background_figure(tbs_min, tbs_max, patm, lang, adaptive,
+                                       show_wet_bulb, show_specific_volume, show_hover_grid))
     
-    for ur in ur_values:
-        pv_ur = []
-        tbs_ur = []
-        rm_ur = []
-        
-        for t in tbs_range:
-            pvs = pressao_vapor_saturado(t)
-            pv = (ur / 100) * pvs
-            rm = razao_mistura1(pv, patm) * 1000  # g/kg
-            
-            # Filtrar pontos onde RM fica muito grande (evitar linhas saindo do gráfico)
-            if rm <= rm_max:
-                pv_ur.append(pv)
-                tbs_ur.append(t)
-                rm_ur.append(rm)
-        
-        # Adicionar linha de UR constante ao gráfico
-        if len(tbs_ur) > 0:
+    # Sombrear as regiões (zonas de conforto, risco de condensação, envelopes)
+    if regions:
+        for i, region in enumerate(regions):
+            region_tbs, region_pv = region_outline(region, patm)
+            color = region_color(region, i).replace('tab:', '')
             fig.add_trace(go.Scatter(
-                x=tbs_ur,
-                y=pv_ur,
+                x=region_tbs,
+                y=region_pv,
                 mode='lines',
-                name=get_text('rh_label', lang, value=ur),
-                line=dict(color='blue', width=1, dash='dot'),
-                showlegend=bool(ur == 50)  # Mostrar apenas uma linha na legenda
+                fill='toself',
+                line=dict(color=color, width=1),
+                opacity=0.3,
+                name=get_text(region['name'], lang),
+                hoverinfo='name'
             ))
-            
-            # Adicionar rótulo de UR no meio da linha
-            if len(tbs_ur) > 2:
-                idx = len(tbs_ur) // 2  # Ponto médio
-                rh_text = get_text('rh_label', lang, value=ur)
-                fig.add_annotation(
-                    x=tbs_ur[idx], 
-                    y=pv_ur[idx],
-                    text=rh_text,
-                    showarrow=False,
-                    font=dict(color="blue", size=10)
-                )
     
-    # Gerar linhas de entalpia constante
-    if tbs_max > 50:
-        entalpia_values = np.arange(20, 300, 20)
-    else:
-        entalpia_values = np.arange(20, 150, 10)
+    # Mapa de calor da análise de frequência
+    if bin_data is not None:
+        bin_tbs, bin_pv = chart_mesh(bin_data, patm)
+        hours = np.where(bin_data['hours'] > 0, bin_data['hours'], np.nan)
+        if bin_data['y'] == 'rm':
+            # Faixas de razão de mistura são retângulos: Heatmap com os limites das faixas
+            fig.add_trace(go.Heatmap(
+                x=bin_tbs[0],
+                y=bin_pv[:, 0],
+                z=hours,
+                colorscale='Inferno',
+                reversescale=True,
+                opacity=0.6,
+                showscale=False,
+                name=get_text('bin_hours_label', lang),
+                hovertemplate='%{x:.1f} °C, %{y:.2f} kPa: %{z:.0f} h<extra></extra>'
+            ))
+        else:
+            # Faixas de entalpia são inclinadas: um marcador no centro de cada faixa ocupada
+            center_tbs = (bin_tbs[:-1, :-1] + bin_tbs[1:, 1:]) / 2
+            center_pv = (bin_pv[:-1, :-1] + bin_pv[1:, 1:]) / 2
+            occupied = np.isfinite(hours)
+            fig.add_trace(go.Scattergl(
+                x=center_tbs[occupied],
+                y=center_pv[occupied],
+                mode='markers',
+                marker=dict(color=hours[occupied], colorscale='Inferno', reversescale=True,
+                            symbol='square', size=6, opacity=0.6),
+                name=get_text('bin_hours_label', lang),
+                hovertemplate='%{x:.1f} °C, %{y:.2f} kPa: %{marker.color:.0f} h<extra></extra>'
+            ))
     
-    for ent in entalpia_values:
-        rm_points = np.linspace(0.001, rm_max/1000.0, 50)  # Valores em decimal
-        tbs_ent = []
-        pv_ent = []
+    # Sobrepor leituras de sensores
+    if sensor_data is not None:
+        sensor_tbs, sensor_pv = sensor_arrays(sensor_data)
         
-        for rm in rm_points:
-            # Calcular TBS para entalpia e RM dados
-            tbs = (ent - 2501 * rm) / (1.006 + 1.775 * rm)
-            
-            # Verificar se a temperatura está dentro do range
-            if tbs_min <= tbs <= tbs_max:
-                pv = pressao_vapor(rm, patm)
-                tbs_ent.append(tbs)
-                pv_ent.append(pv)
-        
-        # Adicionar linha de entalpia constante
-        if len(tbs_ent) > 1:
-            fig.add_trace(go.Scatter(
-                x=tbs_ent,
-                y=pv_ent,
-                mode='lines',
-                name=f"h = {ent} kJ/kg",
-                line=dict(color='red', width=1, dash='dot'),
-                showlegend=bool(ent == 60)  # Mostrar apenas uma linha na legenda
+        if sensor_mode == 'density':
+            # Enviar apenas a grade de contagens, não os pontos brutos
+            tbs_edges, pv_edges, counts = bin_sensor_points(
+                sensor_tbs, sensor_pv, (tbs_min, tbs_max), pv_range
+            )
+            fig.add_trace(go.Heatmap(
+                x=(tbs_edges[:-1] + tbs_edges[1:]) / 2,
+                y=(pv_edges[:-1] + pv_edges[1:]) / 2,
+                z=counts,
+                colorscale='Viridis',
+                opacity=0.6,
+                showscale=False,
+                name=get_text('sensor_data_label', lang),
+                hovertemplate='%{x:.1f} °C, %{y:.2f} kPa: %{z:.0f}<extra></extra>'
+            ))
+        else:
+            fig.add_trace(go.Scattergl(
+                x=sensor_tbs,
+                y=sensor_pv,
+                mode='markers',
+                name=get_text('sensor_data_label', lang),
+                marker=dict(color='gray', size=2, opacity=0.3),
+                hoverinfo='skip'
             ))
-            
-            # Adicionar rótulo de entalpia
-            if len(tbs_ent) > 5:
-                idx = int(len(tbs_ent) * 0.7)
-                enthalpy_text = get_text('enthalpy_label', lang, value=ent)
-                fig.add_annotation(
-                    x=tbs_ent[idx], 
-                    y=pv_ent[idx],
-                    text=enthalpy_text,
-                    showarrow=False,
-                    font=dict(color="red", size=10)
-                )
     
     # Plotar dados específicos com base no tipo
     if data['type'] == 'point':
@@ -369,49 +673,8 @@ def plot_interactive_psychrometric_chart(data, patm=101.325, altitude=0, lang='p
             showlegend=False
         ))
     
-    # Configurar layout do gráfico
-    fig.update_layout(
-        title=get_text('chart_title', lang, altitude=altitude),
-        xaxis_title=get_text('chart_x_axis', lang),
-        yaxis_title=get_text('chart_y_axis', lang),
-        template="plotly_white",
-        hovermode='closest',
-        width=800,
-        height=600,
-        showlegend=False,  # Remover a legenda
-        margin=dict(l=80, r=80, t=80, b=80),
-        # Adicionar funcionalidade de clique
-        clickmode='event+select',
-        # Forçar modo claro
-        paper_bgcolor='white',
-        plot_bgcolor='white'
-    )
-    
-    # Configurar eixos
-    fig.update_xaxes(
-        range=[tbs_min, tbs_max], 
-        gridcolor="lightgray",
-        showline=True,
-        linewidth=2,
-        linecolor='black',
-        ticks="outside",
-        tickfont=dict(color='black'),
-        tickwidth=2,
-        tickcolor='black',
-        title_font=dict(color='black')
-    )
-    fig.update_yaxes(
-        range=[0, 5], 
-        gridcolor="lightgray",
-        showline=True,
-        linewidth=2,
-        linecolor='black',
-        ticks="outside",
-        tickfont=dict(color='black'),
-        tickwidth=2,
-        tickcolor='black',
-        title_font=dict(color='black')
-    )  # PV em kPa
+    # Título depende da altitude, por isso fica fora do fundo em cache
+    fig.update_layout(title=get_text('chart_title', lang, altitude=altitude))
     
     # Adicionar funcionalidade de clique
     # Note: A detecção de clique é processada no lado do cliente usando Streamlit
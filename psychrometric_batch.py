@@ -0,0 +1,458 @@
+import numpy as np
+from psychrometric_functions import pressao_vapor_saturado_vetorizado, razao_mistura1, razao_mistura2
+from psychrometric_functions import umidade_relativa, entalpia, pressao_vapor, temperatura_ponto_orvalho
+from psychrometric_functions import temperatura_b_molhado_vetorizado, volume_especifico, temperatura_b_seco
+
+# Versões vetorizadas das funções calculate_* de psychrometric_functions.
+# Recebem arrays (ou escalares) e retornam dicionários de arrays com as
+# mesmas chaves e unidades das versões escalares.
+
+PROPERTY_KEYS = ('tbs', 'tbm', 'tpo', 'ur', 'rm', 'pvs', 'pv', 've', 'e')
+
+def _as_arrays(*values):
+    """
+    Converte as entradas em arrays float com o mesmo formato
+    """
+    return np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in values])
+
+def _state_dict(tbs, tbm, tpo, ur, rm, pvs, pv, ve, e):
+    """
+    Monta o dicionário de propriedades com as unidades da interface
+    """
+    return {
+        'tbs': tbs,
+        'tbm': tbm,
+        'tpo': tpo,
+        'ur': ur * 100,  # Convertido para percentual
+        'rm': rm * 1000,  # Convertido para g/kg
+        'pvs': pvs,
+        'pv': pv,
+        've': ve,
+        'e': e
+    }
+
+def calculate_from_tbs_ur_batch(tbs, ur, patm):
+    """
+    Calcula as propriedades psicrométricas a partir de arrays de temperatura de bulbo seco e umidade relativa
+
+    Args:
+        tbs: Temperatura de bulbo seco (°C)
+        ur: Umidade relativa (decimal)
+        patm: Pressão atmosférica (kPa)
+
+    Returns:
+        dict: Dicionário de arrays com as propriedades calculadas
+    """
+    tbs, ur = _as_arrays(tbs, ur)
+    pvs = pressao_vapor_saturado_vetorizado(tbs)
+    pv = ur * pvs
+    rm = razao_mistura1(pv, patm)
+    e = entalpia(tbs, rm)
+    ve = volume_especifico(tbs, rm, patm)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tpo = np.where(ur >= 0.99, tbs, temperatura_ponto_orvalho(pv))
+
+    tbm = temperatura_b_molhado_vetorizado(tbs, e, patm)
+
+    return _state_dict(tbs, tbm, tpo, ur, rm, pvs, pv, ve, e)
+
+def calculate_from_tbs_tbm_batch(tbs, tbm, patm):
+    """
+    Calcula as propriedades psicrométricas a partir de arrays de temperatura de bulbo seco e temperatura de bulbo molhado
+
+    Args:
+        tbs: Temperatura de bulbo seco (°C)
+        tbm: Temperatura de bulbo molhado (°C)
+        patm: Pressão atmosférica (kPa)
+
+    Returns:
+        dict: Dicionário de arrays com as propriedades calculadas
+    """
+    tbs, tbm = _as_arrays(tbs, tbm)
+    pvs = pressao_vapor_saturado_vetorizado(tbs)
+    saturado = tbs == tbm
+
+    pvsu = pressao_vapor_saturado_vetorizado(tbm)
+    rmsu = razao_mistura1(pvsu, patm)
+    rm = np.where(saturado, razao_mistura1(pvs, patm), razao_mistura2(tbs, tbm, rmsu))
+    pv = np.where(saturado, pvs, pressao_vapor(rm, patm))
+    ur = np.where(saturado, 1.0, umidade_relativa(pv, pvs))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tpo = np.where(saturado, tbs, temperatura_ponto_orvalho(pv))
+
+    e = entalpia(tbs, rm)
+    ve = volume_especifico(tbs, rm, patm)
+
+    return _state_dict(tbs, tbm, tpo, ur, rm, pvs, pv, ve, e)
+
+def calculate_from_tbs_tpo_batch(tbs, tpo, patm):
+    """
+    Calcula as propriedades psicrométricas a partir de arrays de temperatura de bulbo seco e temperatura de ponto de orvalho
+
+    Args:
+        tbs: Temperatura de bulbo seco (°C)
+        tpo: Temperatura de ponto de orvalho (°C)
+        patm: Pressão atmosférica (kPa)
+
+    Returns:
+        dict: Dicionário de arrays com as propriedades calculadas
+    """
+    tbs, tpo = _as_arrays(tbs, tpo)
+    pvs = pressao_vapor_saturado_vetorizado(tbs)
+    saturado = tbs == tpo
+
+    pv = np.where(saturado, pvs, pressao_vapor_saturado_vetorizado(tpo))
+    rm = razao_mistura1(pv, patm)
+    ur = np.where(saturado, 0.999999, umidade_relativa(pv, pvs))
+    e = entalpia(tbs, rm)
+    tbm = np.where(saturado, tbs, temperatura_b_molhado_vetorizado(tbs, e, patm))
+    ve = volume_especifico(tbs, rm, patm)
+
+    return _state_dict(tbs, tbm, tpo, ur, rm, pvs, pv, ve, e)
+
+def _state_from_tbs_pv(tbs, pv, patm):
+    """
+    Calcula o estado a partir de tbs e pv, como nos pontos 1 dos processos
+
+    Diferente de calculate_from_tbs_ur_batch, o ponto de orvalho é sempre
+    obtido pela correlação, como em psychrometric_processes.
+    """
+    pvs = pressao_vapor_saturado_vetorizado(tbs)
+    rm = razao_mistura1(pv, patm)
+    e = entalpia(tbs, rm)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tpo = temperatura_ponto_orvalho(pv)
+    tbm = temperatura_b_molhado_vetorizado(tbs, e, patm)
+    ve = volume_especifico(tbs, rm, patm)
+    return pvs, rm, e, tpo, tbm, ve
+
+def calculate_aquece_resfria_batch(tbs1, ur1, tbs2, patm):
+    """
+    Calcula o processo de aquecimento ou resfriamento para arrays de entradas
+
+    Args:
+        tbs1: Temperatura de bulbo seco inicial (°C)
+        ur1: Umidade relativa inicial (decimal)
+        tbs2: Temperatura de bulbo seco final (°C)
+        patm: Pressão atmosférica (kPa)
+
+    Returns:
+        dict: Dicionário com os arrays de propriedades dos pontos 1 e 2
+    """
+    tbs1, ur1, tbs2 = _as_arrays(tbs1, ur1, tbs2)
+
+    # Ponto de Estado 1
+    pv = ur1 * pressao_vapor_saturado_vetorizado(tbs1)
+    pvs, rm, e, tpo, tbm, ve = _state_from_tbs_pv(tbs1, pv, patm)
+
+    # Ponto de Estado 2: mesma razão de mistura acima do orvalho, saturado abaixo
+    pvs2 = pressao_vapor_saturado_vetorizado(tbs2)
+    sensivel = tbs2 > tpo
+    pv2 = np.where(sensivel, pv, pvs2)
+    rm2 = np.where(sensivel, rm, razao_mistura1(pvs2, patm))
+    ur2 = np.where(sensivel, pv2 / pvs2, 1.0)
+    tpo2 = np.where(sensivel, tpo, tbs2)
+    e2 = entalpia(tbs2, rm2)
+    tbm2 = np.where(sensivel, temperatura_b_molhado_vetorizado(tbs2, e2, patm), tbs2)
+    ve2 = volume_especifico(tbs2, rm2, patm)
+
+    return {
+        'point1': _state_dict(tbs1, tbm, tpo, ur1, rm, pvs, pv, ve, e),
+        'point2': _state_dict(tbs2, tbm2, tpo2, ur2, rm2, pvs2, pv2, ve2, e2)
+    }
+
+def calculate_u_adiabatica_tbs_batch(tbs1, ur1, tbs2, patm):
+    """
+    Calcula a umidificação adiabática até uma temperatura de bulbo seco alvo para arrays de entradas
+
+    A razão de mistura final é obtida diretamente da entalpia constante, sem
+    o ajuste em passos de 0,0001 kg/kg da versão escalar.
+
+    Args:
+        tbs1: Temperatura de bulbo seco inicial (°C)
+        ur1: Umidade relativa inicial (decimal)
+        tbs2: Temperatura de bulbo seco final (°C)
+        patm: Pressão atmosférica (kPa)
+
+    Returns:
+        dict: Dicionário com os arrays de propriedades dos pontos 1 e 2
+    """
+    tbs1, ur1, tbs2 = _as_arrays(tbs1, ur1, tbs2)
+
+    # Ponto de Estado 1
+    pv = ur1 * pressao_vapor_saturado_vetorizado(tbs1)
+    pvs, rm, e, tpo, tbm, ve = _state_from_tbs_pv(tbs1, pv, patm)
+    saturado = ur1 == 1
+    tpo = np.where(saturado, tbs1, tpo)
+    tbm = np.where(saturado, tbs1, tbm)
+
+    # Ponto de Estado 2 sobre a linha de entalpia constante
+    rm2 = (e - 1.006 * tbs2) / (2501. + 1.775 * tbs2)
+    pv2 = pressao_vapor(rm2, patm)
+    pvs2 = pressao_vapor_saturado_vetorizado(tbs2)
+    ur2 = pv2 / pvs2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tpo2 = temperatura_ponto_orvalho(pv2)
+    ve2 = volume_especifico(tbs2, rm2, patm)
+
+    return {
+        'point1': _state_dict(tbs1, tbm, tpo, ur1, rm, pvs, pv, ve, e),
+        'point2': _state_dict(tbs2, tbm, tpo2, ur2, rm2, pvs2, pv2, ve2, e)
+    }
+
+def calculate_u_adiabatica_ur_batch(tbs1, ur1, ur2, patm, iteracoes=40):
+    """
+    Calcula a umidificação adiabática até uma umidade relativa alvo para arrays de entradas
+
+    A razão de mistura final é encontrada por bissecção sobre a linha de
+    entalpia constante, entre o ponto 1 e a saturação no bulbo molhado.
+
+    Args:
+        tbs1: Temperatura de bulbo seco inicial (°C)
+        ur1: Umidade relativa inicial (decimal)
+        ur2: Umidade relativa final (decimal)
+        patm: Pressão atmosférica (kPa)
+        iteracoes: Número de bissecções
+
+    Returns:
+        dict: Dicionário com os arrays de propriedades dos pontos 1 e 2
+    """
+    tbs1, ur1, ur2 = _as_arrays(tbs1, ur1, ur2)
+
+    # Ponto de Estado 1
+    pv = ur1 * pressao_vapor_saturado_vetorizado(tbs1)
+    pvs, rm, e, tpo, tbm, ve = _state_from_tbs_pv(tbs1, pv, patm)
+
+    # Ponto de Estado 2: a umidade relativa cresce com rm ao longo da linha
+    lo = rm.copy()
+    hi = razao_mistura1(pressao_vapor_saturado_vetorizado(tbm), patm)
+    for _ in range(iteracoes):
+        rm2 = (lo + hi) / 2
+        ur0 = pressao_vapor(rm2, patm) / pressao_vapor_saturado_vetorizado(temperatura_b_seco(e, rm2))
+        abaixo = ur0 < ur2
+        lo = np.where(abaixo, rm2, lo)
+        hi = np.where(abaixo, hi, rm2)
+    rm2 = (lo + hi) / 2
+
+    saturado = ur2 >= 0.99
+    tbs2 = np.where(saturado, tbm, temperatura_b_seco(e, rm2))
+    pvs2 = pressao_vapor_saturado_vetorizado(tbs2)
+    pv2 = np.where(saturado, pvs2, pressao_vapor(rm2, patm))
+    rm2 = np.where(saturado, razao_mistura1(pvs2, patm), rm2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tpo2 = np.where(saturado, tbm, temperatura_ponto_orvalho(pv2))
+    ve2 = volume_especifico(tbs2, rm2, patm)
+
+    return {
+        'point1': _state_dict(tbs1, tbm, tpo, ur1, rm, pvs, pv, ve, e),
+        'point2': _state_dict(tbs2, tbm, tpo2, ur2, rm2, pvs2, pv2, ve2, e)
+    }
+
+def calculate_u_adiabatica_rm_batch(tbs1, rm1_gkg, rm2_gkg, patm):
+    """
+    Calcula a umidificação adiabática até uma razão de mistura alvo para arrays de entradas
+
+    As linhas que na versão escalar retornariam erro (razão de mistura acima
+    da saturação no ponto 1 ou 2) ficam com NaN, valid = False e a mesma
+    mensagem em 'error'.
+
+    Args:
+        tbs1: Temperatura de bulbo seco inicial (°C)
+        rm1_gkg: Razão de mistura inicial (g/kg)
+        rm2_gkg: Razão de mistura final (g/kg)
+        patm: Pressão atmosférica (kPa)
+
+    Returns:
+        dict: Arrays de propriedades dos pontos 1 e 2, a máscara 'valid' e as mensagens 'error'
+    """
+    tbs1, rm1_gkg, rm2_gkg = _as_arrays(tbs1, rm1_gkg, rm2_gkg)
+    rm1 = rm1_gkg / 1000.0
+    rm2 = rm2_gkg / 1000.0
+
+    # Ponto de Estado 1
+    pv = pressao_vapor(rm1, patm)
+    pvs, _, e, tpo, tbm, ve = _state_from_tbs_pv(tbs1, pv, patm)
+    ur = pv / pvs
+
+    # Ponto de Estado 2
+    tbs2 = temperatura_b_seco(e, rm2)
+    pvs2 = pressao_vapor_saturado_vetorizado(tbs2)
+    pv2 = pressao_vapor(rm2, patm)
+    ur2 = pv2 / pvs2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tpo2 = temperatura_ponto_orvalho(pv2)
+
+    saturado = ur2 == 1.0
+    ur2 = np.where(saturado, 0.99999, ur2)
+    tbs2 = np.where(saturado, tbm, tbs2)
+    tpo2 = np.where(saturado, tbm, tpo2)
+    pvs2 = pressao_vapor_saturado_vetorizado(tbs2)
+    pv2 = np.where(saturado, pvs2, pv2)
+    rm2 = np.where(saturado, razao_mistura1(pvs2, patm), rm2)
+    ve2 = volume_especifico(tbs2, rm2, patm)
+
+    valid = (ur <= 1.0) & (ur2 <= 1.0)
+    error = np.where(ur > 1.0, 'O valor da razão de mistura do ponto 1 é muito alto',
+                     np.where(ur2 > 1.0, 'O valor da razão de mistura fornecida no ponto 2 é muito alta', ''))
+    point1 = _state_dict(tbs1, tbm, tpo, ur, rm1, pvs, pv, ve, e)
+    point2 = _state_dict(tbs2, tbm, tpo2, ur2, rm2, pvs2, pv2, ve2, e)
+    for point in (point1, point2):
+        for key in PROPERTY_KEYS:
+            point[key] = np.where(valid, point[key], np.nan)
+
+    return {'point1': point1, 'point2': point2, 'valid': valid, 'error': error}
+
+def calculate_mistura_fluxos_batch(tbs1, ur1, q1, tbs2, ur2, q2, patm):
+    """
+    Calcula a mistura de dois fluxos de ar para arrays de entradas
+
+    Args:
+        tbs1: Temperatura de bulbo seco do fluxo 1 (°C)
+        ur1: Umidade relativa do fluxo 1 (decimal)
+        q1: Vazão de ar do fluxo 1 (m³/h)
+        tbs2: Temperatura de bulbo seco do fluxo 2 (°C)
+        ur2: Umidade relativa do fluxo 2 (decimal)
+        q2: Vazão de ar do fluxo 2 (m³/h)
+        patm: Pressão atmosférica (kPa)
+
+    Returns:
+        dict: Arrays de propriedades dos três pontos (fluxo 1, fluxo 2 e mistura)
+    """
+    tbs1, ur1, q1, tbs2, ur2, q2 = _as_arrays(tbs1, ur1, q1, tbs2, ur2, q2)
+
+    # Fluxos de ar 1 e 2
+    pv1 = ur1 * pressao_vapor_saturado_vetorizado(tbs1)
+    pvs1, rm1, e1, tpo1, tbm1, ve1 = _state_from_tbs_pv(tbs1, pv1, patm)
+    m1 = q1 / ve1  # massa de ar seco (kg/h)
+
+    pv2 = ur2 * pressao_vapor_saturado_vetorizado(tbs2)
+    pvs2, rm2, e2, tpo2, tbm2, ve2 = _state_from_tbs_pv(tbs2, pv2, patm)
+    m2 = q2 / ve2  # massa de ar seco (kg/h)
+
+    # Ar resultante da mistura
+    m3 = m1 + m2
+    rm3 = (m1 * rm1 + m2 * rm2) / m3
+    e3 = (m1 * e1 + m2 * e2) / m3
+    tbs3 = temperatura_b_seco(e3, rm3)
+    pv3 = pressao_vapor(rm3, patm)
+    pvs3, _, _, tpo3, tbm3, ve3 = _state_from_tbs_pv(tbs3, pv3, patm)
+    ur3 = pv3 / pvs3
+    q3 = m3 * ve3
+
+    point1 = _state_dict(tbs1, tbm1, tpo1, ur1, rm1, pvs1, pv1, ve1, e1)
+    point1.update({'q': q1, 'm': m1})
+    point2 = _state_dict(tbs2, tbm2, tpo2, ur2, rm2, pvs2, pv2, ve2, e2)
+    point2.update({'q': q2, 'm': m2})
+    point3 = _state_dict(tbs3, tbm3, tpo3, ur3, rm3, pvs3, pv3, ve3, e3)
+    point3.update({'q': q3, 'm': m3})
+
+    return {
+        'point1': point1,
+        'point2': point2,
+        'point3': point3,
+        'q1': q1,
+        'q2': q2,
+        'q3': q3
+    }
+
+def calculate_recuperador_batch(tbs1, ur1, q1, tbs2, ur2, q2, ef_sensivel, ef_latente, patm):
+    """
+    Calcula o recuperador de calor entre insuflamento e exaustão para arrays de entradas
+
+    Args:
+        tbs1: Temperatura de bulbo seco do ar externo (insuflamento) (°C)
+        ur1: Umidade relativa do ar externo (decimal)
+        q1: Vazão de ar de insuflamento (m³/h)
+        tbs2: Temperatura de bulbo seco do ar de exaustão (°C)
+        ur2: Umidade relativa do ar de exaustão (decimal)
+        q2: Vazão de ar de exaustão (m³/h)
+        ef_sensivel: Efetividade sensível (0 a 1)
+        ef_latente: Efetividade latente (0 a 1)
+        patm: Pressão atmosférica (kPa)
+
+    Returns:
+        dict: Arrays de propriedades dos quatro pontos, vazões, 'sensible_heat'
+              e 'total_heat' (kW), 'condensate' (kg/h) e 'frost_risk'
+    """
+    tbs1, ur1, q1, tbs2, ur2, q2, ef_sensivel, ef_latente = _as_arrays(
+        tbs1, ur1, q1, tbs2, ur2, q2, ef_sensivel, ef_latente)
+
+    # Ar externo e de exaustão
+    pv1 = ur1 * pressao_vapor_saturado_vetorizado(tbs1)
+    pvs1, rm1, e1, tpo1, tbm1, ve1 = _state_from_tbs_pv(tbs1, pv1, patm)
+    m1 = q1 / ve1  # massa de ar seco (kg/h)
+
+    pv2 = ur2 * pressao_vapor_saturado_vetorizado(tbs2)
+    pvs2, rm2, e2, tpo2, tbm2, ve2 = _state_from_tbs_pv(tbs2, pv2, patm)
+    m2 = q2 / ve2  # massa de ar seco (kg/h)
+    razao = np.minimum(m1, m2) / m1
+
+    # Insuflamento: limitado à saturação
+    tbs3 = tbs1 + ef_sensivel * razao * (tbs2 - tbs1)
+    rm3 = rm1 + ef_latente * razao * (rm2 - rm1)
+    rm3 = np.minimum(rm3, razao_mistura1(pressao_vapor_saturado_vetorizado(tbs3), patm))
+    e3 = entalpia(tbs3, rm3)
+
+    # Exaustão: balanços de energia e de água
+    e4 = e2 - m1 / m2 * (e3 - e1)
+    rm4 = rm2 - m1 / m2 * (rm3 - rm1)
+    tbs4 = temperatura_b_seco(e4, rm4)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        condensa = tbs4 < temperatura_ponto_orvalho(pressao_vapor(rm4, patm))
+    tbs4_sat = temperatura_b_molhado_vetorizado(temperatura_b_seco(e4, 0.0), e4, patm)
+    rm4_sat = razao_mistura1(pressao_vapor_saturado_vetorizado(tbs4_sat), patm)
+    condensado = np.where(condensa, m2 * (rm4 - rm4_sat), 0.0)
+    tbs4 = np.where(condensa, tbs4_sat, tbs4)
+    rm4 = np.where(condensa, rm4_sat, rm4)
+
+    pv3 = pressao_vapor(rm3, patm)
+    pvs3, _, _, tpo3, tbm3, ve3 = _state_from_tbs_pv(tbs3, pv3, patm)
+    pv4 = pressao_vapor(rm4, patm)
+    pvs4, _, e4, tpo4, tbm4, ve4 = _state_from_tbs_pv(tbs4, pv4, patm)
+
+    # Risco de congelamento: lado frio abaixo do orvalho da exaustão e de 0 °C
+    lado_frio = np.minimum(tbs1, tbs4)
+
+    point1 = _state_dict(tbs1, tbm1, tpo1, ur1, rm1, pvs1, pv1, ve1, e1)
+    point1.update({'q': q1, 'm': m1})
+    point2 = _state_dict(tbs2, tbm2, tpo2, ur2, rm2, pvs2, pv2, ve2, e2)
+    point2.update({'q': q2, 'm': m2})
+    point3 = _state_dict(tbs3, tbm3, tpo3, pv3 / pvs3, rm3, pvs3, pv3, ve3, e3)
+    point3.update({'q': m1 * ve3, 'm': m1})
+    point4 = _state_dict(tbs4, tbm4, tpo4, pv4 / pvs4, rm4, pvs4, pv4, ve4, e4)
+    point4.update({'q': m2 * ve4, 'm': m2})
+
+    return {
+        'point1': point1,
+        'point2': point2,
+        'point3': point3,
+        'point4': point4,
+        'q1': q1,
+        'q2': q2,
+        'sensible_heat': m1 * (1.006 + 1.775 * rm3) * (tbs3 - tbs1) / 3600,
+        'total_heat': m1 * (e3 - e1) / 3600,
+        'condensate': condensado,
+        'frost_risk': (lado_frio < tpo2) & (lado_frio < 0)
+    }
+
+# Métodos de entrada disponíveis para cálculos em lote
+BATCH_METHODS = {
+    'tbs_ur': calculate_from_tbs_ur_batch,
+    'tbs_tbm': calculate_from_tbs_tbm_batch,
+    'tbs_tpo': calculate_from_tbs_tpo_batch
+}
+
+# Versões vetorizadas de todas as funções calculate_*, pelo nome da função escalar
+BATCH_FUNCTIONS = {
+    'calculate_from_tbs_ur': calculate_from_tbs_ur_batch,
+    'calculate_from_tbs_tbm': calculate_from_tbs_tbm_batch,
+    'calculate_from_tbs_tpo': calculate_from_tbs_tpo_batch,
+    'calculate_aquece_resfria': calculate_aquece_resfria_batch,
+    'calculate_u_adiabatica_tbs': calculate_u_adiabatica_tbs_batch,
+    'calculate_u_adiabatica_ur': calculate_u_adiabatica_ur_batch,
+    'calculate_u_adiabatica_rm': calculate_u_adiabatica_rm_batch,
+    'calculate_mistura_fluxos': calculate_mistura_fluxos_batch,
+    'calculate_recuperador': calculate_recuperador_batch
+}
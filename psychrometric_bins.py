@@ -0,0 +1,276 @@
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from psychrometric_functions import pressao_vapor
+from psychrometric_batch import calculate_from_tbs_ur_batch
+
+# Análise de frequência (bin analysis) de estados do ar sobre o gráfico.
+#
+# As leituras (tbs, ur) passam pela versão vetorizada de psychrometric_batch
+# e são contadas em uma grade de faixas de temperatura de bulbo seco por
+# razão de mistura ou entalpia, no estilo de np.histogram2d. Para cada faixa
+# também são acumuladas as somas de propriedades coincidentes (ex.: tbm médio
+# das horas de cada faixa). Como só as somas ficam em memória, arquivos
+# maiores que a memória são lidos em blocos:
+#
+#   bins = bin_files(['2015.csv', '2016.csv'], y='e')
+#   table = to_frame(bins)
+
+# Eixo y das faixas: unidade e passo padrão
+BIN_AXES = {'rm': ('g/kg', 1.0), 'e': ('kJ/kg', 2.0)}
+DEFAULT_TBS_RANGE = (-10.0, 45.0)
+DEFAULT_Y_RANGES = {'rm': (0.0, 30.0), 'e': (-10.0, 120.0)}
+DEFAULT_COINCIDENT = ('tbm', 'ur', 'tpo', 'e', 'rm')
+
+def bin_edges(y='rm', tbs_range=DEFAULT_TBS_RANGE, y_range=None, tbs_step=1.0, y_step=None):
+    """
+    Limites das faixas de tbs e do eixo y
+
+    Args:
+        y: Eixo y, 'rm' (g/kg) ou 'e' (kJ/kg)
+        tbs_range: Tupla (mínimo, máximo) de tbs (°C)
+        y_range: Tupla (mínimo, máximo) do eixo y; padrão em DEFAULT_Y_RANGES
+        tbs_step: Largura das faixas de tbs (°C)
+        y_step: Largura das faixas do eixo y; padrão em BIN_AXES
+
+    Returns:
+        tuple: Arrays (tbs_edges, y_edges)
+    """
+    if y not in BIN_AXES:
+        raise ValueError(f'Eixo de faixas desconhecido: {y}')
+    y_range = DEFAULT_Y_RANGES[y] if y_range is None else y_range
+    y_step = BIN_AXES[y][1] if y_step is None else y_step
+    tbs_edges = np.arange(tbs_range[0], tbs_range[1] + tbs_step / 2, tbs_step)
+    y_edges = np.arange(y_range[0], y_range[1] + y_step / 2, y_step)
+    return tbs_edges, y_edges
+
+def _bin_index(values, edges):
+    """
+    Índice da faixa de cada valor (-1 fora da grade; último limite incluído)
+    """
+    index = np.searchsorted(edges, values, side='right') - 1
+    index[values == edges[-1]] = len(edges) - 2
+    index[(index >= len(edges) - 1) | ~np.isfinite(values)] = -1
+    return index
+
+class BinAccumulator:
+    """
+    Contagens e somas de propriedades coincidentes por faixa (tbs, y)
+
+    A memória é fixa (uma grade por propriedade), então lotes de qualquer
+    tamanho podem ser acumulados em sequência e acumuladores de arquivos
+    diferentes podem ser combinados com merge.
+    """
+
+    def __init__(self, y='rm', tbs_edges=None, y_edges=None, coincident=DEFAULT_COINCIDENT,
+                 patm=101.325, hours_per_state=1.0):
+        """
+        Args:
+            y: Eixo y, 'rm' (g/kg) ou 'e' (kJ/kg)
+            tbs_edges: Limites das faixas de tbs (°C); padrão em bin_edges
+            y_edges: Limites das faixas do eixo y; padrão em bin_edges
+            coincident: Propriedades do resultado em lote com média por faixa
+            patm: Pressão atmosférica (kPa)
+            hours_per_state: Duração de cada leitura (h)
+        """
+        default_tbs, default_y = bin_edges(y)
+        self.y = y
+        self.tbs_edges = np.asarray(default_tbs if tbs_edges is None else tbs_edges, dtype=float)
+        self.y_edges = np.asarray(default_y if y_edges is None else y_edges, dtype=float)
+        self.coincident = tuple(coincident)
+        self.patm = patm
+        self.hours_per_state = hours_per_state
+        self.shape = (len(self.y_edges) - 1, len(self.tbs_edges) - 1)
+        size = self.shape[0] * self.shape[1]
+        self.counts = np.zeros(size)
+        self.sums = {key: np.zeros(size) for key in self.coincident}
+        self.sum_counts = {key: np.zeros(size) for key in self.coincident}
+        self.total = 0
+        self.outside = 0
+
+    def add_states(self, states):
+        """
+        Acumula estados já calculados
+
+        Args:
+            states: Dicionário de arrays com 'tbs', o eixo y e as propriedades
+                    coincidentes, como retornado pelas funções em lote
+
+        Returns:
+            int: Número de estados dentro da grade
+        """
+        tbs = np.asarray(states['tbs'], dtype=float).ravel()
+        ix = _bin_index(tbs, self.tbs_edges)
+        iy = _bin_index(np.asarray(states[self.y], dtype=float).ravel(), self.y_edges)
+        inside = (ix >= 0) & (iy >= 0)
+        flat = iy[inside] * self.shape[1] + ix[inside]
+        size = self.counts.size
+
+        self.counts += np.bincount(flat, minlength=size)
+        for key in self.coincident:
+            values = np.asarray(states[key], dtype=float).ravel()[inside]
+            finite = np.isfinite(values)
+            self.sums[key] += np.bincount(flat[finite], weights=values[finite], minlength=size)
+            self.sum_counts[key] += np.bincount(flat[finite], minlength=size)
+
+        self.total += tbs.size
+        self.outside += tbs.size - flat.size
+        return flat.size
+
+    def update(self, tbs, ur):
+        """
+        Calcula e acumula um lote de leituras
+
+        Args:
+            tbs: Array de temperaturas de bulbo seco (°C)
+            ur: Array de umidades relativas (decimal)
+
+        Returns:
+            int: Número de estados dentro da grade
+        """
+        with np.errstate(all='ignore'):
+            states = calculate_from_tbs_ur_batch(tbs, np.clip(ur, 0.0, 0.99999), self.patm)
+        return self.add_states(states)
+
+    def merge(self, other):
+        """
+        Soma as contagens de outro acumulador com a mesma grade
+        """
+        if (other.y != self.y or other.coincident != self.coincident
+                or not np.array_equal(other.tbs_edges, self.tbs_edges)
+                or not np.array_equal(other.y_edges, self.y_edges)):
+            raise ValueError('Os acumuladores têm grades ou propriedades diferentes')
+        self.counts += other.counts
+        for key in self.coincident:
+            self.sums[key] += other.sums[key]
+            self.sum_counts[key] += other.sum_counts[key]
+        self.total += other.total
+        self.outside += other.outside
+        return self
+
+    def result(self):
+        """
+        Tabela de frequência acumulada
+
+        Returns:
+            dict: 'y', 'tbs_edges', 'y_edges', 'hours' (forma (y, tbs), como
+                  em bin_sensor_points), 'means' com a média de cada propriedade
+                  coincidente (NaN nas faixas vazias), 'total' e 'outside'
+                  (leituras fora da grade, inclusive inválidas)
+        """
+        means = {}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for key in self.coincident:
+                means[key] = (self.sums[key] / self.sum_counts[key]).reshape(self.shape)
+        return {
+            'y': self.y,
+            'tbs_edges': self.tbs_edges,
+            'y_edges': self.y_edges,
+            'hours': self.counts.reshape(self.shape) * self.hours_per_state,
+            'means': means,
+            'total': self.total,
+            'outside': self.outside
+        }
+
+def bin_analysis(tbs, ur, y='rm', patm=101.325, **options):
+    """
+    Tabela de frequência de uma série de leituras em memória
+
+    Args:
+        tbs: Array de temperaturas de bulbo seco (°C)
+        ur: Array de umidades relativas (decimal)
+        y: Eixo y, 'rm' ou 'e'
+        patm: Pressão atmosférica (kPa)
+        **options: Demais argumentos de BinAccumulator
+
+    Returns:
+        dict: Ver BinAccumulator.result
+    """
+    accumulator = BinAccumulator(y, patm=patm, **options)
+    accumulator.update(tbs, ur)
+    return accumulator.result()
+
+def bin_files(paths, y='rm', col_tbs='tbs', col_ur='ur', chunksize=500000, patm=101.325, **options):
+    """
+    Tabela de frequência de arquivos CSV lidos em blocos
+
+    Args:
+        paths: Lista de arquivos CSV
+        y: Eixo y, 'rm' ou 'e'
+        col_tbs: Coluna com a temperatura (°C)
+        col_ur: Coluna com a umidade relativa (%)
+        chunksize: Linhas lidas por bloco
+        patm: Pressão atmosférica (kPa)
+        **options: Demais argumentos de BinAccumulator
+
+    Returns:
+        dict: Ver BinAccumulator.result
+    """
+    accumulator = BinAccumulator(y, patm=patm, **options)
+    for path in paths:
+        for chunk in pd.read_csv(path, usecols=[col_tbs, col_ur], chunksize=chunksize):
+            tbs = pd.to_numeric(chunk[col_tbs], errors='coerce').to_numpy(dtype=float)
+            ur = pd.to_numeric(chunk[col_ur], errors='coerce').to_numpy(dtype=float) / 100.0
+            accumulator.update(tbs, ur)
+    return accumulator.result()
+
+def chart_mesh(bins, patm=101.325):
+    """
+    Vértices das faixas nos eixos principais do gráfico (tbs, pv)
+
+    Faixas de razão de mistura são retângulos no gráfico; faixas de entalpia
+    são quadriláteros inclinados, com pv calculado em cada vértice.
+
+    Args:
+        bins: Resultado de BinAccumulator.result
+        patm: Pressão atmosférica (kPa)
+
+    Returns:
+        tuple: Arrays (tbs, pv) de forma (n_y + 1, n_tbs + 1), para pcolormesh
+    """
+    tbs, y = np.meshgrid(bins['tbs_edges'], bins['y_edges'])
+    if bins['y'] == 'rm':
+        w = y / 1000.0
+    else:
+        w = (y - 1.006 * tbs) / (2501. + 1.775 * tbs)
+    return tbs, pressao_vapor(np.clip(w, 0.0, None), patm)
+
+def to_frame(bins):
+    """
+    Tabela de frequência em formato longo, apenas com as faixas ocupadas
+
+    Args:
+        bins: Resultado de BinAccumulator.result
+
+    Returns:
+        DataFrame: Limites de cada faixa, horas e médias coincidentes
+    """
+    iy, ix = np.nonzero(bins['hours'])
+    tbs_edges, y_edges = bins['tbs_edges'], bins['y_edges']
+    y = bins['y']
+    frame = pd.DataFrame({
+        'tbs_min': tbs_edges[ix],
+        'tbs_max': tbs_edges[ix + 1],
+        f'{y}_min': y_edges[iy],
+        f'{y}_max': y_edges[iy + 1],
+        'hours': bins['hours'][iy, ix]
+    })
+    for key, values in bins['means'].items():
+        frame[f'mean_{key}'] = values[iy, ix]
+    return frame
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Tabela de frequência psicrométrica (bin analysis)')
+    parser.add_argument('files', nargs='+', help='CSV com colunas tbs (°C) e ur (%%)')
+    parser.add_argument('--y', choices=tuple(BIN_AXES), default='rm')
+    parser.add_argument('--chunksize', type=int, default=500000)
+    parser.add_argument('--patm', type=float, default=101.325)
+    parser.add_argument('--output', help='CSV de saída; padrão: saída padrão')
+    args = parser.parse_args()
+
+    bins = bin_files(args.files, y=args.y, chunksize=args.chunksize, patm=args.patm)
+    frame = to_frame(bins)
+    frame.to_csv(args.output or sys.stdout, index=False)
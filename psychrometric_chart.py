@@ -2,58 +2,25 @@ import numpy as np
 import matplotlib.pyplot as plt
 from psychrometric_functions import pressao_vapor_saturado, razao_mistura1, temperatura_ponto_orvalho, temperatura_b_molhado, entalpia, pressao_vapor
 from translations import get_text
+from chart_helpers import sensor_arrays, bin_sensor_points, adaptive_axes, adaptive_isolines, label_index
+from chart_helpers import secondary_isolines
+from tracing import span
+from psychrometric_regions import region_outline, region_color
+from psychrometric_bins import chart_mesh
 
-def plot_psychrometric_chart(data, patm=101.325, altitude=0, lang='pt', comparison_data=None):
+def _draw_standard_background(ax, ax2, tbs_min, tbs_max, rm_max, patm, lang):
     """
-    Gera um gráfico psicrométrico com base nos dados fornecidos
+    Desenha as isolinhas do gráfico com eixos fixos (saturação, UR e entalpia)
     
     Args:
-        data: Dicionário contendo o tipo de dados e valores para plotar
+        ax: Eixo principal (pressão de vapor)
+        ax2: Eixo secundário (razão de mistura)
+        tbs_min: Temperatura mínima do eixo x (°C)
+        tbs_max: Temperatura máxima do eixo x (°C)
+        rm_max: Razão de mistura máxima (g/kg)
         patm: Pressão atmosférica (kPa)
-        altitude: Altitude do local (m)
-        lang: Idioma para os textos do gráfico ('pt' ou 'en')
-        comparison_data: Lista de dicionários com processos adicionais para comparação
-    
-    Returns:
-        fig: Figura matplotlib com o gráfico psicrométrico
+        lang: Idioma para os textos do gráfico
     """
-    # Criar a figura
-    fig, ax = plt.subplots(figsize=(10, 8))
-    
-    # Determinar limites do eixo x (temperatura) com base nos dados
-    tbs_min = 10  # Valor padrão mínimo
-    tbs_max = 50  # Valor padrão máximo
-    
-    # Verificar pontos de dados para possível ajuste de escala
-    max_tbs_input = 0
-    
-    if data['type'] == 'point':
-        max_tbs_input = max(max_tbs_input, data['tbs'])
-    elif data['type'] == 'process':
-        max_tbs_input = max(max_tbs_input, data['tbs1'], data['tbs2'])
-    elif data['type'] == 'mixing':
-        max_tbs_input = max(max_tbs_input, data['tbs1'], data['tbs2'], data['tbs3'])
-    
-    # Se houver temperaturas maiores que 50°C, ajustar a escala
-    if max_tbs_input > 50:
-        tbs_min = 15
-        tbs_max = max_tbs_input + 5
-    
-    rm_max = 30  # g/kg - valor fixo para razão de mistura
-    
-    # Configurar eixos
-    ax.set_xlim(tbs_min, tbs_max)
-    ax.set_ylim(0, 5)  # Pressão de vapor em kPa, máximo aprox. 5 kPa
-    ax.set_xlabel(get_text('chart_x_axis', lang))
-    ax.set_ylabel(get_text('chart_y_axis', lang))
-    
-    # Criar segundo eixo Y à direita para razão de mistura
-    ax2 = ax.twinx()
-    ax2.set_ylim(0, rm_max)  # Razão de mistura em g/kg (0-30)
-    ax2.set_ylabel(get_text('chart_y2_axis', lang))
-    
-    ax.grid(True, linestyle='--', alpha=0.7)
-    
     # Gerar curva de saturação (UR = 100%) e dados para ambos os eixos
     tbs_range = np.linspace(tbs_min, tbs_max, 100)
     pv_saturacao = []  # Para eixo esquerdo (pressão de vapor)
@@ -108,8 +75,6 @@ def plot_psychrometric_chart(data, patm=101.325, altitude=0, lang='pt', comparis
                 ax.text(tbs_range[idx], pv_ur[idx], rh_text, 
                         color='blue', fontsize=8, ha='center', va='center')
     
-    # Removidas as linhas de temperatura de bulbo molhado constante conforme solicitado
-    
     # Gerar linhas de entalpia constante
     # Ajustar os valores de entalpia com base na temperatura máxima
     if tbs_max > 50:
@@ -162,6 +127,191 @@ def plot_psychrometric_chart(data, patm=101.325, altitude=0, lang='pt', comparis
                     enthalpy_text = get_text('enthalpy_label', lang, value=ent)
                     ax.text(tbs_ent[idx], pv_ent[idx], enthalpy_text, 
                             color='red', fontsize=8, ha='right', va='center')
+
+def _draw_adaptive_background(ax, isolines, lang):
+    """
+    Desenha as isolinhas do modo adaptativo
+    
+    Args:
+        ax: Eixo principal (pressão de vapor)
+        isolines: Dicionário retornado por adaptive_isolines
+        lang: Idioma para os textos do gráfico
+    """
+    x, y = isolines['saturation']
+    ax.plot(x, y, 'b-', linewidth=2, label=get_text('rh_100_label', lang))
+    
+    for ur, x, y in isolines['rh']:
+        ax.plot(x, y, 'b-', linewidth=1, alpha=0.5)
+        idx = label_index(x, 0.3 + ur / 200)  # Rótulos escalonados para não se sobreporem
+        ax.text(x[idx], y[idx], get_text('rh_label', lang, value=ur),
+                color='blue', fontsize=8, ha='center', va='center')
+    
+    for h, x, y in isolines['enthalpy']:
+        ax.plot(x, y, 'r-', linewidth=1, alpha=0.5)
+        idx = label_index(x, 0.7)
+        ax.text(x[idx], y[idx], get_text('enthalpy_label', lang, value=f"{h:g}"),
+                color='red', fontsize=8, ha='right', va='center')
+
+def _draw_secondary_isolines(ax, isolines, lang, show_wet_bulb, show_specific_volume):
+    """
+    Desenha as linhas de bulbo molhado e de volume específico constantes
+    
+    Args:
+        ax: Eixo principal (pressão de vapor)
+        isolines: Dicionário retornado por secondary_isolines
+        lang: Idioma para os textos do gráfico
+        show_wet_bulb: Desenhar as linhas de bulbo molhado
+        show_specific_volume: Desenhar as linhas de volume específico
+    """
+    if show_wet_bulb:
+        for tbm, x, y in isolines['wet_bulb']:
+            ax.plot(x, y, 'g--', linewidth=1, alpha=0.5)
+            idx = label_index(x, 0.1)
+            ax.text(x[idx], y[idx], get_text('wbt_label', lang, value=f"{tbm:g}"),
+                    color='green', fontsize=7, ha='left', va='bottom')
+    
+    if show_specific_volume:
+        for ve, x, y in isolines['specific_volume']:
+            ax.plot(x, y, color='purple', linestyle=':', linewidth=1, alpha=0.5)
+            idx = label_index(x, 0.3)
+            ax.text(x[idx], y[idx], get_text('sv_label', lang, value=f"{ve:.2f}"),
+                    color='purple', fontsize=7, ha='left', va='bottom', rotation=80)
+
+def plot_psychrometric_chart(data, patm=101.325, altitude=0, lang='pt', comparison_data=None,
+                             sensor_data=None, sensor_mode='density', chart_mode='standard',
+                             show_wet_bulb=True, show_specific_volume=True, uncertainty_data=None, regions=None,
+                             bin_data=None):
+    """
+    Gera um gráfico psicrométrico com base nos dados fornecidos
+    
+    Args:
+        data: Dicionário contendo o tipo de dados e valores para plotar
+        patm: Pressão atmosférica (kPa)
+        altitude: Altitude do local (m)
+        lang: Idioma para os textos do gráfico ('pt' ou 'en')
+        comparison_data: Lista de dicionários com processos adicionais para comparação
+        sensor_data: Dicionário com arrays 'tbs' e 'pv' (ou 'ur') de leituras de sensores
+        sensor_mode: 'density' (mapa de densidade) ou 'scatter' (nuvem de pontos)
+        chart_mode: 'standard' (eixos fixos) ou 'adaptive' (eixos e amostragem
+                    ajustados aos dados, de -100 a 372 °C)
+        show_wet_bulb: Desenhar as linhas de temperatura de bulbo molhado constante
+        show_specific_volume: Desenhar as linhas de volume específico constante
+        uncertainty_data: Dicionário com arrays 'tbs' e 'pv' das amostras de
+                          Monte Carlo, desenhadas como nuvem de incerteza
+        regions: Lista de regiões de psychrometric_regions, sombreadas no gráfico
+        bin_data: Tabela de frequência de psychrometric_bins, desenhada como
+                  mapa de calor das horas por faixa
+    
+    Returns:
+        fig: Figura matplotlib com o gráfico psicrométrico
+    """
+    # Criar a figura
+    fig, ax = plt.subplots(figsize=(10, 8))
+    
+    # Determinar limites do eixo x (temperatura) com base nos dados
+    tbs_min = 10  # Valor padrão mínimo
+    tbs_max = 50  # Valor padrão máximo
+    
+    # Verificar pontos de dados para possível ajuste de escala
+    max_tbs_input = 0
+    
+    if data['type'] == 'point':
+        max_tbs_input = max(max_tbs_input, data['tbs'])
+    elif data['type'] == 'process':
+        max_tbs_input = max(max_tbs_input, data['tbs1'], data['tbs2'])
+    elif data['type'] == 'mixing':
+        max_tbs_input = max(max_tbs_input, data['tbs1'], data['tbs2'], data['tbs3'])
+    
+    # Se houver temperaturas maiores que 50°C, ajustar a escala
+    if max_tbs_input > 50:
+        tbs_min = 15
+        tbs_max = max_tbs_input + 5
+    
+    rm_max = 30  # g/kg - valor fixo para razão de mistura
+    
+    # No modo adaptativo os limites e a escala vêm dos dados
+    if chart_mode == 'adaptive':
+        axes = adaptive_axes(data, patm)
+        tbs_min = axes['tbs_min']
+        tbs_max = axes['tbs_max']
+    
+    # Configurar eixos
+    ax.set_xlim(tbs_min, tbs_max)
+    if chart_mode == 'adaptive':
+        if axes['y_log']:
+            ax.set_yscale('log')
+        ax.set_ylim(axes['pv_min'], axes['pv_max'])
+    else:
+        ax.set_ylim(0, 5)  # Pressão de vapor em kPa, máximo aprox. 5 kPa
+    ax.set_xlabel(get_text('chart_x_axis', lang))
+    ax.set_ylabel(get_text('chart_y_axis', lang))
+    
+    # Criar segundo eixo Y à direita para razão de mistura
+    ax2 = ax.twinx()
+    if chart_mode == 'adaptive':
+        # Escala exata de RM a partir de pv; o ax2 fica apenas como referência oculta
+        ax2.set_visible(False)
+        secondary = ax.secondary_yaxis('right', functions=(
+            lambda pv: razao_mistura1(np.clip(pv, 0, 0.999 * patm), patm) * 1000,
+            lambda rm: pressao_vapor(np.asarray(rm) / 1000.0, patm)
+        ))
+        secondary.set_ylabel(get_text('chart_y2_axis', lang))
+    else:
+        ax2.set_ylim(0, rm_max)  # Razão de mistura em g/kg (0-30)
+        ax2.set_ylabel(get_text('chart_y2_axis', lang))
+    
+    ax.grid(True, linestyle='--', alpha=0.7)
+    
+    with span('chart_isolines'):
+        if chart_mode == 'adaptive':
+            _draw_adaptive_background(ax, adaptive_isolines(axes, patm), lang)
+        else:
+            _draw_standard_background(ax, ax2, tbs_min, tbs_max, rm_max, patm, lang)
+        
+        # Linhas de bulbo molhado e volume específico (geometria em cache)
+        if show_wet_bulb or show_specific_volume:
+            if chart_mode == 'adaptive':
+                bounds = (float(axes['pv_min']), float(axes['pv_max']), axes['y_log'])
+            else:
+                bounds = (0.0, 5.0, False)
+            isolines = secondary_isolines(float(tbs_min), float(tbs_max), *bounds, patm)
+            _draw_secondary_isolines(ax, isolines, lang, show_wet_bulb, show_specific_volume)
+    
+    # Sombrear as regiões (zonas de conforto, risco de condensação, envelopes)
+    if regions:
+        for i, region in enumerate(regions):
+            region_tbs, region_pv = region_outline(region, patm)
+            ax.fill(region_tbs, region_pv, color=region_color(region, i), alpha=0.2,
+                    label=get_text(region['name'], lang), zorder=0.5)
+    
+    # Mapa de calor da análise de frequência (faixas de rm ou de entalpia)
+    if bin_data is not None:
+        bin_tbs, bin_pv = chart_mesh(bin_data, patm)
+        hours = np.where(bin_data['hours'] > 0, bin_data['hours'], np.nan)
+        mesh = ax.pcolormesh(bin_tbs, bin_pv, hours, cmap='inferno_r', alpha=0.6,
+                             shading='flat', zorder=1)
+        fig.colorbar(mesh, ax=ax, pad=0.08, label=get_text('bin_hours_label', lang))
+    
+    # Sobrepor leituras de sensores (uma única chamada de desenho, sem duplicar no ax2)
+    if sensor_data is not None:
+        sensor_tbs, sensor_pv = sensor_arrays(sensor_data)
+        
+        if sensor_mode == 'density':
+            tbs_edges, pv_edges, counts = bin_sensor_points(
+                sensor_tbs, sensor_pv, (tbs_min, tbs_max), ax.get_ylim()
+            )
+            mesh = ax.pcolormesh(tbs_edges, pv_edges, counts, cmap='viridis', alpha=0.6,
+                                 shading='flat', zorder=1)
+            fig.colorbar(mesh, ax=ax, pad=0.08, label=get_text('sensor_hours_label', lang))
+        else:
+            ax.plot(sensor_tbs, sensor_pv, ',', color='gray', alpha=0.3, rasterized=True,
+                    label=get_text('sensor_data_label', lang), zorder=1)
+    
+    # Nuvem de incerteza (amostras de Monte Carlo do ponto de estado)
+    if uncertainty_data is not None:
+        cloud_tbs, cloud_pv = sensor_arrays(uncertainty_data)
+        ax.plot(cloud_tbs, cloud_pv, '.', color='tab:orange', alpha=0.15, markersize=2,
+                rasterized=True, label=get_text('uncertainty_cloud_label', lang), zorder=2)
     
     # Plotar dados específicos com base no tipo
     if data['type'] == 'point':
@@ -548,5 +698,6 @@ def plot_psychrometric_chart(data, patm=101.325, altitude=0, lang='pt', comparis
     ax.set_title(get_text('chart_title', lang, altitude=altitude))
     ax.legend(loc='upper left')
     
-    plt.tight_layout()
+    with span('chart_layout'):
+        plt.tight_layout()
     return fig
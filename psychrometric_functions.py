@@ -1,5 +1,7 @@
 import numpy as np
 import math
+import time
+from solver_telemetry import telemetry
 
 # Funções para os cálculos das propriedades do ar úmido
 
@@ -25,6 +27,27 @@ def pressao_vapor_saturado(t):
         p_vs = np.exp(aux)
         return p_vs
 
+def pressao_vapor_saturado_vetorizado(t):
+    """
+    Cálculo da pressão do vapor de saturação para arrays de temperatura
+
+    Mesmas equações de pressao_vapor_saturado, avaliadas elemento a elemento
+    sem laço em Python.
+
+    Args:
+        t: Temperatura (°C), escalar ou array
+
+    Returns:
+        p_vs: Pressão de vapor saturado (kPa), array
+    """
+    t = np.asarray(t, dtype=float) + 273.16
+    aux_agua = -7511.52 / t + 89.63121 + 0.023998970 * t
+    aux_agua = aux_agua - 1.1654551E-5 * (t ** 2) - 1.2810336E-8 * (t ** 3)
+    aux_agua = aux_agua + 2.0998405E-11 * (t ** 4) - 12.150799 * np.log(t)
+    aux_gelo = 24.2779 - 6238.64 / t - 0.344438 * np.log(t)
+    p_vs = np.exp(np.where(t > 273.16, aux_agua, aux_gelo))
+    return p_vs
+
 def razao_mistura1(p, patm):
     """
     Primeiro método de cálculo para razão de mistura
@@ -124,9 +147,13 @@ def temperatura_b_molhado(ts, et, patm):
     Returns:
         t_bm: Temperatura de bulbo molhado (°C)
     """
+    inicio = time.perf_counter() if telemetry.enabled else 0.0
+    iteracoes = 0
+    convergiu = True
     delta = 0.1
     th = ts - delta
     while True:
+        iteracoes += 1
         rmbs = (et - 1.006 * th) / (2501. + 1.775 * th)
         ps = pressao_vapor_saturado(th)
         urel = (patm * rmbs) / (ps * (0.62198 + rmbs))
@@ -137,7 +164,61 @@ def temperatura_b_molhado(ts, et, patm):
             th = th - delta
         if 0.999 <= urel < 1:
             break
+        # Sem progresso possível e o laço não terminaria: estado supersaturado
+        # (delta se anula), urel exatamente 1 ou NaN (nenhum ramo altera th)
+        if th + delta == th or not (urel > 1 or urel < 0.999):
+            convergiu = False
+            break
     t_bm = th
+    if telemetry.enabled:
+        telemetry.record('temperatura_b_molhado', iteracoes, time.perf_counter() - inicio, convergiu,
+                         {'ts': ts, 'et': et, 'patm': patm})
+    return t_bm
+
+def temperatura_b_molhado_vetorizado(ts, et, patm, iteracoes=32):
+    """
+    Cálculo da temperatura do bulbo molhado para arrays
+
+    Resolve a mesma condição de temperatura_b_molhado (umidade relativa igual
+    a 1 na temperatura th com a entalpia et) por bissecção, simultaneamente
+    para todos os elementos.
+
+    Args:
+        ts: Temperatura de bulbo seco (°C), escalar ou array
+        et: Entalpia (kJ/kg), escalar ou array
+        patm: Pressão atmosférica (kPa)
+        iteracoes: Número de bissecções
+
+    Returns:
+        t_bm: Temperatura de bulbo molhado (°C), array
+    """
+    ts, et = np.broadcast_arrays(np.asarray(ts, dtype=float), np.asarray(et, dtype=float))
+
+    # O bulbo molhado fica entre o ponto de orvalho e o bulbo seco; a margem
+    # de 2 °C cobre o erro da correlação de temperatura_ponto_orvalho
+    w = (et - 1.006 * ts) / (2501. + 1.775 * ts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tpo = temperatura_ponto_orvalho(pressao_vapor(w, patm))
+    lo = np.where(np.isfinite(tpo) & (w > 0), np.minimum(tpo, ts) - 2.0, np.nan)
+    hi = ts.copy()
+
+    def urel(th):
+        rmbs = (et - 1.006 * th) / (2501. + 1.775 * th)
+        ps = pressao_vapor_saturado_vetorizado(th)
+        return (patm * rmbs) / (ps * (0.62198 + rmbs))
+
+    # Sem intervalo válido, usar o limite inferior amplo
+    with np.errstate(invalid='ignore'):
+        lo = np.where(urel(lo) >= 1, lo, np.minimum(ts, -100.0) - 10.0)
+
+    # A umidade relativa na saturação adiabática cai à medida que th aumenta
+    for _ in range(iteracoes):
+        th = (lo + hi) / 2
+        saturado = urel(th) >= 1
+        lo = np.where(saturado, th, lo)
+        hi = np.where(saturado, hi, th)
+
+    t_bm = (lo + hi) / 2
     return t_bm
 
 def temperatura_b_seco(h, w):
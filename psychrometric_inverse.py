@@ -0,0 +1,245 @@
+import numpy as np
+
+from psychrometric_batch import BATCH_FUNCTIONS
+from uncertainty import function_args
+
+# Solução inversa dos cálculos de estado e de processo.
+#
+# Dadas as saídas desejadas e as entradas livres (com limites), encontra os
+# valores das entradas livres usando as versões vetorizadas de
+# psychrometric_batch como modelo direto. Cada linha é um problema
+# independente, e todas as linhas avançam juntas:
+#   - uma entrada livre e uma saída: busca de intervalo com troca de sinal em
+#     uma grade e refinamento por falsa posição (Illinois), sempre com a raiz
+#     dentro do intervalo;
+#   - demais casos: mínimos quadrados (Levenberg-Marquardt) com jacobiano por
+#     diferenças finitas e entradas limitadas ao intervalo.
+#
+# Entradas nas unidades dos argumentos (ur decimal) e saídas nas unidades do
+# resultado (ur em %, rm em g/kg). Saídas de processos são indicadas pelo
+# ponto, ex.: 'point2.ur'.
+#
+#   # Temperatura de saída do aquecedor que leva o ar a 60 % de UR
+#   sol = solve_inverse('calculate_aquece_resfria', {'tbs1': 12.0, 'ur1': 0.95},
+#                       {'tbs2': (12.0, 60.0)}, {'point2.ur': 60.0})
+#   sol['inputs']['tbs2']
+
+DEFAULT_GRID = 16
+
+def output_value(result, path):
+    """
+    Valor de uma saída do resultado de uma função em lote
+
+    Args:
+        result: Dicionário retornado pela função
+        path: Nome da saída, com o ponto para processos (ex.: 'point2.ur')
+
+    Returns:
+        array: Valores da saída
+    """
+    value = result
+    for key in path.split('.'):
+        value = value[key]
+    return np.asarray(value, dtype=float)
+
+def _bracket_solve(evaluate, low, high, goal, grid, tol, max_iter):
+    """
+    Raiz de f(x) = goal em [low, high] por linha: grade e falsa posição (Illinois)
+
+    Uma linha só converge com |f(x) - goal| dentro da tolerância. Quando o
+    intervalo se fecha com resíduo grande, a troca de sinal vem de uma
+    descontinuidade de f (ex.: troca gelo/água da pressão de saturação em
+    0 °C), e não de uma raiz.
+
+    Args:
+        evaluate: Função (linhas, x) -> saída nas linhas indicadas
+
+    Returns:
+        tuple: Arrays (x, convergiu, descontinuidade)
+    """
+    n = low.size
+    columns = np.arange(n)
+    xs = low + np.outer(np.linspace(0.0, 1.0, grid), high - low)  # grade x linha
+    fs = evaluate(np.tile(columns, grid), xs.ravel()).reshape(grid, n) - goal
+
+    # Primeiro intervalo da grade com troca de sinal (ou raiz exata)
+    change = (np.sign(fs[:-1]) * np.sign(fs[1:]) <= 0) & np.isfinite(fs[:-1]) & np.isfinite(fs[1:])
+    bracketed = change.any(axis=0)
+    first = np.argmax(change, axis=0)
+    a, b = xs[first, columns], xs[first + 1, columns]
+    fa, fb = fs[first, columns], fs[first + 1, columns]
+
+    # Sem troca de sinal: melhor ponto da grade, marcado como não convergido
+    closest = np.argmin(np.where(np.isfinite(fs), np.abs(fs), np.inf), axis=0)
+    x = np.where(bracketed, np.where(fb == 0, b, a), xs[closest, columns])
+    fx = np.where(bracketed, np.where(fb == 0, fb, fa), fs[closest, columns])
+    done = ~bracketed | (fa == 0) | (fb == 0)
+    side = np.zeros(n)
+
+    scale = tol * (1 + np.abs(goal))
+    for _ in range(max_iter):
+        if done.all():
+            break
+        rows = np.nonzero(~done)[0]
+        ar, br, far, fbr = a[rows], b[rows], fa[rows], fb[rows]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            c = (ar * fbr - br * far) / (fbr - far)
+        inside = np.isfinite(c) & (c > np.minimum(ar, br)) & (c < np.maximum(ar, br))
+        c = np.where(inside, c, (ar + br) / 2)
+        fc = evaluate(rows, c) - goal[rows]
+
+        # Mantém a raiz entre a e b; quando o mesmo extremo se repete, o valor
+        # do outro é reduzido à metade (Illinois)
+        left = np.sign(fc) == np.sign(far)
+        a[rows] = np.where(left, c, ar)
+        fa[rows] = np.where(left, fc, np.where(side[rows] == -1, far / 2, far))
+        b[rows] = np.where(left, br, c)
+        fb[rows] = np.where(left, np.where(side[rows] == 1, fbr / 2, fbr), fc)
+        side[rows] = np.where(left, 1, -1)
+        x[rows] = c
+        fx[rows] = fc
+        # Sem atingir a tolerância da saída, só para quando o intervalo chega à
+        # resolução do ponto flutuante
+        width = np.abs(b[rows] - a[rows])
+        done[rows] = (np.abs(fc) <= scale[rows]) | (width <= 4 * np.finfo(float).eps * np.maximum(np.abs(c), 1.0))
+
+    converged = bracketed & (np.abs(fx) <= scale)
+    collapsed = np.abs(b - a) <= tol * (high - low)
+    return x, converged, bracketed & collapsed & ~converged
+
+def _least_squares(evaluate, low, high, goal, tol, max_iter):
+    """
+    Levenberg-Marquardt por linha, com as entradas normalizadas em [0, 1]
+
+    Args:
+        evaluate: Função (linhas, x n x p) -> saídas n x m nas linhas indicadas
+
+    Returns:
+        tuple: Arrays (x n x p, custo final)
+    """
+    n, p = low.shape
+    width = high - low
+    weights = 1.0 / (1.0 + np.abs(goal))
+
+    def residuals(rows, u):
+        r = (evaluate(rows, low[rows] + u * width[rows]) - goal[rows]) * weights[rows]
+        return r, np.where(np.isfinite(r).all(axis=1), (r ** 2).sum(axis=1), np.inf)
+
+    u = np.full((n, p), 0.5)
+    r, cost = residuals(np.arange(n), u)
+    damping = np.full(n, 1e-3)
+    done = cost <= tol ** 2
+    h = 1e-7
+
+    for _ in range(max_iter):
+        if done.all():
+            break
+        rows = np.nonzero(~done)[0]
+        ua, ra = u[rows], r[rows]
+
+        # Jacobiano por diferenças finitas, com as p perturbações em uma só chamada
+        step = np.where(ua + h <= 1, h, -h)
+        shifted = np.repeat(ua[None], p, axis=0)
+        shifted[np.arange(p), :, np.arange(p)] += step.T
+        rs, _ = residuals(np.tile(rows, p), shifted.reshape(-1, p))
+        jac = ((rs.reshape(p, len(rows), -1) - ra[None]) / step.T[:, :, None]).transpose(1, 2, 0)
+
+        # Passo amortecido: (J'J + λ diag(J'J)) δ = -J'r
+        jtj = jac.transpose(0, 2, 1) @ jac
+        gradient = np.einsum('kmp,km->kp', jac, ra)
+        diagonal = np.einsum('kii->ki', jtj) + 1e-12
+        system = jtj + (damping[rows, None] * diagonal)[:, :, None] * np.eye(p)
+        delta = np.linalg.solve(system, -gradient[:, :, None])[:, :, 0]
+
+        candidate = np.clip(ua + delta, 0.0, 1.0)
+        rc, cost_c = residuals(rows, candidate)
+        better = cost_c < cost[rows]
+        moved = np.abs(candidate - ua).max(axis=1)
+
+        u[rows] = np.where(better[:, None], candidate, ua)
+        r[rows] = np.where(better[:, None], rc, ra)
+        cost[rows] = np.where(better, cost_c, cost[rows])
+        damping[rows] = np.where(better, damping[rows] / 3, damping[rows] * 4)
+        done[rows] = (cost[rows] <= tol ** 2) | (better & (moved <= tol)) | (damping[rows] > 1e12)
+
+    return low + u * width, cost
+
+def solve_inverse(name, fixed, free, targets, patm=101.325, method=None, tol=1e-9, max_iter=100,
+                  grid=DEFAULT_GRID):
+    """
+    Encontra as entradas livres que levam um cálculo às saídas desejadas
+
+    Args:
+        name: Nome da função calculate_* (chave de BATCH_FUNCTIONS)
+        fixed: Dicionário com os argumentos conhecidos (escalares ou arrays)
+        free: Dicionário argumento -> (mínimo, máximo) das entradas livres
+        targets: Dicionário saída -> valor desejado (escalares ou arrays), com
+                 o ponto para processos (ex.: {'point2.ur': 60.0})
+        patm: Pressão atmosférica (kPa)
+        method: 'bracket' (uma entrada livre e uma saída) ou 'least_squares';
+                padrão: 'bracket' quando possível
+        tol: Tolerância relativa das saídas e das entradas
+        max_iter: Número máximo de iterações
+        grid: Pontos da grade de busca do intervalo ('bracket')
+
+    Returns:
+        dict: 'inputs' com o valor de cada entrada livre, 'outputs' com o
+              resultado da função na solução, 'residual' por saída (obtido -
+              desejado), 'converged' (array booleano por linha, com todos
+              os resíduos dentro da tolerância) e 'discontinuity' (linhas em
+              que o intervalo de 'bracket' se fechou sobre um salto da
+              saída, sem raiz; sempre falso em 'least_squares')
+    """
+    args = function_args(name)
+    unknown = (set(fixed) | set(free)) - set(args)
+    missing = [arg for arg in args if arg not in fixed and arg not in free]
+    if unknown or missing or set(fixed) & set(free):
+        raise ValueError(f'Argumentos de {name}: {", ".join(args)}')
+    if method is None:
+        method = 'bracket' if len(free) == 1 and len(targets) == 1 else 'least_squares'
+    if method == 'bracket' and (len(free) != 1 or len(targets) != 1):
+        raise ValueError('O método bracket exige uma entrada livre e uma saída')
+
+    # Todas as entradas, limites e alvos com o mesmo número de linhas
+    names, paths = list(free), list(targets)
+    arrays = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in fixed.values()),
+                                 *(np.asarray(free[arg][0], dtype=float) for arg in names),
+                                 *(np.asarray(free[arg][1], dtype=float) for arg in names),
+                                 *(np.asarray(targets[path], dtype=float) for path in paths))
+    arrays = [a.ravel() for a in arrays]
+    k, p = len(fixed), len(names)
+    fixed_rows = dict(zip(fixed, arrays[:k]))
+    low = np.column_stack(arrays[k:k + p])
+    high = np.column_stack(arrays[k + p:k + 2 * p])
+    goal = np.column_stack(arrays[k + 2 * p:])
+
+    def call(rows, x):
+        values = {arg: column[rows] for arg, column in fixed_rows.items()}
+        values.update({arg: x[:, j] for j, arg in enumerate(names)})
+        with np.errstate(all='ignore'):
+            return BATCH_FUNCTIONS[name](*(values[arg] for arg in args), patm)
+
+    def evaluate(rows, x):
+        result = call(rows, x.reshape(len(rows), p))
+        return np.column_stack([output_value(result, path) for path in paths])
+
+    if method == 'bracket':
+        x, converged, discontinuity = _bracket_solve(lambda rows, x: evaluate(rows, x)[:, 0], low[:, 0],
+                                                     high[:, 0], goal[:, 0], grid, tol, max_iter)
+        x = x[:, None]
+    elif method == 'least_squares':
+        x, cost = _least_squares(evaluate, low, high, goal, tol, max_iter)
+        converged = cost <= len(paths) * max(tol, 1e-8) ** 2
+        discontinuity = np.zeros(len(x), dtype=bool)
+    else:
+        raise ValueError(f'Método desconhecido: {method}')
+
+    rows = np.arange(len(x))
+    outputs = call(rows, x)
+    return {
+        'inputs': {arg: x[:, j] for j, arg in enumerate(names)},
+        'outputs': outputs,
+        'residual': {path: output_value(outputs, path) - goal[:, i] for i, path in enumerate(paths)},
+        'converged': converged,
+        'discontinuity': discontinuity
+    }
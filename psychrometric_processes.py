@@ -1,4 +1,6 @@
+import time
 from psychrometric_functions import *
+from solver_telemetry import telemetry
 
 def calculate_aquece_resfria(tbs1, ur1, tbs2, patm):
     """
@@ -80,6 +82,8 @@ def calculate_u_adiabatica_tbs(tbs1, ur1, tbs2, patm):
     Returns:
         dict: Dicionário com as propriedades dos pontos 1 e 2
     """
+    inicio = time.perf_counter() if telemetry.enabled else 0.0
+    
     # Ponto de Estado 1
     pvs = pressao_vapor_saturado(tbs1)
     pv = ur1 * pvs
@@ -114,6 +118,7 @@ def calculate_u_adiabatica_tbs(tbs1, ur1, tbs2, patm):
     # Ajuste da razão de mistura até atingir a temperatura de bulbo seco desejada
     iterations = 0
     max_iterations = 1000
+    converged = False
     
     while iterations < max_iterations:
         iterations += 1
@@ -130,10 +135,16 @@ def calculate_u_adiabatica_tbs(tbs1, ur1, tbs2, patm):
         
         if tbs1 > tbs2:   # tbs > tbs2
             if abs(tbs0 - tbs2) < 0.01:
+                converged = True
                 break
         elif tbs0 > tbs2:
+            converged = True
             break
     
+    if telemetry.enabled:
+        telemetry.record('calculate_u_adiabatica_tbs', iterations, time.perf_counter() - inicio, converged,
+                         {'tbs1': tbs1, 'ur1': ur1, 'tbs2': tbs2, 'patm': patm})
+    
     tpo2 = temperatura_ponto_orvalho(pv2)
     ve2 = volume_especifico(tbs2, rm2, patm)
     
@@ -164,6 +175,8 @@ def calculate_u_adiabatica_ur(tbs1, ur1, ur2, patm):
     Returns:
         dict: Dicionário com as propriedades dos pontos 1 e 2
     """
+    inicio = time.perf_counter() if telemetry.enabled else 0.0
+    
     # Ponto de Estado 1
     pvs = pressao_vapor_saturado(tbs1)
     pv = ur1 * pvs
@@ -193,6 +206,7 @@ def calculate_u_adiabatica_ur(tbs1, ur1, ur2, patm):
     # Ajuste da razão de mistura até atingir a umidade relativa desejada
     iterations = 0
     max_iterations = 1000
+    converged = False
     
     while iterations < max_iterations:
         iterations += 1
@@ -204,8 +218,13 @@ def calculate_u_adiabatica_ur(tbs1, ur1, ur2, patm):
         ur0 = pv2 / pvs2
         
         if ur0 >= ur2 or abs(ur0 - ur2) < 0.001:
+            converged = True
             break
     
+    if telemetry.enabled:
+        telemetry.record('calculate_u_adiabatica_ur', iterations, time.perf_counter() - inicio, converged,
+                         {'tbs1': tbs1, 'ur1': ur1, 'ur2': ur2, 'patm': patm})
+    
     if ur2 >= 0.99:
         tbs2 = tbm
         tpo2 = tbm
@@ -416,3 +435,97 @@ def calculate_mistura_fluxos(tbs1, ur1, q1, tbs2, ur2, q2, patm):
         'q2': q2,
         'q3': q3
     }
+
+def _ponto(tbs, pv, patm):
+    """
+    Propriedades de um ponto de estado a partir de tbs e pv
+    """
+    pvs = pressao_vapor_saturado(tbs)
+    rm = razao_mistura1(pv, patm)
+    e = entalpia(tbs, rm)
+    return {
+        'tbs': tbs,
+        'tbm': temperatura_b_molhado(tbs, e, patm),
+        'tpo': temperatura_ponto_orvalho(pv),
+        'ur': pv / pvs * 100,
+        'rm': rm * 1000,
+        'pvs': pvs,
+        'pv': pv,
+        've': volume_especifico(tbs, rm, patm),
+        'e': e
+    }
+
+def calculate_recuperador(tbs1, ur1, q1, tbs2, ur2, q2, ef_sensivel, ef_latente, patm):
+    """
+    Calcula um recuperador de calor (trocador sensível ou roda entálpica) entre insuflamento e exaustão
+    
+    As efetividades seguem a definição da AHRI 1060, sobre a menor vazão
+    mássica: ef_latente = 0 corresponde a um trocador apenas sensível. O ar de
+    exaustão que passa da saturação condensa. Há risco de congelamento quando
+    o lado frio (ar externo ou exaustão na saída) está abaixo do ponto de
+    orvalho da exaustão e abaixo de 0 °C.
+    
+    Args:
+        tbs1: Temperatura de bulbo seco do ar externo (insuflamento) (°C)
+        ur1: Umidade relativa do ar externo (decimal)
+        q1: Vazão de ar de insuflamento (m³/h)
+        tbs2: Temperatura de bulbo seco do ar de exaustão (°C)
+        ur2: Umidade relativa do ar de exaustão (decimal)
+        q2: Vazão de ar de exaustão (m³/h)
+        ef_sensivel: Efetividade sensível (0 a 1)
+        ef_latente: Efetividade latente (0 a 1)
+        patm: Pressão atmosférica (kPa)
+    
+    Returns:
+        dict: Pontos 1 (externo), 2 (exaustão), 3 (insuflamento após o
+              recuperador) e 4 (exaustão após o recuperador), vazões, calor
+              recuperado pelo insuflamento 'sensible_heat' e 'total_heat' (kW),
+              'condensate' (kg/h) e 'frost_risk'
+    """
+    point1 = _ponto(tbs1, ur1 * pressao_vapor_saturado(tbs1), patm)
+    point2 = _ponto(tbs2, ur2 * pressao_vapor_saturado(tbs2), patm)
+    m1 = q1 / point1['ve']  # massa de ar seco (kg/h)
+    m2 = q2 / point2['ve']
+    rm1 = point1['rm'] / 1000
+    rm2 = point2['rm'] / 1000
+    razao = min(m1, m2) / m1
+    
+    # Insuflamento: limitado à saturação
+    tbs3 = tbs1 + ef_sensivel * razao * (tbs2 - tbs1)
+    rm3 = rm1 + ef_latente * razao * (rm2 - rm1)
+    rm3 = min(rm3, razao_mistura1(pressao_vapor_saturado(tbs3), patm))
+    e3 = entalpia(tbs3, rm3)
+    
+    # Exaustão: balanços de energia e de água
+    e4 = point2['e'] - m1 / m2 * (e3 - point1['e'])
+    rm4 = rm2 - m1 / m2 * (rm3 - rm1)
+    tbs4 = temperatura_b_seco(e4, rm4)
+    condensa = tbs4 < temperatura_ponto_orvalho(pressao_vapor(rm4, patm))
+    condensado = 0.0
+    if condensa:
+        # Saturado com a mesma entalpia; a água excedente condensa
+        tbs4 = temperatura_b_molhado(temperatura_b_seco(e4, 0.0), e4, patm)
+        rm4_sat = razao_mistura1(pressao_vapor_saturado(tbs4), patm)
+        condensado = m2 * (rm4 - rm4_sat)
+        rm4 = rm4_sat
+    
+    point3 = _ponto(tbs3, pressao_vapor(rm3, patm), patm)
+    point4 = _ponto(tbs4, pressao_vapor(rm4, patm), patm)
+    lado_frio = min(tbs1, tbs4)
+    point1.update({'q': q1, 'm': m1})
+    point2.update({'q': q2, 'm': m2})
+    point3.update({'q': m1 * point3['ve'], 'm': m1})
+    point4.update({'q': m2 * point4['ve'], 'm': m2})
+    
+    return {
+        'point1': point1,
+        'point2': point2,
+        'point3': point3,
+        'point4': point4,
+        'q1': q1,
+        'q2': q2,
+        'sensible_heat': m1 * (1.006 + 1.775 * rm3) * (tbs3 - tbs1) / 3600,
+        'total_heat': m1 * (e3 - point1['e']) / 3600,
+        'condensate': condensado,
+        'frost_risk': bool(lado_frio < point2['tpo'] and lado_frio < 0)
+    }
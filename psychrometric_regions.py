@@ -0,0 +1,222 @@
+import numpy as np
+from psychrometric_functions import pressao_vapor_saturado_vetorizado, razao_mistura1, pressao_vapor
+
+# Regiões do gráfico psicrométrico e classificação de estados.
+#
+# Uma região é um polígono nas coordenadas dos eixos do gráfico
+# (psychrometric_chart): temperatura de bulbo seco (°C) no eixo x e razão de
+# mistura (g/kg, eixo secundário) ou pressão de vapor (kPa, eixo principal)
+# no eixo y. A classificação usa o teste par-ímpar (ray casting), vetorizado
+# sobre os estados: o laço percorre apenas as arestas do polígono.
+#
+#   regions = comfort_zones() + [condensation_region(12.0)]
+#   hours = region_hours({'tbs': tbs, 'ur': ur}, regions, patm=101.325)
+
+COORDINATES = ('rm', 'pv')
+
+# Estados fora de todas as regiões em region_hours
+OUTSIDE = 'region_outside'
+
+# Zonas de conforto da ASHRAE 55 (método gráfico; 1,0 a 1,3 met, ar a menos
+# de 0,2 m/s), em (tbs °C, rm g/kg), com limite superior de 12 g/kg.
+# Vértices aproximados, tomando a temperatura operativa igual à de bulbo seco;
+# substituir pelos limites do projeto quando necessário.
+ASHRAE_55_ZONES = {
+    'region_comfort_winter': ((20.5, 0.0), (25.5, 0.0), (24.5, 12.0), (19.5, 12.0)),
+    'region_comfort_summer': ((24.5, 0.0), (28.0, 0.0), (27.0, 12.0), (23.5, 12.0))
+}
+
+REGION_COLORS = ('tab:green', 'tab:orange', 'tab:red', 'tab:purple', 'tab:brown', 'tab:cyan')
+
+def region(name, vertices, coordinates='rm', color=None):
+    """
+    Define uma região poligonal do gráfico
+
+    Args:
+        name: Nome da região (chave de tradução ou texto livre)
+        vertices: Sequência de pares (tbs, y), com y em g/kg ('rm') ou kPa ('pv')
+        coordinates: Eixo y dos vértices, 'rm' ou 'pv'
+        color: Cor usada no sombreamento do gráfico
+
+    Returns:
+        dict: Região com 'name', 'vertices' (array n x 2), 'coordinates' e 'color'
+    """
+    if coordinates not in COORDINATES:
+        raise ValueError(f'Coordenadas desconhecidas: {coordinates}')
+    vertices = np.asarray(vertices, dtype=float)
+    if vertices.ndim != 2 or vertices.shape[1] != 2 or len(vertices) < 3:
+        raise ValueError('A região precisa de pelo menos três vértices (tbs, y)')
+    return {'name': name, 'vertices': vertices, 'coordinates': coordinates, 'color': color}
+
+def comfort_zones():
+    """
+    Zonas de conforto de inverno e verão da ASHRAE 55 (ver ASHRAE_55_ZONES)
+
+    Returns:
+        list: Regiões em coordenadas (tbs, rm)
+    """
+    return [region(name, vertices, 'rm', color)
+            for (name, vertices), color in zip(ASHRAE_55_ZONES.items(), ('tab:blue', 'tab:green'))]
+
+def condensation_region(surface_temperature, tbs_max=100.0, n=200, name='region_condensation'):
+    """
+    Região de risco de condensação sobre uma superfície
+
+    Contém os estados com ponto de orvalho igual ou acima da temperatura da
+    superfície: acima da pressão de vapor de saturação na superfície e abaixo
+    da curva de saturação.
+
+    Args:
+        surface_temperature: Temperatura da superfície (°C)
+        tbs_max: Temperatura máxima coberta pela região (°C)
+        n: Número de pontos da curva de saturação
+        name: Nome da região
+
+    Returns:
+        dict: Região em coordenadas (tbs, pv)
+    """
+    t = np.linspace(surface_temperature, max(tbs_max, surface_temperature + 1.0), n)
+    pv = pressao_vapor_saturado_vetorizado(t)
+    vertices = np.column_stack((np.append(t, t[-1]), np.append(pv, pv[0])))
+    return region(name, vertices, 'pv', 'tab:red')
+
+def points_in_polygon(x, y, vertices):
+    """
+    Teste vetorizado de pontos dentro de um polígono (regra par-ímpar)
+
+    Args:
+        x: Array de abscissas
+        y: Array de ordenadas (mesma forma de x)
+        vertices: Array n x 2 com os vértices do polígono, sem repetir o primeiro
+
+    Returns:
+        array: Booleano com a forma de x (False para coordenadas não finitas)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    vertices = np.asarray(vertices, dtype=float)
+    inside = np.zeros(x.shape, dtype=bool)
+
+    # Só os pontos dentro do retângulo envolvente passam pelo teste das arestas
+    (x_min, y_min), (x_max, y_max) = vertices.min(axis=0), vertices.max(axis=0)
+    candidates = np.nonzero((x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max))
+    px, py = x[candidates], y[candidates]
+
+    # Pontos ordenados por y: cada aresta só testa a faixa de pontos que ela
+    # atravessa em y, e curvas com muitos vértices (saturação) custam quase
+    # o mesmo que um polígono simples
+    order = np.argsort(py)
+    sx, sy = px[order], py[order]
+    crossings = np.zeros(sy.shape, dtype=bool)
+    x1, y1 = vertices.T
+    x2, y2 = np.roll(vertices, -1, axis=0).T
+    for xa, ya, xb, yb in zip(x1, y1, x2, y2):
+        if ya == yb:
+            continue
+        start, stop = np.searchsorted(sy, (min(ya, yb), max(ya, yb)))
+        x_cross = xa + (sy[start:stop] - ya) * (xb - xa) / (yb - ya)
+        crossings[start:stop] ^= sx[start:stop] < x_cross
+
+    unsorted = np.empty_like(crossings)
+    unsorted[order] = crossings
+    inside[candidates] = unsorted
+    return inside
+
+def state_coordinates(states, patm=101.325):
+    """
+    Coordenadas de gráfico de um conjunto de estados
+
+    Args:
+        states: Dicionário com 'tbs' (°C) e 'pv' (kPa), 'rm' (g/kg) ou 'ur' (%),
+                como os dados de sensores ou os resultados das funções em lote
+        patm: Pressão atmosférica (kPa)
+
+    Returns:
+        dict: Arrays 'tbs', 'rm' (g/kg) e 'pv' (kPa), na forma das entradas
+    """
+    tbs = np.asarray(states['tbs'], dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if 'pv' in states:
+            pv = np.asarray(states['pv'], dtype=float)
+            rm = razao_mistura1(pv, patm) * 1000
+        elif 'rm' in states:
+            rm = np.asarray(states['rm'], dtype=float)
+            pv = pressao_vapor(rm / 1000.0, patm)
+        else:
+            pv = np.asarray(states['ur'], dtype=float) / 100.0 * pressao_vapor_saturado_vetorizado(tbs)
+            rm = razao_mistura1(pv, patm) * 1000
+    tbs, rm, pv = np.broadcast_arrays(tbs, rm, pv)
+    return {'tbs': tbs, 'rm': rm, 'pv': pv}
+
+def classify(states, regions, patm=101.325):
+    """
+    Classifica os estados em cada região
+
+    Args:
+        states: Estados (ver state_coordinates)
+        regions: Lista de regiões
+        patm: Pressão atmosférica (kPa)
+
+    Returns:
+        dict: Máscara booleana por nome de região, na forma das entradas
+              (regiões podem se sobrepor)
+    """
+    return _classify(state_coordinates(states, patm), regions)
+
+def _classify(coords, regions):
+    return {r['name']: points_in_polygon(coords['tbs'], coords[r['coordinates']], r['vertices'])
+            for r in regions}
+
+def region_hours(states, regions, patm=101.325, hours_per_state=1.0):
+    """
+    Horas (ou número de leituras) em cada região
+
+    Args:
+        states: Estados (ver state_coordinates), ex.: um ano de leituras horárias
+        regions: Lista de regiões
+        patm: Pressão atmosférica (kPa)
+        hours_per_state: Duração de cada leitura (h)
+
+    Returns:
+        dict: Horas por nome de região e, em OUTSIDE, horas fora de todas
+              (estados inválidos não são contados)
+    """
+    coords = state_coordinates(states, patm)
+    masks = _classify(coords, regions)
+    valid = np.isfinite(coords['tbs']) & np.isfinite(coords['pv'])
+    hours = {name: float(mask.sum()) * hours_per_state for name, mask in masks.items()}
+    outside = valid.copy()
+    for mask in masks.values():
+        outside &= ~mask
+    hours[OUTSIDE] = float(outside.sum()) * hours_per_state
+    return hours
+
+def region_outline(region, patm=101.325, points_per_edge=20):
+    """
+    Contorno fechado da região nos eixos principais do gráfico (tbs, pv)
+
+    As arestas definidas em razão de mistura são subdivididas antes da
+    conversão para pressão de vapor, que não é linear em rm.
+
+    Args:
+        region: Região
+        patm: Pressão atmosférica (kPa)
+        points_per_edge: Pontos por aresta nas regiões em 'rm'
+
+    Returns:
+        tuple: Arrays (tbs, pv) com o primeiro vértice repetido no final
+    """
+    vertices = region['vertices']
+    closed = np.vstack((vertices, vertices[:1]))
+    if region['coordinates'] == 'pv':
+        return closed[:, 0], closed[:, 1]
+    s = np.linspace(0.0, 1.0, points_per_edge, endpoint=False)[:, None]
+    dense = (closed[:-1, None, :] * (1 - s) + closed[1:, None, :] * s).reshape(-1, 2)
+    dense = np.vstack((dense, dense[:1]))
+    return dense[:, 0], pressao_vapor(dense[:, 1] / 1000.0, patm)
+
+def region_color(region, index):
+    """
+    Cor de sombreamento da região (cor própria ou da paleta REGION_COLORS)
+    """
+    return region.get('color') or REGION_COLORS[index % len(REGION_COLORS)]
@@ -0,0 +1,236 @@
+import numpy as np
+from psychrometric_functions import pressao_vapor_saturado_vetorizado, razao_mistura1
+from psychrometric_batch import PROPERTY_KEYS, calculate_from_tbs_ur_batch, calculate_from_tbs_tbm_batch
+from psychrometric_batch import calculate_from_tbs_tpo_batch
+
+# Derivadas analíticas das propriedades psicrométricas (sensibilidades).
+#
+# As funções *_jacobian retornam as mesmas propriedades das versões em lote e,
+# para cada propriedade, as derivadas em relação às duas entradas e a patm.
+# As derivadas são propagadas pela regra da cadeia a partir das equações de
+# psychrometric_functions; a do bulbo molhado vem do teorema da função
+# implícita aplicado à condição de saturação adiabática, sem diferenças finitas.
+#
+# Unidades: propriedades como no resultado (ur em %, rm em g/kg) e entradas
+# como nos argumentos (ur decimal), de modo que J @ incertezas das entradas
+# dá a propagação linear das incertezas.
+#
+#   jac = calculate_from_tbs_ur_jacobian(25.0, 0.6, 101.325)
+#   jac['jacobian']['tbm']['ur']   # ∂tbm/∂ur (°C por unidade de ur decimal)
+
+# Fatores de conversão das propriedades para as unidades do resultado
+_OUTPUT_SCALE = {'ur': 100.0, 'rm': 1000.0}
+
+def derivada_pressao_vapor_saturado(t):
+    """
+    Derivada da pressão de vapor de saturação em relação à temperatura
+
+    Em 0 °C a correlação troca entre água e gelo e a derivada é descontínua;
+    nesse ponto vale o ramo usado por pressao_vapor_saturado_vetorizado.
+
+    Args:
+        t: Temperatura (°C), escalar ou array
+
+    Returns:
+        dp_vs: Derivada da pressão de vapor saturado (kPa/°C), array
+    """
+    t = np.asarray(t, dtype=float) + 273.16
+    dlog_agua = 7511.52 / t ** 2 + 0.023998970 - 2 * 1.1654551E-5 * t - 3 * 1.2810336E-8 * t ** 2
+    dlog_agua = dlog_agua + 4 * 2.0998405E-11 * t ** 3 - 12.150799 / t
+    dlog_gelo = 6238.64 / t ** 2 - 0.344438 / t
+    return pressao_vapor_saturado_vetorizado(t - 273.16) * np.where(t > 273.16, dlog_agua, dlog_gelo)
+
+def derivada_temperatura_ponto_orvalho(p):
+    """
+    Derivada da temperatura do ponto de orvalho em relação à pressão de vapor
+
+    Args:
+        p: Pressão parcial de vapor (kPa), escalar ou array
+
+    Returns:
+        dt_po: Derivada do ponto de orvalho (°C/kPa), array
+    """
+    p = np.asarray(p, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = np.log10(p * 10)
+        return (237.3 * 8.2859 - 186.4905) / (a - 8.2859) ** 2 / (p * np.log(10))
+
+def derivadas_b_molhado(tbm, e, patm):
+    """
+    Derivadas do bulbo molhado em relação à entalpia e à pressão atmosférica
+
+    O bulbo molhado th satisfaz G(th, e, patm) = 0, com
+    G = (e - 1.006 th) / (2501 + 1.775 th) - razao_mistura1(pvs(th), patm),
+    a mesma condição resolvida por temperatura_b_molhado. Pelo teorema da
+    função implícita, dth/dx = -(∂G/∂x) / (∂G/∂th).
+
+    Args:
+        tbm: Temperatura de bulbo molhado (°C), solução da condição
+        e: Entalpia (kJ/kg)
+        patm: Pressão atmosférica (kPa)
+
+    Returns:
+        tuple: (∂tbm/∂e em °C por kJ/kg, ∂tbm/∂patm em °C/kPa)
+    """
+    tbm, e, patm = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in (tbm, e, patm)])
+    ps = pressao_vapor_saturado_vetorizado(tbm)
+    dps = derivada_pressao_vapor_saturado(tbm)
+    den = 2501. + 1.775 * tbm
+
+    dg_dth = (-1.006 * den - 1.775 * (e - 1.006 * tbm)) / den ** 2 - 0.62198 * patm * dps / (patm - ps) ** 2
+    dg_de = 1.0 / den
+    dg_dpatm = 0.62198 * ps / (patm - ps) ** 2
+    return -dg_de / dg_dth, -dg_dpatm / dg_dth
+
+def _unit(index, shape):
+    """
+    Gradiente de uma entrada: vetor unitário na posição index (entradas x1, x2, patm)
+    """
+    grad = np.zeros((3,) + shape)
+    grad[index] = 1.0
+    return grad
+
+def _state_jacobian(values, g_tbs, g_pv, g_patm, patm, g_tpo=None, g_tbm=None):
+    """
+    Propaga os gradientes de tbs, pv e patm para todas as propriedades
+
+    Args:
+        values: Resultado da função em lote (unidades da interface)
+        g_tbs, g_pv, g_patm: Gradientes (3, ...) em relação às entradas
+        patm: Pressão atmosférica (kPa), array
+        g_tpo, g_tbm: Gradientes já conhecidos (quando são entradas ou
+                      seguem regras especiais da função)
+
+    Returns:
+        dict: Gradiente (3, ...) de cada propriedade, em unidades SI decimais
+    """
+    tbs, pv, pvs = values['tbs'], values['pv'], values['pvs']
+    rm = values['rm'] / 1000.0
+
+    g_pvs = derivada_pressao_vapor_saturado(tbs) * g_tbs
+    g_ur = g_pv / pvs - pv / pvs ** 2 * g_pvs
+    g_rm = 0.62198 * (patm * g_pv - pv * g_patm) / (patm - pv) ** 2
+    g_e = (1.006 + 1.775 * rm) * g_tbs + (2501. + 1.775 * tbs) * g_rm
+    g_ve = (0.28705 / patm * (1 + 1.6078 * rm) * g_tbs
+            + 0.28705 * (tbs + 273.16) / patm * 1.6078 * g_rm
+            - values['ve'] / patm * g_patm)
+
+    if g_tpo is None:
+        g_tpo = derivada_temperatura_ponto_orvalho(pv) * g_pv
+    if g_tbm is None:
+        dtbm_de, dtbm_dpatm = derivadas_b_molhado(values['tbm'], values['e'], patm)
+        g_tbm = dtbm_de * g_e + dtbm_dpatm * g_patm
+
+    return {'tbs': g_tbs, 'tbm': g_tbm, 'tpo': g_tpo, 'ur': g_ur, 'rm': g_rm,
+            'pvs': g_pvs, 'pv': g_pv, 've': g_ve, 'e': g_e}
+
+def _result(values, grads, inputs):
+    """
+    Monta o resultado com as propriedades e o jacobiano por propriedade e entrada
+    """
+    jacobian = {}
+    for key in PROPERTY_KEYS:
+        grad = grads[key] * _OUTPUT_SCALE.get(key, 1.0)
+        jacobian[key] = dict(zip(inputs, grad))
+    return {'values': values, 'jacobian': jacobian}
+
+def calculate_from_tbs_ur_jacobian(tbs, ur, patm):
+    """
+    Calcula as propriedades a partir de TBS e UR com suas derivadas analíticas
+
+    Args:
+        tbs: Temperatura de bulbo seco (°C), escalar ou array
+        ur: Umidade relativa (decimal), escalar ou array
+        patm: Pressão atmosférica (kPa), escalar ou array
+
+    Returns:
+        dict: 'values' com as propriedades de calculate_from_tbs_ur_batch e
+              'jacobian' com jacobian[propriedade][entrada], entradas 'tbs',
+              'ur' e 'patm'
+    """
+    tbs, ur, patm = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in (tbs, ur, patm)])
+    values = calculate_from_tbs_ur_batch(tbs, ur, patm)
+    shape = tbs.shape
+    g_tbs, g_ur, g_patm = _unit(0, shape), _unit(1, shape), _unit(2, shape)
+
+    pvs = values['pvs']
+    g_pv = ur * derivada_pressao_vapor_saturado(tbs) * g_tbs + pvs * g_ur
+
+    # Acima de 99 % o ponto de orvalho é tomado igual ao bulbo seco
+    g_tpo = np.where(ur >= 0.99, g_tbs, derivada_temperatura_ponto_orvalho(values['pv']) * g_pv)
+
+    grads = _state_jacobian(values, g_tbs, g_pv, g_patm, patm, g_tpo=g_tpo)
+    return _result(values, grads, ('tbs', 'ur', 'patm'))
+
+def calculate_from_tbs_tbm_jacobian(tbs, tbm, patm):
+    """
+    Calcula as propriedades a partir de TBS e TBM com suas derivadas analíticas
+
+    Args:
+        tbs: Temperatura de bulbo seco (°C), escalar ou array
+        tbm: Temperatura de bulbo molhado (°C), escalar ou array
+        patm: Pressão atmosférica (kPa), escalar ou array
+
+    Returns:
+        dict: 'values' com as propriedades de calculate_from_tbs_tbm_batch e
+              'jacobian' com jacobian[propriedade][entrada], entradas 'tbs',
+              'tbm' e 'patm'
+    """
+    tbs, tbm, patm = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in (tbs, tbm, patm)])
+    values = calculate_from_tbs_tbm_batch(tbs, tbm, patm)
+    shape = tbs.shape
+    g_tbs, g_tbm, g_patm = _unit(0, shape), _unit(1, shape), _unit(2, shape)
+
+    # rm = razao_mistura2(tbs, tbm, rmsu) com rmsu = razao_mistura1(pvs(tbm), patm)
+    pvsu = pressao_vapor_saturado_vetorizado(tbm)
+    rmsu = razao_mistura1(pvsu, patm)
+    g_pvsu = derivada_pressao_vapor_saturado(tbm) * g_tbm
+    g_rmsu = 0.62198 * (patm * g_pvsu - pvsu * g_patm) / (patm - pvsu) ** 2
+    num = (2501. - 2.411 * tbm) * rmsu - 1.006 * (tbs - tbm)
+    den = 2501. + 1.775 * tbs - 4.186 * tbm
+    g_num = (2501. - 2.411 * tbm) * g_rmsu - 2.411 * rmsu * g_tbm - 1.006 * (g_tbs - g_tbm)
+    g_den = 1.775 * g_tbs - 4.186 * g_tbm
+    g_rm = (g_num * den - num * g_den) / den ** 2
+
+    # pv = pressao_vapor(rm, patm)
+    rm = values['rm'] / 1000.0
+    g_pv = patm * 0.62198 / (0.62198 + rm) ** 2 * g_rm + rm / (0.62198 + rm) * g_patm
+
+    saturado = tbs == tbm
+    g_pv = np.where(saturado, derivada_pressao_vapor_saturado(tbs) * g_tbs, g_pv)
+    g_tpo = np.where(saturado, g_tbs, derivada_temperatura_ponto_orvalho(values['pv']) * g_pv)
+
+    grads = _state_jacobian(values, g_tbs, g_pv, g_patm, patm, g_tpo=g_tpo, g_tbm=g_tbm)
+    return _result(values, grads, ('tbs', 'tbm', 'patm'))
+
+def calculate_from_tbs_tpo_jacobian(tbs, tpo, patm):
+    """
+    Calcula as propriedades a partir de TBS e TPO com suas derivadas analíticas
+
+    Args:
+        tbs: Temperatura de bulbo seco (°C), escalar ou array
+        tpo: Temperatura de ponto de orvalho (°C), escalar ou array
+        patm: Pressão atmosférica (kPa), escalar ou array
+
+    Returns:
+        dict: 'values' com as propriedades de calculate_from_tbs_tpo_batch e
+              'jacobian' com jacobian[propriedade][entrada], entradas 'tbs',
+              'tpo' e 'patm'
+    """
+    tbs, tpo, patm = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in (tbs, tpo, patm)])
+    values = calculate_from_tbs_tpo_batch(tbs, tpo, patm)
+    shape = tbs.shape
+    g_tbs, g_tpo, g_patm = _unit(0, shape), _unit(1, shape), _unit(2, shape)
+
+    # Na versão em lote pv = pvs(tpo), ou pvs(tbs) quando tbs == tpo
+    g_pv = derivada_pressao_vapor_saturado(tpo) * g_tpo
+
+    grads = _state_jacobian(values, g_tbs, g_pv, g_patm, patm, g_tpo=g_tpo)
+    return _result(values, grads, ('tbs', 'tpo', 'patm'))
+
+# Versões com jacobiano, pelo nome da função escalar
+JACOBIAN_FUNCTIONS = {
+    'calculate_from_tbs_ur': calculate_from_tbs_ur_jacobian,
+    'calculate_from_tbs_tbm': calculate_from_tbs_tbm_jacobian,
+    'calculate_from_tbs_tpo': calculate_from_tbs_tpo_jacobian
+}
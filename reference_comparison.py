@@ -0,0 +1,388 @@
+import argparse
+import importlib.util
+import itertools
+import json
+import os
+import signal
+import sys
+
+import numpy as np
+
+import psychrometric_functions as pf
+import psychrometric_processes as pp
+from psychrometric_batch import BATCH_FUNCTIONS, PROPERTY_KEYS
+
+# Comparação diferencial com o código original do GRAPSI (attached_assets/main.py).
+#
+# As rotinas originais leem os dados com input() e guardam os resultados em
+# variáveis globais; aqui elas são executadas com input, print e as tabelas de
+# resultados substituídos no próprio módulo, sem alterar o arquivo original.
+# Cada motor rápido (funções escalares do app, kernels vetorizados) é avaliado
+# sobre grades de (tbs, ur, altitude) e comparado propriedade a propriedade.
+#
+#   python reference_comparison.py [--dense] [--json relatorio.json]
+
+REFERENCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'attached_assets', 'main.py')
+
+# Tolerâncias absolutas por propriedade, nas unidades da interface
+TOLERANCES = {
+    'tbs': 0.05,  # °C
+    'tbm': 0.05,  # °C
+    'tpo': 0.05,  # °C
+    'ur': 0.1,  # %
+    'rm': 0.01,  # g/kg
+    'pvs': 0.001,  # kPa
+    'pv': 0.001,  # kPa
+    've': 0.001,  # m³/kg
+    'e': 0.1  # kJ/kg
+}
+
+def patm_from_altitude(altitude):
+    """
+    Pressão atmosférica a partir da altitude, com a fórmula de p_atm() do código original
+    """
+    a = 2.2556e-5
+    b = 5.2559
+    return 101.324 * (1 - a * altitude) ** b
+
+class ReferenceTimeout(Exception):
+    """
+    Chamada interrompida por exceder o tempo limite
+    """
+
+def _raise_timeout(signum, frame):
+    raise ReferenceTimeout()
+
+def call_with_timeout(func, timeout, *args):
+    """
+    Executa func(*args) com tempo limite
+
+    Usa SIGALRM, portanto só funciona na thread principal em sistemas Unix.
+    Os laços de bulbo molhado e de formação de neblina do código original não
+    terminam para estados saturados ou supersaturados.
+
+    Args:
+        func: Função a executar
+        timeout: Tempo limite (s)
+        args: Argumentos da função
+
+    Returns:
+        Resultado da função
+    """
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return func(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+def load_reference(path=REFERENCE_PATH):
+    """
+    Carrega o código original como módulo, preparado para chamadas sem interação
+
+    Args:
+        path: Caminho de attached_assets/main.py
+
+    Returns:
+        module: Módulo com as rotinas originais
+    """
+    spec = importlib.util.spec_from_file_location('grapsi_reference', path)
+    ref = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(ref)
+
+    # As tabelas de resultados só imprimem; as mensagens de erro são guardadas
+    ref.resultados1 = lambda: None
+    ref.resultados2 = lambda: None
+    ref.messages = []
+    ref.print = lambda *args, **kwargs: ref.messages.append(' '.join(str(a) for a in args))
+    return ref
+
+def _state(ref, suffix='', scale=True):
+    """
+    Lê um ponto de estado das variáveis globais do módulo original
+    """
+    point = {key: float(getattr(ref, key + suffix)) for key in PROPERTY_KEYS}
+    if scale:
+        point['ur'] *= 100
+        point['rm'] *= 1000
+    return point
+
+# Rotina original, conversão dos argumentos em respostas para input() e
+# leitura dos resultados, por função do app
+REFERENCE_CASES = {
+    'calculate_from_tbs_ur': ('pe_tbs_ur', lambda tbs, ur: (tbs, ur * 100),
+                              lambda ref: _state(ref)),
+    'calculate_from_tbs_tbm': ('pe_tbs_tbm', lambda tbs, tbm: (tbs, tbm),
+                               lambda ref: _state(ref)),
+    'calculate_from_tbs_tpo': ('pe_tbs_tpo', lambda tbs, tpo: (tbs, tpo),
+                               lambda ref: _state(ref)),
+    'calculate_aquece_resfria': ('aquece_resfria', lambda tbs1, ur1, tbs2: (tbs1, ur1 * 100, tbs2),
+                                 lambda ref: {'point1': _state(ref, scale=False),
+                                              'point2': _state(ref, '2', scale=False)}),
+    'calculate_u_adiabatica_tbs': ('u_adiabatica_tbs', lambda tbs1, ur1, tbs2: (tbs1, ur1 * 100, tbs2),
+                                   lambda ref: {'point1': _state(ref, scale=False),
+                                                'point2': _state(ref, '2', scale=False)}),
+    'calculate_u_adiabatica_ur': ('u_adiabatica_ur', lambda tbs1, ur1, ur2: (tbs1, ur1 * 100, ur2 * 100),
+                                  lambda ref: {'point1': _state(ref, scale=False),
+                                               'point2': _state(ref, '2', scale=False)}),
+    'calculate_u_adiabatica_rm': ('u_adiabatica_rm', lambda tbs1, rm1, rm2: (tbs1, rm1, rm2),
+                                  lambda ref: {'point1': _state(ref, scale=False),
+                                               'point2': _state(ref, '2', scale=False)}),
+    'calculate_mistura_fluxos': ('mistura_fluxos',
+                                 lambda tbs1, ur1, q1, tbs2, ur2, q2: (tbs1, ur1 * 100, q1, tbs2, ur2 * 100, q2),
+                                 lambda ref: {'point1': _state(ref, '1', scale=False),
+                                              'point2': _state(ref, '2', scale=False),
+                                              'point3': _state(ref, '3', scale=False)})
+}
+
+def reference_call(ref, name, args, patm, timeout):
+    """
+    Executa a rotina original equivalente a uma função do app
+
+    Args:
+        ref: Módulo retornado por load_reference
+        name: Nome da função calculate_*
+        args: Argumentos da função (sem patm)
+        patm: Pressão atmosférica (kPa)
+        timeout: Tempo limite (s)
+
+    Returns:
+        dict: Resultado no formato da função do app, {'error': ...} ou None se
+              a rotina não terminou no tempo limite
+    """
+    routine, to_inputs, read = REFERENCE_CASES[name]
+    answers = iter(str(v) for v in to_inputs(*args))
+    ref.input = lambda prompt='': next(answers)
+    ref.patm = patm
+    ref.messages.clear()
+    try:
+        with np.errstate(all='ignore'):
+            call_with_timeout(getattr(ref, routine), timeout)
+    except ReferenceTimeout:
+        return None
+    except Exception as exc:
+        return {'error': f'{type(exc).__name__}: {exc}'}
+    errors = [m for m in ref.messages if 'muito alt' in m]
+    if errors:
+        return {'error': errors[0].strip()}
+    return read(ref)
+
+def scalar_engine(name, rows, patms, timeout):
+    """
+    Motor com as funções escalares do app, uma chamada por linha
+    """
+    func = getattr(pf, name, None) or getattr(pp, name)
+    results = []
+    for args, patm in zip(rows, patms):
+        try:
+            with np.errstate(all='ignore'):
+                results.append(call_with_timeout(func, timeout, *args, patm))
+        except ReferenceTimeout:
+            results.append(None)
+        except Exception as exc:
+            results.append({'error': f'{type(exc).__name__}: {exc}'})
+    return results
+
+def batch_engine(name, rows, patms, timeout):
+    """
+    Motor com os kernels vetorizados, uma chamada para toda a grade
+    """
+    columns = np.array(rows, dtype=float).T
+    with np.errstate(all='ignore'):
+        result = BATCH_FUNCTIONS[name](*columns, np.asarray(patms, dtype=float))
+
+    def row(i):
+        if 'valid' in result and not result['valid'][i]:
+            return {'error': str(result['error'][i])}
+        if 'point1' not in result:
+            return {key: float(result[key][i]) for key in PROPERTY_KEYS}
+        return {point: {key: float(values[key][i]) for key in PROPERTY_KEYS}
+                for point, values in result.items() if point.startswith('point')}
+
+    return [row(i) for i in range(len(rows))]
+
+# Motores comparados com a referência; novos motores rápidos entram aqui
+ENGINES = {
+    'scalar': scalar_engine,
+    'batch': batch_engine
+}
+
+def build_grids(dense=False):
+    """
+    Monta as grades de entrada de cada função
+
+    Args:
+        dense: Usa a grade fina (mais lenta)
+
+    Returns:
+        dict: Por função, listas de argumentos e de altitudes
+    """
+    if dense:
+        tbs_values = np.arange(-20.0, 80.1, 2.5)
+        ur_values = np.append(np.arange(0.05, 0.951, 0.05), 1.0)
+        altitudes = np.arange(0.0, 4000.1, 1000.0)
+    else:
+        tbs_values = np.arange(-20.0, 80.1, 5.0)
+        ur_values = np.append(np.arange(0.1, 0.91, 0.1), 1.0)
+        altitudes = np.array([0.0, 2000.0, 4000.0])
+
+    base = list(itertools.product(tbs_values, ur_values, altitudes))
+
+    def rm_gkg(tbs, ur, altitude):
+        patm = patm_from_altitude(altitude)
+        return 1000 * pf.razao_mistura1(ur * pf.pressao_vapor_saturado(tbs), patm)
+
+    def expand(make_args, variants):
+        rows, alts = [], []
+        for tbs, ur, altitude in base:
+            for variant in variants:
+                rows.append(make_args(tbs, ur, altitude, variant))
+                alts.append(altitude)
+        return rows, alts
+
+    return {
+        'calculate_from_tbs_ur': expand(lambda t, u, a, v: (t, u), [None]),
+        'calculate_from_tbs_tbm': expand(lambda t, u, a, v: (t, t - v * (1 - u)), [0.0, 5.0, 15.0]),
+        'calculate_from_tbs_tpo': expand(lambda t, u, a, v: (t, t - v * (1 - u)), [0.0, 10.0, 30.0]),
+        'calculate_aquece_resfria': expand(lambda t, u, a, v: (t, u, t + v), [-15.0, -5.0, 5.0, 15.0]),
+        'calculate_u_adiabatica_tbs': expand(lambda t, u, a, v: (t, u, t - v), [1.0, 3.0]),
+        'calculate_u_adiabatica_ur': expand(lambda t, u, a, v: (t, u, min(u + v, 0.99)), [0.05, 0.3]),
+        'calculate_u_adiabatica_rm': expand(lambda t, u, a, v: (t, rm_gkg(t, u, a), rm_gkg(t, u, a) + v),
+                                            [0.5, 2.0]),
+        'calculate_mistura_fluxos': expand(lambda t, u, a, v: (t, u, 100.0, v, 0.6, 50.0), [10.0, 30.0])
+    }
+
+def _flatten(result):
+    """
+    Converte um resultado em pares ('ponto.propriedade', valor)
+    """
+    if 'point1' in result:
+        return {f'{point}.{key}': value for point, values in result.items()
+                if point.startswith('point') for key, value in values.items() if key in PROPERTY_KEYS}
+    return {key: result[key] for key in PROPERTY_KEYS}
+
+def compare_function(ref, name, rows, altitudes, engines, timeout):
+    """
+    Compara os motores com a referência para uma função
+
+    Args:
+        ref: Módulo retornado por load_reference
+        name: Nome da função calculate_*
+        rows: Lista de argumentos (sem patm)
+        altitudes: Altitudes correspondentes (m)
+        engines: Nomes dos motores a comparar
+        timeout: Tempo limite por chamada (s)
+
+    Returns:
+        dict: Por motor, contagens e erros máximos por propriedade
+    """
+    patms = [patm_from_altitude(a) for a in altitudes]
+    reference = [reference_call(ref, name, args, patm, timeout) for args, patm in zip(rows, patms)]
+
+    report = {}
+    for engine in engines:
+        results = ENGINES[engine](name, rows, patms, timeout)
+        summary = {'cases': len(rows), 'compared': 0, 'reference_timeouts': 0, 'engine_timeouts': 0,
+                   'error_mismatches': 0, 'non_finite': 0, 'properties': {}}
+        for args, altitude, expected, actual in zip(rows, altitudes, reference, results):
+            if expected is None:
+                summary['reference_timeouts'] += 1
+                continue
+            if actual is None:
+                summary['engine_timeouts'] += 1
+                continue
+            if ('error' in expected) != ('error' in actual):
+                summary['error_mismatches'] += 1
+                continue
+            if 'error' in expected:
+                continue
+            summary['compared'] += 1
+
+            actual = _flatten(actual)
+            for prop, value in _flatten(expected).items():
+                other = actual[prop]
+                if not (np.isfinite(value) and np.isfinite(other)):
+                    if np.isfinite(value) != np.isfinite(other):
+                        summary['non_finite'] += 1
+                    continue
+                abs_err = float(abs(other - value))
+                rel_err = abs_err / max(abs(value), 1e-12)
+                entry = summary['properties'].setdefault(prop, {'max_abs': 0.0, 'max_rel': 0.0, 'worst': None})
+                entry['max_rel'] = max(entry['max_rel'], rel_err)
+                if abs_err >= entry['max_abs']:
+                    entry['max_abs'] = abs_err
+                    entry['worst'] = {'args': [float(v) for v in args], 'altitude': float(altitude),
+                                      'reference': float(value), 'engine': float(other)}
+
+        for prop, entry in summary['properties'].items():
+            entry['tolerance'] = TOLERANCES[prop.split('.')[-1]]
+            entry['breach'] = bool(entry['max_abs'] > entry['tolerance'])
+        report[engine] = summary
+    return report
+
+def run(dense=False, engines=tuple(ENGINES), functions=None, timeout=0.1):
+    """
+    Executa a comparação para todas as funções
+
+    Args:
+        dense: Usa a grade fina
+        engines: Motores a comparar
+        functions: Funções a comparar (todas por padrão)
+        timeout: Tempo limite por chamada (s)
+
+    Returns:
+        dict: Relatório por função e motor
+    """
+    ref = load_reference()
+    grids = build_grids(dense)
+    report = {}
+    for name in functions or REFERENCE_CASES:
+        rows, altitudes = grids[name]
+        report[name] = compare_function(ref, name, rows, altitudes, engines, timeout)
+    return report
+
+def format_report(report):
+    """
+    Formata o relatório como texto, indicando as propriedades fora da tolerância
+    """
+    lines = []
+    breaches = 0
+    for name, engines in report.items():
+        for engine, summary in engines.items():
+            lines.append(f'{name} [{engine}]: {summary["compared"]}/{summary["cases"]} compared, '
+                         f'{summary["reference_timeouts"]} reference timeouts, '
+                         f'{summary["engine_timeouts"]} engine timeouts, '
+                         f'{summary["error_mismatches"]} error mismatches, '
+                         f'{summary["non_finite"]} non-finite mismatches')
+            for prop, entry in sorted(summary['properties'].items()):
+                flag = 'BREACH' if entry['breach'] else 'ok'
+                breaches += entry['breach']
+                line = (f'    {prop:14s} max_abs {entry["max_abs"]:12.6g}  max_rel {entry["max_rel"]:10.3g}  '
+                        f'tol {entry["tolerance"]:<6g} {flag}')
+                if entry['breach']:
+                    worst = entry['worst']
+                    line += (f'  worst args={[round(v, 4) for v in worst["args"]]} alt={worst["altitude"]:g} '
+                             f'ref={worst["reference"]:.6g} got={worst["engine"]:.6g}')
+                lines.append(line)
+    lines.append(f'{breaches} tolerance breach(es)')
+    return '\n'.join(lines)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Comparação dos motores de cálculo com o código original do GRAPSI')
+    parser.add_argument('--dense', action='store_true', help='Grade fina de tbs, ur e altitude')
+    parser.add_argument('--engines', default=','.join(ENGINES))
+    parser.add_argument('--functions', help='Funções separadas por vírgula (todas por padrão)')
+    parser.add_argument('--timeout', type=float, default=0.1, help='Tempo limite por chamada (s)')
+    parser.add_argument('--json', help='Salva o relatório completo em JSON')
+    args = parser.parse_args()
+
+    report = run(args.dense, args.engines.split(','),
+                 args.functions.split(',') if args.functions else None, args.timeout)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    has_breach = any(entry['breach'] for engines in report.values() for summary in engines.values()
+                     for entry in summary['properties'].values())
+    sys.exit(1 if has_breach else 0)
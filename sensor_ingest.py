@@ -0,0 +1,399 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+from psychrometric_batch import calculate_from_tbs_ur_batch
+
+# Ingestão contínua de leituras de sensores (temperatura e umidade relativa).
+#
+# Cada leitura é uma linha de texto, em CSV "sensor,timestamp,tbs,ur" ou em
+# JSON {"sensor": ..., "t": ..., "tbs": ..., "ur": ...}, com ur em % como nos
+# dados de sensores do gráfico. As linhas chegam por um socket TCP local ou
+# pela leitura contínua de um arquivo, no papel do broker, e são calculadas
+# em lotes com calculate_from_tbs_ur_batch.
+
+AGGREGATE_FIELDS = ('count', 'e', 'tpo', 'rm', 'time_above')
+
+# Maior instante aceito (s, em módulo); acima dele o índice dos intervalos
+# da janela deixaria de caber em int64
+MAX_TIMESTAMP = 1e12
+
+logger = logging.getLogger(__name__)
+
+def parse_lines(lines):
+    """
+    Converte linhas de leituras em arrays
+
+    Linhas inválidas são descartadas, inclusive as com t, tbs ou ur não
+    finitos (ex.: nan, inf) ou |t| acima de MAX_TIMESTAMP.
+
+    Args:
+        lines: Lista de linhas (bytes ou str) em CSV ou JSON
+
+    Returns:
+        tuple: Lista de identificadores e arrays (t, tbs, ur em %)
+    """
+    sensors, t, tbs, ur = [], [], [], []
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', 'replace')
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            if line[0] == '{':
+                item = json.loads(line)
+                values = (str(item['sensor']), float(item.get('t', time.time())),
+                          float(item['tbs']), float(item['ur']))
+            else:
+                sensor, ts, temp, rh = line.split(',')
+                values = (sensor, float(ts), float(temp), float(rh))
+        except (ValueError, KeyError, TypeError):
+            continue
+        if not (np.isfinite(values[1:]).all() and abs(values[1]) <= MAX_TIMESTAMP):
+            continue
+        sensors.append(values[0])
+        t.append(values[1])
+        tbs.append(values[2])
+        ur.append(values[3])
+    return sensors, np.array(t), np.array(tbs), np.array(ur)
+
+class RollingAggregates:
+    """
+    Agregados móveis por sensor com memória limitada
+
+    A janela é dividida em n_buckets intervalos de tempo; cada sensor guarda
+    apenas as somas de cada intervalo (contagem, entalpia, ponto de orvalho,
+    razão de mistura e tempo acima do limite de orvalho). Intervalos que saem
+    da janela são reaproveitados, então a memória não cresce com o número de
+    leituras.
+    """
+
+    def __init__(self, window=300.0, n_buckets=30, dew_point_threshold=15.0, max_gap=60.0):
+        """
+        Args:
+            window: Duração da janela móvel (s)
+            n_buckets: Número de intervalos da janela
+            dew_point_threshold: Limite de temperatura de ponto de orvalho (°C)
+            max_gap: Maior intervalo entre leituras contado como tempo acima do limite (s)
+        """
+        self.width = window / n_buckets
+        self.n_buckets = n_buckets
+        self.dew_point_threshold = dew_point_threshold
+        self.max_gap = max_gap
+        self.index = {}
+        self.names = []
+        self.sums = np.zeros((0, n_buckets, len(AGGREGATE_FIELDS)))
+        self.epoch = np.zeros((0, n_buckets), dtype=np.int64)
+        self.last_t = np.zeros(0)
+        self.last_above = np.zeros(0, dtype=bool)
+        self.latest = -np.inf
+
+    def _sensor_indices(self, sensors):
+        idx = np.empty(len(sensors), dtype=np.int64)
+        for i, sensor in enumerate(sensors):
+            k = self.index.get(sensor)
+            if k is None:
+                k = self.index[sensor] = len(self.names)
+                self.names.append(sensor)
+            idx[i] = k
+
+        # Crescimento das estruturas por duplicação
+        n = len(self.names)
+        if n > len(self.last_t):
+            size = max(n, 2 * len(self.last_t), 16)
+            grow = size - len(self.last_t)
+            self.sums = np.concatenate([self.sums, np.zeros((grow,) + self.sums.shape[1:])])
+            self.epoch = np.concatenate([self.epoch, np.full((grow, self.n_buckets), -1, dtype=np.int64)])
+            self.last_t = np.concatenate([self.last_t, np.full(grow, np.nan)])
+            self.last_above = np.concatenate([self.last_above, np.zeros(grow, dtype=bool)])
+        return idx
+
+    def update(self, sensors, t, e, tpo, rm):
+        """
+        Acumula um lote de estados calculados
+
+        Args:
+            sensors: Lista de identificadores dos sensores
+            t: Array de instantes das leituras (s)
+            e: Array de entalpias (kJ/kg)
+            tpo: Array de temperaturas de ponto de orvalho (°C)
+            rm: Array de razões de mistura (g/kg)
+        """
+        if len(sensors) == 0:
+            return
+        idx = self._sensor_indices(sensors)
+
+        # Ordena por sensor e tempo para obter o intervalo desde a leitura anterior
+        order = np.lexsort((t, idx))
+        idx, t, e, tpo, rm = idx[order], t[order], e[order], tpo[order], rm[order]
+        first = np.ones(len(idx), dtype=bool)
+        first[1:] = idx[1:] != idx[:-1]
+        prev_t = np.where(first, self.last_t[idx], np.roll(t, 1))
+        above = tpo > self.dew_point_threshold
+        prev_above = np.where(first, self.last_above[idx], np.roll(above, 1))
+        dt = np.clip(t - prev_t, 0.0, self.max_gap)
+        time_above = np.where(np.isfinite(dt) & prev_above, dt, 0.0)
+
+        last = np.ones(len(idx), dtype=bool)
+        last[:-1] = idx[1:] != idx[:-1]
+        self.last_t[idx[last]] = t[last]
+        self.last_above[idx[last]] = above[last]
+        self.latest = max(self.latest, t[-1] if len(t) == 1 else t.max())
+
+        # Intervalos da janela: reinicia os que pertencem a um período anterior
+        bucket = np.floor(t / self.width).astype(np.int64)
+        slot = bucket % self.n_buckets
+        before = self.epoch.copy()
+        np.maximum.at(self.epoch, (idx, slot), bucket)
+        stale = self.epoch != before
+        self.sums[stale] = 0.0
+
+        current = bucket == self.epoch[idx, slot]
+        valid = current & np.isfinite(e) & np.isfinite(tpo) & np.isfinite(rm)
+        values = np.column_stack([np.ones(len(idx)), e, tpo, rm, time_above])[valid]
+        np.add.at(self.sums, (idx[valid], slot[valid]), values)
+
+    def snapshot(self, now=None):
+        """
+        Retorna os agregados da janela móvel de cada sensor
+
+        Args:
+            now: Instante de referência (s); por padrão, a leitura mais recente
+
+        Returns:
+            dict: Por sensor, contagem, médias de e, tpo e rm e tempo acima do limite (s)
+        """
+        if not self.names:
+            return {}
+        now = self.latest if now is None else now
+        newest = int(np.floor(now / self.width))
+        n = len(self.names)
+        in_window = (self.epoch[:n] > newest - self.n_buckets) & (self.epoch[:n] <= newest)
+        totals = (self.sums[:n] * in_window[:, :, None]).sum(axis=1)
+        count = totals[:, 0]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = totals[:, 1:4] / count[:, None]
+
+        result = {}
+        for k, sensor in enumerate(self.names):
+            if count[k] == 0:
+                continue
+            result[sensor] = {
+                'count': int(count[k]),
+                'e_mean': float(means[k, 0]),
+                'tpo_mean': float(means[k, 1]),
+                'rm_mean': float(means[k, 2]),
+                'time_above_dew_point': float(totals[k, 4])
+            }
+        return result
+
+class SensorIngestor:
+    """
+    Consome linhas de uma fila assíncrona e atualiza os agregados em lotes
+    """
+
+    def __init__(self, patm=101.325, max_batch=8192, max_wait=0.05, queue_size=100000, **aggregate_options):
+        """
+        Args:
+            patm: Pressão atmosférica (kPa)
+            max_batch: Máximo de leituras por lote
+            max_wait: Espera máxima para completar um lote (s)
+            queue_size: Capacidade da fila de linhas (contrapressão nas fontes)
+            aggregate_options: Argumentos de RollingAggregates
+        """
+        self.patm = patm
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue(queue_size)
+        self.aggregates = RollingAggregates(**aggregate_options)
+        self.readings = 0
+
+    def process(self, lines):
+        """
+        Calcula e acumula um lote de linhas
+
+        Args:
+            lines: Lista de linhas de leituras
+
+        Returns:
+            int: Número de leituras válidas
+        """
+        sensors, t, tbs, ur = parse_lines(lines)
+        if not sensors:
+            return 0
+        with np.errstate(all='ignore'):
+            states = calculate_from_tbs_ur_batch(tbs, ur / 100.0, self.patm)
+        self.aggregates.update(sensors, t, states['e'], states['tpo'], states['rm'])
+        self.readings += len(sensors)
+        return len(sensors)
+
+    async def _next_batch(self):
+        lines = [await self.queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(lines) < self.max_batch:
+            while not self.queue.empty() and len(lines) < self.max_batch:
+                lines.append(self.queue.get_nowait())
+            timeout = deadline - loop.time()
+            if len(lines) >= self.max_batch or timeout <= 0:
+                break
+            try:
+                lines.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return lines
+
+    async def run(self):
+        """
+        Processa lotes continuamente até ser cancelado
+
+        Um erro em um lote é registrado no log e o lote é descartado, sem
+        interromper o consumo da fila.
+        """
+        while True:
+            lines = await self._next_batch()
+            try:
+                self.process(lines)
+            except Exception:
+                logger.exception('Falha ao processar um lote de %d linhas', len(lines))
+            finally:
+                for _ in lines:
+                    self.queue.task_done()
+
+    async def serve_tcp(self, host='127.0.0.1', port=9009):
+        """
+        Recebe leituras, uma por linha, por conexões TCP
+
+        Args:
+            host: Endereço de escuta
+            port: Porta (0 para escolher uma porta livre)
+
+        Returns:
+            asyncio.Server: Servidor em execução
+        """
+        async def handle(reader, writer):
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                await self.queue.put(line)
+            writer.close()
+
+        return await asyncio.start_server(handle, host, port, limit=2 ** 20)
+
+    async def tail_file(self, path, interval=0.2, from_start=False):
+        """
+        Acompanha um arquivo e enfileira as linhas acrescentadas
+
+        Args:
+            path: Caminho do arquivo
+            interval: Intervalo de verificação (s)
+            from_start: Lê também as linhas já existentes
+        """
+        with open(path, 'rb') as f:
+            if not from_start:
+                f.seek(0, os.SEEK_END)
+            partial = b''
+            while True:
+                chunk = f.read()
+                if not chunk:
+                    await asyncio.sleep(interval)
+                    continue
+                lines = (partial + chunk).split(b'\n')
+                partial = lines.pop()
+                for line in lines:
+                    await self.queue.put(line)
+
+def synthetic_lines(n, n_sensors=500, start=0.0, interval=5.0, seed=0):
+    """
+    Gera leituras sintéticas em CSV para testes de carga
+
+    Args:
+        n: Número de linhas
+        n_sensors: Número de sensores
+        start: Instante inicial (s)
+        interval: Intervalo entre leituras de um mesmo sensor (s)
+        seed: Semente do gerador aleatório
+
+    Returns:
+        list: Linhas em bytes
+    """
+    rng = np.random.default_rng(seed)
+    k = np.arange(n)
+    sensor = k % n_sensors
+    t = start + (k // n_sensors) * interval + rng.uniform(0, interval, n)
+    tbs = 15 + 10 * np.sin(sensor) + rng.normal(0, 1, n)
+    ur = np.clip(60 + 20 * np.cos(sensor) + rng.normal(0, 3, n), 1, 100)
+    return [f's{s},{a:.3f},{b:.2f},{c:.1f}\n'.encode() for s, a, b, c in zip(sensor, t, tbs, ur)]
+
+async def load_test(n=500000, n_sensors=500):
+    """
+    Envia leituras sintéticas por um socket local e mede a vazão de ingestão
+
+    Args:
+        n: Número de leituras
+        n_sensors: Número de sensores
+
+    Returns:
+        dict: Leituras processadas, tempo decorrido e vazão (leituras/s)
+    """
+    ingestor = SensorIngestor()
+    server = await ingestor.serve_tcp(port=0)
+    port = server.sockets[0].getsockname()[1]
+    consumer = asyncio.create_task(ingestor.run())
+    payload = b''.join(synthetic_lines(n, n_sensors))
+
+    start = time.perf_counter()
+    _, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(payload)
+    await writer.drain()
+    writer.close()
+    while ingestor.readings < n:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    consumer.cancel()
+    server.close()
+    return {'readings': ingestor.readings, 'seconds': elapsed, 'readings_per_second': n / elapsed}
+
+async def _main(args):
+    ingestor = SensorIngestor(patm=args.patm, window=args.window,
+                              dew_point_threshold=args.dew_point_threshold)
+    tasks = [asyncio.create_task(ingestor.run())]
+    if args.tail:
+        tasks.append(asyncio.create_task(ingestor.tail_file(args.tail, from_start=args.from_start)))
+    else:
+        server = await ingestor.serve_tcp(args.host, args.port)
+        print(f'Recebendo leituras em {args.host}:{server.sockets[0].getsockname()[1]}')
+
+    while True:
+        await asyncio.sleep(args.report_interval)
+        print(json.dumps({'readings': ingestor.readings, 'sensors': ingestor.aggregates.snapshot()}))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Ingestão de leituras de sensores com agregados psicrométricos móveis')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9009)
+    parser.add_argument('--tail', help='Arquivo acompanhado no lugar do socket TCP')
+    parser.add_argument('--from-start', action='store_true')
+    parser.add_argument('--patm', type=float, default=101.325)
+    parser.add_argument('--window', type=float, default=300.0)
+    parser.add_argument('--dew-point-threshold', type=float, default=15.0)
+    parser.add_argument('--report-interval', type=float, default=10.0)
+    parser.add_argument('--load-test', type=int, metavar='N',
+                        help='Executa um teste de carga local com N leituras')
+    args = parser.parse_args()
+
+    if args.load_test:
+        print(json.dumps(asyncio.run(load_test(args.load_test)), indent=2))
+    else:
+        try:
+            asyncio.run(_main(args))
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,177 @@
+import heapq
+import itertools
+import os
+import threading
+from bisect import bisect_left
+from collections import deque
+
+# Telemetria opcional dos laços iterativos (bulbo molhado e processos de
+# umidificação adiabática). Desativada por padrão; quando ativa, cada chamada
+# registra o número de iterações, o tempo gasto e se houve convergência.
+#
+#   from solver_telemetry import telemetry
+#   telemetry.enable()
+#   ...
+#   print(telemetry.to_prometheus())
+#
+# Também pode ser ativada com a variável de ambiente GRAPSI_SOLVER_TELEMETRY=1.
+
+ITERATION_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+SECONDS_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+class _Histogram:
+    """
+    Histograma com limites fixos, no formato cumulativo do Prometheus na exportação
+    """
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        return list(itertools.accumulate(self.counts))
+
+class SolverTelemetry:
+    """
+    Contadores e histogramas por solver, com as entradas das chamadas mais lentas
+    e dos eventos de não convergência
+    """
+
+    def __init__(self, slowest=10, max_events=100):
+        """
+        Args:
+            slowest: Número de chamadas mais lentas guardadas por solver
+            max_events: Número de eventos de não convergência guardados
+        """
+        self.enabled = os.environ.get('GRAPSI_SOLVER_TELEMETRY', '') not in ('', '0')
+        self.n_slowest = slowest
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """
+        Descarta todas as medições
+        """
+        with self._lock:
+            self.solvers = {}
+            self.events = deque(maxlen=self.max_events)
+            self._sequence = itertools.count()
+
+    def record(self, solver, iterations, seconds, converged, inputs=None):
+        """
+        Registra uma chamada de solver
+
+        Args:
+            solver: Nome do solver (função)
+            iterations: Número de iterações executadas
+            seconds: Tempo gasto (s)
+            converged: Se o critério de parada foi atingido
+            inputs: Dicionário com as entradas da chamada
+        """
+        with self._lock:
+            stats = self.solvers.get(solver)
+            if stats is None:
+                stats = self.solvers[solver] = {
+                    'calls': 0,
+                    'nonconverged': 0,
+                    'iterations': _Histogram(ITERATION_BUCKETS),
+                    'seconds': _Histogram(SECONDS_BUCKETS),
+                    'max_iterations': 0,
+                    'slowest': []
+                }
+            stats['calls'] += 1
+            stats['iterations'].observe(iterations)
+            stats['seconds'].observe(seconds)
+            stats['max_iterations'] = max(stats['max_iterations'], iterations)
+
+            if inputs is not None:
+                inputs = {key: float(value) for key, value in inputs.items()}
+            call = {'inputs': inputs, 'iterations': iterations, 'seconds': seconds, 'converged': converged}
+            entry = (seconds, next(self._sequence), call)
+            if len(stats['slowest']) < self.n_slowest:
+                heapq.heappush(stats['slowest'], entry)
+            elif seconds > stats['slowest'][0][0]:
+                heapq.heapreplace(stats['slowest'], entry)
+
+            if not converged:
+                stats['nonconverged'] += 1
+                self.events.append(dict(call, solver=solver))
+
+    def as_dict(self):
+        """
+        Exporta as medições como dicionário
+
+        Returns:
+            dict: Por solver, contagens, médias, histogramas e chamadas mais
+                  lentas, e a lista de eventos de não convergência
+        """
+        with self._lock:
+            solvers = {}
+            for solver, stats in self.solvers.items():
+                iterations, seconds = stats['iterations'], stats['seconds']
+                solvers[solver] = {
+                    'calls': stats['calls'],
+                    'nonconverged': stats['nonconverged'],
+                    'mean_iterations': iterations.sum / iterations.count,
+                    'max_iterations': stats['max_iterations'],
+                    'mean_seconds': seconds.sum / seconds.count,
+                    'total_seconds': seconds.sum,
+                    'iterations_histogram': dict(zip(list(ITERATION_BUCKETS) + ['+Inf'], iterations.counts)),
+                    'seconds_histogram': dict(zip(list(SECONDS_BUCKETS) + ['+Inf'], seconds.counts)),
+                    'slowest': [call for _, _, call in sorted(stats['slowest'], reverse=True)]
+                }
+            return {'solvers': solvers, 'nonconvergence_events': list(self.events)}
+
+    def to_prometheus(self, prefix='grapsi_solver'):
+        """
+        Exporta as medições no formato de texto do Prometheus
+
+        Args:
+            prefix: Prefixo dos nomes das métricas
+
+        Returns:
+            str: Métricas em formato de exposição de texto
+        """
+        lines = []
+        with self._lock:
+            solvers = sorted(self.solvers.items())
+
+            lines.append(f'# HELP {prefix}_calls_total Solver calls')
+            lines.append(f'# TYPE {prefix}_calls_total counter')
+            for solver, stats in solvers:
+                lines.append(f'{prefix}_calls_total{{solver="{solver}"}} {stats["calls"]}')
+
+            lines.append(f'# HELP {prefix}_nonconverged_total Solver calls that stopped without converging')
+            lines.append(f'# TYPE {prefix}_nonconverged_total counter')
+            for solver, stats in solvers:
+                lines.append(f'{prefix}_nonconverged_total{{solver="{solver}"}} {stats["nonconverged"]}')
+
+            for metric, help_text in (('iterations', 'Iterations per solver call'),
+                                      ('seconds', 'Time per solver call')):
+                lines.append(f'# HELP {prefix}_{metric} {help_text}')
+                lines.append(f'# TYPE {prefix}_{metric} histogram')
+                for solver, stats in solvers:
+                    histogram = stats[metric]
+                    bounds = [f'{b:g}' for b in histogram.bounds] + ['+Inf']
+                    for bound, count in zip(bounds, histogram.cumulative()):
+                        lines.append(f'{prefix}_{metric}_bucket{{solver="{solver}",le="{bound}"}} {count}')
+                    lines.append(f'{prefix}_{metric}_sum{{solver="{solver}"}} {histogram.sum:g}')
+                    lines.append(f'{prefix}_{metric}_count{{solver="{solver}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+# Instância global usada pelas funções de cálculo
+telemetry = SolverTelemetry()
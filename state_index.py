@@ -0,0 +1,227 @@
+import numpy as np
+
+# Índice espacial de estados psicrométricos para consultas por semelhança.
+#
+# Os estados (ex.: resultados das funções em lote de psychrometric_batch) são
+# guardados em coordenadas normalizadas, cada propriedade dividida pela sua
+# escala, e agrupados em células de uma grade regular. A grade é mantida como
+# um array de chaves de célula ordenado, e cada consulta percorre só as
+# células vizinhas do ponto. Estados inseridos depois da última organização
+# ficam em uma área pendente, varrida linearmente, até somarem uma fração do
+# índice; então a grade é refeita.
+#
+#   index = StateIndex()
+#   index.add(calculate_from_tbs_ur_batch(tbs, ur, patm), ids=timestamps)
+#   distances, rows = index.query(calculate_from_tbs_ur(25, 0.6, patm), k=10)
+#   index.ids[rows]
+
+DEFAULT_KEYS = ('tbs', 'rm', 'e')
+
+# Escalas da normalização: 1 °C, 1 g/kg e 2,5 kJ/kg (calor latente de
+# 1 g/kg) valem uma unidade de distância
+DEFAULT_SCALES = {'tbs': 1.0, 'tbm': 1.0, 'tpo': 1.0, 'rm': 1.0, 'ur': 5.0, 'e': 2.5, 'pv': 0.15}
+
+# Pontos por célula na escolha automática do tamanho das células
+TARGET_CELL_POINTS = 8
+
+class StateIndex:
+    """
+    Índice de grade para k vizinhos mais próximos e consultas por raio
+
+    As distâncias são euclidianas no espaço normalizado (ver DEFAULT_SCALES).
+    """
+
+    def __init__(self, keys=DEFAULT_KEYS, scales=None, cell_size=None, merge_fraction=0.1,
+                 linear_limit=4096):
+        """
+        Args:
+            keys: Propriedades usadas como coordenadas
+            scales: Dicionário com a escala de cada propriedade; padrão em DEFAULT_SCALES
+            cell_size: Aresta das células no espaço normalizado; padrão: escolhida
+                       a cada reorganização para cerca de TARGET_CELL_POINTS por célula
+            merge_fraction: Fração do índice que a área pendente pode atingir
+                            antes da reorganização
+            linear_limit: Abaixo deste número de estados as consultas são lineares
+        """
+        scales = {**DEFAULT_SCALES, **(scales or {})}
+        self.keys = tuple(keys)
+        self.scales = np.array([scales[key] for key in self.keys], dtype=float)
+        self.fixed_cell_size = cell_size
+        self.cell_size = cell_size
+        self.merge_fraction = merge_fraction
+        self.linear_limit = linear_limit
+        self.n = 0
+        self.n_indexed = 0
+        self._points = np.empty((0, len(self.keys)))
+        self._ids = np.empty(0, dtype=object)
+        self._bits = 63 // len(self.keys)
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def points(self):
+        """Coordenadas dos estados inseridos, nas unidades originais"""
+        return self._points[:self.n] * self.scales
+
+    @property
+    def ids(self):
+        """Identificadores dos estados inseridos (padrão: ordem de inserção)"""
+        return self._ids[:self.n]
+
+    def _normalize(self, states):
+        """
+        Converte estados (dicionário de arrays ou array n x len(keys)) para o espaço normalizado
+        """
+        if isinstance(states, dict):
+            columns = [np.asarray(states[key], dtype=float).ravel() for key in self.keys]
+            values = np.column_stack(np.broadcast_arrays(*columns))
+        else:
+            values = np.asarray(states, dtype=float).reshape(-1, len(self.keys))
+        return values / self.scales
+
+    def add(self, states, ids=None):
+        """
+        Insere estados no índice
+
+        Estados com coordenadas não finitas são descartados.
+
+        Args:
+            states: Dicionário com arrays das propriedades em keys, como
+                    retornado pelas funções em lote, ou array n x len(keys)
+            ids: Identificadores dos estados (ex.: data e hora); padrão: ordem de inserção
+
+        Returns:
+            int: Número de estados inseridos
+        """
+        values = self._normalize(states)
+        ids = np.arange(self.n, self.n + len(values)) if ids is None else np.asarray(ids, dtype=object).ravel()
+        valid = np.isfinite(values).all(axis=1)
+        values, ids = values[valid], ids[valid]
+
+        # Crescimento por duplicação
+        needed = self.n + len(values)
+        if needed > len(self._points):
+            size = max(needed, 2 * len(self._points), 1024)
+            points = np.empty((size, len(self.keys)))
+            points[:self.n] = self._points[:self.n]
+            all_ids = np.empty(size, dtype=object)
+            all_ids[:self.n] = self._ids[:self.n]
+            self._points, self._ids = points, all_ids
+        self._points[self.n:needed] = values
+        self._ids[self.n:needed] = ids
+        self.n = needed
+
+        pending = self.n - self.n_indexed
+        if self.n > self.linear_limit and pending > self.merge_fraction * self.n_indexed:
+            self.rebuild()
+        return len(values)
+
+    def _hash(self, cells):
+        """
+        Chave inteira única de cada célula (índices deslocados, bits concatenados)
+        """
+        keys = np.zeros(cells.shape[0], dtype=np.int64)
+        offset = 1 << (self._bits - 1)
+        for j in range(cells.shape[1]):
+            keys |= (cells[:, j] + offset) << (self._bits * j)
+        return keys
+
+    def rebuild(self):
+        """
+        Organiza todos os estados na grade (chamado automaticamente por add)
+        """
+        points = self._points[:self.n]
+        if self.fixed_cell_size is None:
+            extent = np.maximum(np.ptp(points, axis=0), 1e-9)
+            volume = np.prod(extent) * TARGET_CELL_POINTS / max(self.n, 1)
+            self.cell_size = max(float(volume ** (1 / len(self.keys))), 1e-6)
+        keys = self._hash(np.floor(points / self.cell_size).astype(np.int64))
+        self._order = np.argsort(keys, kind='stable')
+        self._cell_keys, self._starts = np.unique(keys[self._order], return_index=True)
+        self._stops = np.append(self._starts[1:], self.n)
+        self._cell_coords = np.floor(points[self._order[self._starts]] / self.cell_size)
+        self.n_indexed = self.n
+
+    def _cell_distances(self, q):
+        """
+        Menor distância do ponto a cada célula ocupada
+        """
+        low = self._cell_coords * self.cell_size
+        gap = np.maximum(np.maximum(low - q, q - (low + self.cell_size)), 0.0)
+        return np.sqrt((gap ** 2).sum(axis=1))
+
+    def _cell_rows(self, cells):
+        """
+        Linhas dos estados guardados nas células indicadas
+        """
+        starts, stops = self._starts[cells], self._stops[cells]
+        lengths = stops - starts
+        total = lengths.sum()
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        return self._order[positions]
+
+    def _distances(self, q, rows):
+        return np.sqrt(((self._points[rows] - q) ** 2).sum(axis=1))
+
+    def _sorted(self, q, rows, k=None):
+        distances = self._distances(q, rows)
+        if k is not None and k < len(rows):
+            nearest = np.argpartition(distances, k - 1)[:k]
+            rows, distances = rows[nearest], distances[nearest]
+        order = np.argsort(distances, kind='stable')
+        return distances[order], rows[order]
+
+    def query(self, state, k=1):
+        """
+        Estados mais próximos de um estado
+
+        Args:
+            state: Dicionário com as propriedades em keys (escalares, ex.: o
+                   resultado de calculate_from_tbs_ur) ou sequência de coordenadas
+            k: Número de vizinhos
+
+        Returns:
+            tuple: Arrays (distâncias normalizadas, linhas no índice), do mais
+                   próximo para o mais distante
+        """
+        q = self._normalize(state)[0]
+        k = min(k, self.n)
+        if k <= 0:
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        pending = np.arange(self.n_indexed, self.n)
+        if self.n_indexed == 0:
+            return self._sorted(q, pending, k)
+
+        # As células mais próximas até somar k estados dão um limite superior
+        # para a distância do k-ésimo vizinho; a resposta exata está nas
+        # células a até esse limite
+        cell_distances = self._cell_distances(q)
+        by_distance = np.argsort(cell_distances)
+        filled = np.cumsum(self._stops[by_distance] - self._starts[by_distance])
+        first = by_distance[:np.searchsorted(filled, k) + 1]
+        distances, rows = self._sorted(q, np.concatenate((self._cell_rows(first), pending)), k)
+        cells = np.nonzero(cell_distances <= distances[-1])[0]
+        return self._sorted(q, np.concatenate((self._cell_rows(cells), pending)), k)
+
+    def query_radius(self, state, radius):
+        """
+        Estados a até uma distância de um estado
+
+        Args:
+            state: Dicionário com as propriedades em keys ou sequência de coordenadas
+            radius: Distância máxima, no espaço normalizado
+
+        Returns:
+            tuple: Arrays (distâncias normalizadas, linhas no índice), em ordem crescente
+        """
+        q = self._normalize(state)[0]
+        pending = np.arange(self.n_indexed, self.n)
+        if self.n_indexed == 0:
+            rows = pending
+        else:
+            cells = np.nonzero(self._cell_distances(q) <= radius)[0]
+            rows = np.concatenate((self._cell_rows(cells), pending))
+        distances, rows = self._sorted(q, rows)
+        inside = distances <= radius
+        return distances[inside], rows[inside]
@@ -0,0 +1,193 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# Medição de latência por requisição (execução do script do Streamlit).
+#
+# Cada execução abre um trace associado ao tipo de página; trechos do código
+# marcados com span() registram seu tempo nesse trace. Ao final, os tempos são
+# agregados por página e etapa e, opcionalmente, gravados em um log JSON (uma
+# linha por requisição) indicado pela variável de ambiente GRAPSI_TRACE_LOG.
+#
+#   trace = collector.start('state_point')
+#   with span('calculation'):
+#       ...
+#   collector.finish(trace)
+#
+# Fora de um trace (scripts, benchmarks, API), span() não mede nada.
+
+_current = contextvars.ContextVar('grapsi_trace', default=None)
+
+class Trace:
+    """
+    Etapas medidas em uma requisição
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.timestamp = time.time()
+        self.start = time.perf_counter()
+        self.total = None
+        self.depth = 0
+        self.spans = []
+
+    def as_dict(self):
+        return {
+            'page': self.page,
+            'timestamp': self.timestamp,
+            'total_ms': self.total * 1000 if self.total is not None else None,
+            'spans': [
+                {'stage': name, 'depth': depth, 'offset_ms': offset * 1000, 'duration_ms': duration * 1000}
+                for name, depth, offset, duration in sorted(self.spans, key=lambda item: item[2])
+            ]
+        }
+
+@contextmanager
+def span(name):
+    """
+    Mede o tempo de uma etapa dentro do trace ativo
+
+    Args:
+        name: Nome da etapa (ex.: 'calculation', 'chart_encode')
+    """
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    depth = trace.depth
+    trace.depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.depth = depth
+        trace.spans.append((name, depth, start - trace.start, time.perf_counter() - start))
+
+class TraceCollector:
+    """
+    Agrega os traces por tipo de página e etapa
+    """
+
+    def __init__(self, max_samples=1000, max_recent=50, log_path=None):
+        """
+        Args:
+            max_samples: Número de durações guardadas por etapa para os percentis
+            max_recent: Número de traces completos guardados
+            log_path: Arquivo JSON lines onde cada trace é gravado (padrão:
+                      variável de ambiente GRAPSI_TRACE_LOG)
+        """
+        self.max_samples = max_samples
+        self.log_path = log_path or os.environ.get('GRAPSI_TRACE_LOG') or None
+        self._lock = threading.Lock()
+        self.recent = deque(maxlen=max_recent)
+        self.reset()
+
+    def reset(self):
+        """
+        Descarta todas as medições
+        """
+        with self._lock:
+            self.stages = {}
+            self.recent.clear()
+
+    def start(self, page):
+        """
+        Abre o trace da requisição atual
+
+        Args:
+            page: Tipo de página ('state_point', 'process', 'mixing', 'bulk')
+
+        Returns:
+            Trace: Trace ativo no contexto atual
+        """
+        trace = Trace(page)
+        _current.set(trace)
+        return trace
+
+    def finish(self, trace):
+        """
+        Fecha o trace, agrega suas etapas e grava no log, se configurado
+
+        Etapas repetidas na mesma requisição são somadas antes da agregação.
+
+        Args:
+            trace: Trace retornado por start()
+        """
+        if _current.get() is trace:
+            _current.set(None)
+        trace.total = time.perf_counter() - trace.start
+
+        durations = {'total': trace.total}
+        for name, _, _, duration in trace.spans:
+            durations[name] = durations.get(name, 0.0) + duration
+
+        with self._lock:
+            for name, duration in durations.items():
+                stats = self.stages.get((trace.page, name))
+                if stats is None:
+                    stats = self.stages[(trace.page, name)] = {
+                        'count': 0, 'total': 0.0, 'max': 0.0,
+                        'samples': deque(maxlen=self.max_samples)
+                    }
+                stats['count'] += 1
+                stats['total'] += duration
+                stats['max'] = max(stats['max'], duration)
+                stats['samples'].append(duration)
+            self.recent.append(trace)
+
+            if self.log_path:
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(trace.as_dict()) + '\n')
+
+    def summary(self):
+        """
+        Estatísticas agregadas por página e etapa
+
+        Returns:
+            list: Dicionários com page, stage, count, mean_ms, p50_ms, p95_ms e max_ms
+        """
+        rows = []
+        with self._lock:
+            for (page, stage), stats in sorted(self.stages.items()):
+                p50, p95 = np.percentile(stats['samples'], [50, 95]) * 1000
+                rows.append({
+                    'page': page,
+                    'stage': stage,
+                    'count': stats['count'],
+                    'mean_ms': stats['total'] / stats['count'] * 1000,
+                    'p50_ms': float(p50),
+                    'p95_ms': float(p95),
+                    'max_ms': stats['max'] * 1000
+                })
+        return rows
+
+    def last(self, page=None):
+        """
+        Retorna o último trace concluído, opcionalmente de um tipo de página
+        """
+        with self._lock:
+            for trace in reversed(self.recent):
+                if page is None or trace.page == page:
+                    return trace
+        return None
+
+    def as_dict(self):
+        """
+        Exporta o resumo agregado e os traces recentes
+        """
+        summary = self.summary()
+        with self._lock:
+            recent = [trace.as_dict() for trace in self.recent]
+        return {'summary': summary, 'recent': recent}
+
+    def to_json(self, indent=2):
+        return json.dumps(self.as_dict(), indent=indent)
+
+# Instância global compartilhada pelas sessões do aplicativo
+collector = TraceCollector()
@@ -17,10 +17,14 @@ translations = {
         'state_point': 'Ponto de Estado',
         'psychrometric_processes': 'Processos Psicrométricos',
         'air_flow_mixing': 'Mistura de Fluxos de Ar',
+        'bulk_calculation': 'Cálculo em Lote (CSV/Excel)',
         
         # Configurações
         'site_altitude': 'Altitude do Local (m)',
         'atm_pressure': 'Pressão atmosférica: {pressure:.2f} kPa',
+        'adaptive_chart': 'Gráfico de faixa ampla (eixos adaptativos)',
+        'show_wet_bulb_lines': 'Linhas de bulbo molhado',
+        'show_volume_lines': 'Linhas de volume específico',
         
         # Página de Ponto de Estado
         'state_point_calc': 'Cálculo do Ponto de Estado',
@@ -59,6 +63,8 @@ translations = {
         'rh_100_label': 'UR = 100%',
         'rh_label': 'UR = {value}%',
         'enthalpy_label': 'h={value} kJ/kg',
+        'wbt_label': 'TBM={value} °C',
+        'sv_label': 'v={value} m³/kg',
         'state_point_label': 'Ponto de Estado',
         'point_1_label': 'Ponto 1',
         'point_2_label': 'Ponto 2', 
@@ -69,6 +75,14 @@ translations = {
         'flow_1_short': 'F1',
         'process_default_name': 'Processo {number}',
         'mixture_default_name': 'Mistura {number}',
+        'sensor_data_label': 'Leituras de sensores',
+        'sensor_hours_label': 'Leituras por célula',
+        'uncertainty_cloud_label': 'Incerteza (Monte Carlo)',
+        'region_comfort_winter': 'Conforto (inverno, ASHRAE 55)',
+        'region_comfort_summer': 'Conforto (verão, ASHRAE 55)',
+        'region_condensation': 'Risco de condensação',
+        'region_outside': 'Fora das regiões',
+        'bin_hours_label': 'Horas por faixa',
         
         # Processos psicrométricos
         'process_calc': 'Cálculo de Processos Psicrométricos',
@@ -87,6 +101,30 @@ translations = {
         'airflow_2': 'Fluxo de Ar 2',
         'airflow_rate': 'Vazão de ar (m³/h)',
         'mixing_results': 'Resultados da Mistura de Fluxos de Ar:',
+        'bulk_calc': 'Cálculo de Propriedades em Lote',
+        'upload_file': 'Envie um arquivo CSV ou Excel com as medições',
+        'input_pair': 'Par de variáveis de entrada',
+        'column_for': 'Coluna com {name}',
+        'rh_percent_note': 'A umidade relativa deve estar em %.',
+        'processing_rows': 'Processando {done} de {total} linhas',
+        'rows_calculated': '{count} linhas calculadas',
+        'download_csv': 'Baixar resultados (CSV)',
+        'download_parquet': 'Baixar resultados (Parquet)',
+        'download_svg': 'Baixar gráfico (SVG)',
+        'prepare_svg': 'Gerar gráfico em SVG',
+        'parquet_unavailable': 'Exportação Parquet indisponível (instale o pacote pyarrow).',
+        'debug_panel': 'Depuração: tempos por etapa',
+        'trace_summary': 'Tempos agregados por página e etapa (ms)',
+        'trace_last_request': 'Última requisição: {ms:.1f} ms',
+        'trace_download': 'Baixar traces (JSON)',
+        'uncertainty_mode': 'Propagar incertezas dos sensores (Monte Carlo)',
+        'uncertainty_tbs': 'Incerteza da TBS (°C, desvio padrão)',
+        'uncertainty_ur': 'Incerteza da UR (%, desvio padrão)',
+        'uncertainty_tbm': 'Incerteza da TBM (°C, desvio padrão)',
+        'uncertainty_tpo': 'Incerteza da TPO (°C, desvio padrão)',
+        'uncertainty_results': 'Faixas de incerteza',
+        'uncertainty_caption': 'Percentis de {n:,} amostras com distribuição normal das entradas.',
+        'file_read_error': 'Não foi possível ler o arquivo: {error}',
         'flow_1': 'Fluxo 1',
         'flow_2': 'Fluxo 2', 
         'flow_mix': 'Fluxo M',
@@ -128,10 +166,14 @@ translations = {
         'state_point': 'State Point',
         'psychrometric_processes': 'Psychrometric Processes',
         'air_flow_mixing': 'Air Flow Mixing',
+        'bulk_calculation': 'Batch Calculation (CSV/Excel)',
         
         # Settings
         'site_altitude': 'Site Altitude (m)',
         'atm_pressure': 'Atmospheric pressure: {pressure:.2f} kPa',
+        'adaptive_chart': 'Wide-range chart (adaptive axes)',
+        'show_wet_bulb_lines': 'Wet-bulb lines',
+        'show_volume_lines': 'Specific volume lines',
         
         # State Point page
         'state_point_calc': 'State Point Calculation',
@@ -170,6 +212,8 @@ translations = {
         'rh_100_label': 'RH = 100%',
         'rh_label': 'RH = {value}%',
         'enthalpy_label': 'h={value} kJ/kg',
+        'wbt_label': 'WBT={value} °C',
+        'sv_label': 'v={value} m³/kg',
         'state_point_label': 'State Point',
         'point_1_label': 'Point 1',
         'point_2_label': 'Point 2', 
@@ -180,6 +224,14 @@ translations = {
         'flow_1_short': 'F1',
         'process_default_name': 'Process {number}',
         'mixture_default_name': 'Mixture {number}',
+        'sensor_data_label': 'Sensor readings',
+        'sensor_hours_label': 'Readings per cell',
+        'uncertainty_cloud_label': 'Uncertainty (Monte Carlo)',
+        'region_comfort_winter': 'Comfort (winter, ASHRAE 55)',
+        'region_comfort_summer': 'Comfort (summer, ASHRAE 55)',
+        'region_condensation': 'Condensation risk',
+        'region_outside': 'Outside regions',
+        'bin_hours_label': 'Hours per bin',
         
         # Psychrometric processes
         'process_calc': 'Psychrometric Process Calculation',
@@ -198,6 +250,30 @@ translations = {
         'airflow_2': 'Air Flow 2',
         'airflow_rate': 'Air flow rate (m³/h)',
         'mixing_results': 'Air Flow Mixing Results:',
+        'bulk_calc': 'Batch Property Calculation',
+        'upload_file': 'Upload a CSV or Excel file with the measurements',
+        'input_pair': 'Input variable pair',
+        'column_for': 'Column with {name}',
+        'rh_percent_note': 'Relative humidity must be in %.',
+        'processing_rows': 'Processing {done} of {total} rows',
+        'rows_calculated': '{count} rows calculated',
+        'download_csv': 'Download results (CSV)',
+        'download_parquet': 'Download results (Parquet)',
+        'download_svg': 'Download chart (SVG)',
+        'prepare_svg': 'Prepare chart as SVG',
+        'parquet_unavailable': 'Parquet export unavailable (install the pyarrow package).',
+        'debug_panel': 'Debug: stage timings',
+        'trace_summary': 'Aggregated timings per page and stage (ms)',
+        'trace_last_request': 'Last request: {ms:.1f} ms',
+        'trace_download': 'Download traces (JSON)',
+        'uncertainty_mode': 'Propagate sensor uncertainty (Monte Carlo)',
+        'uncertainty_tbs': 'DBT uncertainty (°C, standard deviation)',
+        'uncertainty_ur': 'RH uncertainty (%, standard deviation)',
+        'uncertainty_tbm': 'WBT uncertainty (°C, standard deviation)',
+        'uncertainty_tpo': 'DPT uncertainty (°C, standard deviation)',
+        'uncertainty_results': 'Uncertainty bands',
+        'uncertainty_caption': 'Percentiles of {n:,} samples with normally distributed inputs.',
+        'file_read_error': 'Could not read the file: {error}',
         'flow_1': 'Flow 1',
         'flow_2': 'Flow 2',
         'flow_mix': 'Flow M',
@@ -239,10 +315,14 @@ translations = {
         'state_point': 'Punto de Estado',
         'psychrometric_processes': 'Procesos Psicrométricos',
         'air_flow_mixing': 'Mezcla de Flujos de Aire',
+        'bulk_calculation': 'Cálculo por Lotes (CSV/Excel)',
         
         # Configuraciones
         'site_altitude': 'Altitud del Sitio (m)',
         'atm_pressure': 'Presión atmosférica: {pressure:.2f} kPa',
+        'adaptive_chart': 'Gráfico de rango amplio (ejes adaptativos)',
+        'show_wet_bulb_lines': 'Líneas de bulbo húmedo',
+        'show_volume_lines': 'Líneas de volumen específico',
         
         # Página de Punto de Estado
         'state_point_calc': 'Cálculo del Punto de Estado',
@@ -281,6 +361,8 @@ translations = {
         'rh_100_label': 'HR = 100%',
         'rh_label': 'HR = {value}%',
         'enthalpy_label': 'h={value} kJ/kg',
+        'wbt_label': 'TBH={value} °C',
+        'sv_label': 'v={value} m³/kg',
         'state_point_label': 'Punto de Estado',
         'point_1_label': 'Punto 1',
         'point_2_label': 'Punto 2', 
@@ -291,6 +373,14 @@ translations = {
         'flow_1_short': 'F1',
         'process_default_name': 'Proceso {number}',
         'mixture_default_name': 'Mezcla {number}',
+        'sensor_data_label': 'Lecturas de sensores',
+        'sensor_hours_label': 'Lecturas por celda',
+        'uncertainty_cloud_label': 'Incertidumbre (Monte Carlo)',
+        'region_comfort_winter': 'Confort (invierno, ASHRAE 55)',
+        'region_comfort_summer': 'Confort (verano, ASHRAE 55)',
+        'region_condensation': 'Riesgo de condensación',
+        'region_outside': 'Fuera de las regiones',
+        'bin_hours_label': 'Horas por intervalo',
         
         # Procesos psicrométricos
         'process_calc': 'Cálculo de Procesos Psicrométricos',
@@ -309,6 +399,30 @@ translations = {
         'airflow_2': 'Flujo de Aire 2',
         'airflow_rate': 'Caudal de aire (m³/h)',
         'mixing_results': 'Resultados de la Mezcla de Flujos de Aire:',
+        'bulk_calc': 'Cálculo de Propiedades por Lotes',
+        'upload_file': 'Suba un archivo CSV o Excel con las mediciones',
+        'input_pair': 'Par de variables de entrada',
+        'column_for': 'Columna con {name}',
+        'rh_percent_note': 'La humedad relativa debe estar en %.',
+        'processing_rows': 'Procesando {done} de {total} filas',
+        'rows_calculated': '{count} filas calculadas',
+        'download_csv': 'Descargar resultados (CSV)',
+        'download_parquet': 'Descargar resultados (Parquet)',
+        'download_svg': 'Descargar gráfico (SVG)',
+        'prepare_svg': 'Generar gráfico en SVG',
+        'parquet_unavailable': 'Exportación Parquet no disponible (instale el paquete pyarrow).',
+        'debug_panel': 'Depuración: tiempos por etapa',
+        'trace_summary': 'Tiempos agregados por página y etapa (ms)',
+        'trace_last_request': 'Última solicitud: {ms:.1f} ms',
+        'trace_download': 'Descargar trazas (JSON)',
+        'uncertainty_mode': 'Propagar incertidumbres de los sensores (Monte Carlo)',
+        'uncertainty_tbs': 'Incertidumbre de la TBS (°C, desviación estándar)',
+        'uncertainty_ur': 'Incertidumbre de la HR (%, desviación estándar)',
+        'uncertainty_tbm': 'Incertidumbre de la TBH (°C, desviación estándar)',
+        'uncertainty_tpo': 'Incertidumbre de la TPR (°C, desviación estándar)',
+        'uncertainty_results': 'Bandas de incertidumbre',
+        'uncertainty_caption': 'Percentiles de {n:,} muestras con entradas de distribución normal.',
+        'file_read_error': 'No se pudo leer el archivo: {error}',
         'flow_1': 'Flujo 1',
         'flow_2': 'Flujo 2', 
         'flow_mix': 'Flujo M',
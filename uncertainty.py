@@ -0,0 +1,228 @@
+import inspect
+
+import numpy as np
+
+from psychrometric_batch import BATCH_FUNCTIONS
+
+# Propagação de incertezas por Monte Carlo.
+#
+# As entradas de um cálculo (estado ou processo) são amostradas a partir das
+# incertezas dos sensores e todas as amostras passam de uma só vez pela versão
+# vetorizada em psychrometric_batch. O resultado traz percentis, média e
+# desvio padrão de cada propriedade.
+#
+#   mc = propagate('calculate_from_tbs_ur', {'tbs': 25, 'ur': 0.6},
+#                  {'tbs': 0.2, 'ur': 0.02}, patm=101.325)
+#   mc['percentiles']['tpo'][97.5]
+
+DEFAULT_SAMPLES = 100000
+DEFAULT_PERCENTILES = (2.5, 50, 97.5)
+
+# Limites físicos das amostras, conforme o prefixo do argumento. A umidade
+# relativa fica no intervalo aberto (0, 1); as demais podem atingir o limite
+_ARG_LIMITS = {
+    'ur': (0.0, 1.0),
+    'rm': (0.0, None),
+    'q': (0.0, None),
+    'ef': (0.0, 1.0)
+}
+_OPEN_LIMITS = ('ur',)
+
+# Temperaturas que não podem exceder a de bulbo seco com o mesmo sufixo
+_BELOW_TBS = ('tbm', 'tpo')
+
+# Rodadas de reamostragem das amostras fora da faixa física
+MAX_RESAMPLING = 50
+
+def function_args(name):
+    """
+    Argumentos de entrada de uma função vetorizada, sem patm e sem opções
+
+    Args:
+        name: Nome da função calculate_* (chave de BATCH_FUNCTIONS)
+
+    Returns:
+        tuple: Nomes dos argumentos na ordem da função
+    """
+    parameters = inspect.signature(BATCH_FUNCTIONS[name]).parameters.values()
+    args = []
+    for parameter in parameters:
+        if parameter.name == 'patm':
+            break
+        args.append(parameter.name)
+    return tuple(args)
+
+def _prefix(arg, prefixes):
+    for prefix in prefixes:
+        if arg.startswith(prefix):
+            return prefix
+    return None
+
+def feasible_samples(samples, sampled=None):
+    """
+    Amostras dentro da faixa física
+
+    Verifica os limites de _ARG_LIMITS e que tbm e tpo não excedam tbs (ex.:
+    tbm1 <= tbs1). Argumentos fixos não são verificados isoladamente.
+
+    Args:
+        samples: Dicionário com os arrays amostrados por argumento
+        sampled: Argumentos amostrados; padrão: todos
+
+    Returns:
+        array: Booleano por amostra
+    """
+    sampled = set(samples) if sampled is None else set(sampled)
+    n = len(next(iter(samples.values())))
+    ok = np.ones(n, dtype=bool)
+    for arg, x in samples.items():
+        prefix = _prefix(arg, _ARG_LIMITS)
+        if arg in sampled and prefix is not None:
+            low, high = _ARG_LIMITS[prefix]
+            strict = prefix in _OPEN_LIMITS
+            if low is not None:
+                ok &= x > low if strict else x >= low
+            if high is not None:
+                ok &= x < high if strict else x <= high
+        prefix = _prefix(arg, _BELOW_TBS)
+        tbs = 'tbs' + arg[len(prefix):] if prefix is not None else None
+        if tbs in samples and (arg in sampled or tbs in sampled):
+            ok &= x <= samples[tbs]
+    return ok
+
+def _draw(rng, value, u, n, distribution):
+    if distribution == 'normal':
+        return rng.normal(value, u, n)
+    if distribution == 'uniform':
+        return rng.uniform(value - u, value + u, n)
+    raise ValueError(f'Distribuição desconhecida: {distribution}')
+
+def sample_inputs(inputs, uncertainties, n=DEFAULT_SAMPLES, distribution='normal', seed=None):
+    """
+    Amostra as entradas em torno dos valores nominais
+
+    As amostras fora da faixa física (ver feasible_samples) são sorteadas de
+    novo, com todas as entradas da amostra, o que equivale a truncar a
+    distribuição conjunta. As que continuarem fora após MAX_RESAMPLING
+    rodadas ficam marcadas em 'feasible'.
+
+    Args:
+        inputs: Dicionário com os valores nominais de cada argumento
+        uncertainties: Dicionário com a incerteza de cada argumento, nas mesmas
+                       unidades (argumentos ausentes ficam fixos)
+        n: Número de amostras
+        distribution: 'normal' (incerteza como desvio padrão) ou 'uniform'
+                      (incerteza como semiamplitude, ±)
+        seed: Semente do gerador, para resultados reprodutíveis
+
+    Returns:
+        tuple: Dicionário com o array de n amostras por argumento e array
+               booleano 'feasible' por amostra
+    """
+    rng = np.random.default_rng(seed)
+    sampled = [arg for arg in inputs if float(uncertainties.get(arg, 0.0)) != 0]
+    samples = {arg: np.full(n, float(value)) for arg, value in inputs.items()}
+    rows = np.arange(n)
+    for _ in range(MAX_RESAMPLING + 1):
+        for arg in sampled:
+            samples[arg][rows] = _draw(rng, inputs[arg], float(uncertainties[arg]), len(rows), distribution)
+        feasible = feasible_samples(samples, sampled)
+        rows = np.nonzero(~feasible)[0]
+        if rows.size == 0:
+            break
+    return samples, feasible
+
+def _statistics(result, percentiles, valid):
+    """
+    Percentis, média e desvio padrão de cada array do resultado, preservando o aninhamento
+
+    Só as amostras válidas e com valores finitos entram nas estatísticas.
+
+    Returns:
+        tuple: Dicionários (percentis, média, desvio padrão)
+    """
+    if isinstance(result, dict):
+        pct, mean, std = {}, {}, {}
+        for key, value in result.items():
+            if key in ('valid', 'error'):
+                continue
+            pct[key], mean[key], std[key] = _statistics(value, percentiles, valid)
+        return pct, mean, std
+    values = np.asarray(result, dtype=float)
+    if values.shape == valid.shape:
+        values = values[valid]
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return {p: np.nan for p in percentiles}, np.nan, np.nan
+    return (dict(zip(percentiles, np.percentile(values, percentiles).tolist())),
+            float(values.mean()), float(values.std()))
+
+def propagate(name, inputs, uncertainties, patm, n=DEFAULT_SAMPLES, distribution='normal',
+              percentiles=DEFAULT_PERCENTILES, seed=None):
+    """
+    Propaga as incertezas das entradas por um cálculo de estado ou processo
+
+    Args:
+        name: Nome da função calculate_* (chave de BATCH_FUNCTIONS)
+        inputs: Dicionário com os valores nominais dos argumentos da função
+                (mesmas unidades da função, ex.: ur decimal)
+        uncertainties: Dicionário com a incerteza de cada argumento
+        patm: Pressão atmosférica (kPa)
+        n: Número de amostras
+        distribution: 'normal' ou 'uniform' (ver sample_inputs)
+        percentiles: Percentis calculados para cada propriedade
+        seed: Semente do gerador
+
+    Returns:
+        dict: 'percentiles', 'mean' e 'std' com o mesmo aninhamento do resultado
+              da função (ex.: percentiles['tpo'][97.5] ou
+              percentiles['point2']['e'][50]), 'samples' com as entradas
+              amostradas, 'result' com os arrays calculados, 'valid' por
+              amostra (dentro da faixa física e com cálculo válido) e
+              'valid_fraction'
+    """
+    args = function_args(name)
+    unknown = set(inputs) - set(args)
+    missing = [arg for arg in args if arg not in inputs]
+    if unknown or missing:
+        raise ValueError(f'Argumentos de {name}: {", ".join(args)}')
+
+    samples, feasible = sample_inputs(inputs, uncertainties, n, distribution, seed)
+    with np.errstate(all='ignore'):
+        result = BATCH_FUNCTIONS[name](*(samples[arg] for arg in args), patm)
+
+    valid = feasible.copy()
+    if 'valid' in result:
+        valid &= np.asarray(result['valid'], dtype=bool)
+    pct, mean, std = _statistics(result, tuple(percentiles), valid)
+
+    return {
+        'percentiles': pct,
+        'mean': mean,
+        'std': std,
+        'samples': samples,
+        'result': result,
+        'valid': valid,
+        'valid_fraction': float(valid.mean())
+    }
+
+# Casos próximos da saturação: as amostras não podem passar de 100 % de UR
+SATURATION_CHECKS = (
+    ('calculate_from_tbs_ur', {'tbs': 25.0, 'ur': 0.99}, {'tbs': 0.3, 'ur': 0.02}),
+    ('calculate_from_tbs_ur', {'tbs': 25.0, 'ur': 0.99999}, {'tbs': 0.3, 'ur': 0.02}),
+    ('calculate_from_tbs_tbm', {'tbs': 25.0, 'tbm': 24.5}, {'tbs': 0.3, 'tbm': 0.3}),
+    ('calculate_from_tbs_tbm', {'tbs': 25.0, 'tbm': 25.0}, {'tbs': 0.3, 'tbm': 0.3}),
+    ('calculate_from_tbs_tpo', {'tbs': 25.0, 'tpo': 24.8}, {'tbs': 0.3, 'tpo': 0.3}),
+    ('calculate_from_tbs_tpo', {'tbs': 1.0, 'tpo': 0.8}, {'tbs': 0.5, 'tpo': 0.5})
+)
+
+if __name__ == '__main__':
+    failures = 0
+    for name, inputs, uncertainties in SATURATION_CHECKS:
+        mc = propagate(name, inputs, uncertainties, 101.325, seed=0)
+        ur = mc['result']['ur'][mc['valid']]
+        ok = bool(np.all(ur <= 100.0 + 1e-9)) and mc['percentiles']['ur'][97.5] <= 100.0
+        failures += not ok
+        print(f'{"ok  " if ok else "FAIL"} {name} {inputs}: UR P97.5 {mc["percentiles"]["ur"][97.5]:.3f} %, '
+              f'max {ur.max():.3f} %, valid {mc["valid_fraction"]:.4f}')
+    raise SystemExit(1 if failures else 0)